@@ -4,6 +4,7 @@ distinguished.
 """
 
 from biotrees.shape import Shape, is_binary, count_leaves, get_depth
+from biotrees.traversal import iter_preorder, iter_postorder, fold
 
 
 class PhyloTree(Shape):
@@ -12,6 +13,12 @@ class PhyloTree(Shape):
      into account the distinguishability of leaves.
     """
 
+    def __new__(cls, *args, **kwargs):
+        """
+        Unlike `Shape` instances, `PhyloTree` instances are mutable and thus they are not interned.
+        """
+        return object.__new__(cls)
+
     def __init__(self, leaf, children=None):
         """
         Create a new `PhyloTree` object.
@@ -20,49 +27,102 @@ class PhyloTree(Shape):
         :param children: `list` instance.
         :return: `PhyloTree` instance.
         """
-        super(PhyloTree, self).__init__(children)
+        assert children is None or len(children) > 0
+        self.children = children
         self.leaf = leaf
         assert not self.is_leaf() or (leaf is not None)
 
+    __setattr__ = object.__setattr__
+    __delattr__ = object.__delattr__
+
+    def __reduce__(self):
+        return PhyloTree, (self.leaf, self.children)
+
+    @property
+    def leaf_count(self):
+        """
+        The number of leaves of self. `PhyloTree` instances are mutable, so it is computed on every access.
+        :return: `int` instance.
+        """
+        return fold(self, lambda t: 1, lambda t, ns: sum(ns))
+
+    @property
+    def node_count(self):
+        """
+        The number of nodes (leaves included) of self, computed on every access.
+        :return: `int` instance.
+        """
+        return fold(self, lambda t: 1, lambda t, ns: 1 + sum(ns))
+
+    @property
+    def height(self):
+        """
+        The maximal depth of a leaf of self, computed on every access.
+        :return: `int` instance.
+        """
+        return fold(self, lambda t: 0, lambda t, ds: 1 + max(ds))
+
     def clone(self):
         """
         Returns new `PhyloTree` instance which is exactly the same as self.
         :return: `PhyloTree` instance.
         """
-        if self.is_leaf():
-            return PhyloTree(self.leaf)
-        else:
-            return PhyloTree(None, [ch.clone() for ch in self.children])
+        return fold(self, lambda t: PhyloTree(t.leaf), lambda t, chs: PhyloTree(None, chs))
 
-    def compare_with_shape_lex(self, t2):
-        l1, l2 = self.is_leaf(), t2.is_leaf()
-        if l1 and l2:
-
-            if self.leaf < t2.leaf:
-                return 0, -1
-            elif self.leaf == t2.leaf:
-                return 0, 0
-            else:
-                return 0, 1
-        elif l1:
-            return -1, 0
-        elif l2:
-            return 1, 0
-
-        cs = len(self.children) - len(t2.children)
-        if cs != 0:
-            return cs, 0
-        cl_fst = 0
+    def _is_sorted(self):
+        return all(t.is_leaf() or all(ch1 <= ch2 for ch1, ch2 in zip(t.children[:-1], t.children[1:]))
+                   for t in iter_preorder(self))
 
-        for ch1, ch2 in zip(self.children, t2.children):
-            cs, cl = ch1.compare_with_shape_lex(ch2)
+    def _sort(self):
+        """
+        Sorts self using lexicographical order.
+        """
+        for t in iter_postorder(self):
+            if not t.is_leaf():
+                t.children.sort()
 
+    def compare_with_shape_lex(self, t2):
+        """
+        Compares self with t2 first by their shapes and then by the first pair of leaves, in preorder, whose names
+        differ. It returns a pair (cs, cl) where cs is the comparison of their shapes (as in `Shape.compare`) and cl is
+        the comparison of the names, which is only meaningful if cs is 0.
+        :param t2: the `PhyloTree` object against which we compare self.
+        :return: `tuple` instance.
+        """
+        cl_fst = 0
+        stack = [(self, t2)]
+
+        while stack:
+            t1, t2 = stack.pop()
+            l1, l2 = t1.is_leaf(), t2.is_leaf()
+
+            if l1 and l2:
+                if cl_fst == 0:
+                    if t1.leaf < t2.leaf:
+                        cl_fst = -1
+                    elif t1.leaf != t2.leaf:
+                        cl_fst = 1
+                continue
+            elif l1:
+                return -1, 0
+            elif l2:
+                return 1, 0
+
+            cs = len(t1.children) - len(t2.children)
             if cs != 0:
                 return cs, 0
-            if cl_fst == 0:
-                cl_fst = cl
 
-        return cs, cl_fst
+            stack.extend(zip(reversed(t1.children), reversed(t2.children)))
+
+        return 0, cl_fst
+
+    def sort_key(self):
+        """
+        Returns a key that sorts `PhyloTree` instances like `PhyloTree.compare`: the `sort_key` of its shape followed by
+        the names of its leaves in preorder. It is not kept, since `PhyloTree` instances are mutable.
+        :return: `tuple` instance.
+        """
+        return self.shape().sort_key(), tuple(l.leaf for l in leaves(self))
 
     def compare(self, t2): # cambiar comentarios
         """
@@ -83,6 +143,24 @@ class PhyloTree(Shape):
         else:
             return 0
 
+    def __eq__(self, t2):
+        """
+        Uses the comparing method above to decide if self is equal to T2.
+        :param t2: the `PhyloTree` object against which we compare self.
+        :return: `bool` instance.
+        """
+        return self.compare(t2) == 0
+
+    def __ne__(self, t2):
+        """
+        Uses the comparing method above to decide if self is not equal to T2.
+        :param t2: the `PhyloTree` object against which we compare self.
+        :return: `bool` instance.
+        """
+        return self.compare(t2) != 0
+
+    __hash__ = None
+
     def __str__(self):
         from biotrees.phylotree.newick import to_newick
         return to_newick(self)
@@ -92,10 +170,7 @@ class PhyloTree(Shape):
         Returns the `Shape` associated to self. Namely, it "forgets" the names of the leaves.
         :return: `Shape` instance.
         """
-        if self.is_leaf():
-            return Shape(None)
-        else:
-            return Shape([x.shape() for x in self.children])
+        return fold(self, lambda t: Shape.LEAF, lambda t, chs: Shape(chs))
 
 
 def leaves(t):
@@ -103,12 +178,9 @@ def leaves(t):
     Yields the leaves of t.
     :return: `PhyloTree` instance.
     """
-    if t.is_leaf():
-        yield t
-    else:
-        for x in t.children:
-            for l in leaves(x):
-                yield l
+    for s in iter_preorder(t):
+        if s.is_leaf():
+            yield s
 
 
 def get_leaves(t):
@@ -159,14 +231,11 @@ def shape_to_phylotree(shape, gen=str):
     """
     i = [-1]
 
-    def recurse(sh):
-        if sh.is_leaf():
-            i[0] += 1
-            return PhyloTree(gen(i[0]))
-        else:
-            return PhyloTree(None, [recurse(child) for child in sh.children])
+    def leaf(sh):
+        i[0] += 1
+        return PhyloTree(gen(i[0]))
 
-    return recurse(shape)
+    return fold(shape, leaf, lambda sh, chs: PhyloTree(None, chs))
 
 
 def phylotree_to_shape(phylo):
@@ -0,0 +1,62 @@
+"""
+A compact representation of `PhyloTree` instances as NumPy arrays. It extends the encoding of
+`biotrees.shape.compact` with an `int32` column `labels` that, for each leaf, is the index of its name in the tuple
+`names`, and -1 for the interior nodes.
+"""
+
+import numpy as np
+
+from biotrees.phylotree import PhyloTree, leaves, get_leaves_names_set
+from biotrees.shape.compact import CompactShape, shape_to_compact, degrees, _build
+
+
+class CompactPhyloTree(CompactShape):
+    """
+    A `CompactPhyloTree` instance is a `CompactShape` whose leaves have names.
+    """
+    __slots__ = ('labels', 'names')
+
+    def __init__(self, parents, labels, names):
+        """
+        Create a new `CompactPhyloTree` object.
+        :param parents: sequence of `int`, the parent of each node, with the root (-1) in the last position.
+        :param labels: sequence of `int`, the index in names of the name of each leaf, or -1 for interior nodes.
+        :param names: `tuple` instance.
+        :return: `CompactPhyloTree` instance.
+        """
+        super(CompactPhyloTree, self).__init__(parents)
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self.names = tuple(names)
+        assert self.labels.shape == self.parents.shape
+
+    def __str__(self):
+        return str(compact_to_phylotree(self))
+
+
+def phylotree_to_compact(t):
+    """
+    Returns the `CompactPhyloTree` encoding of t, with its nodes in postorder and the order of the children preserved.
+    :param t: `PhyloTree` instance.
+    :return: `CompactPhyloTree` instance.
+    """
+    names = get_leaves_names_set(t)
+    index = {name: i for i, name in enumerate(names)}
+
+    c = shape_to_compact(t)
+
+    # shape_to_compact numbers the nodes in postorder, so the leaves appear in the same order as in leaves(t)
+    labels = np.full(len(c), -1, dtype=np.int32)
+    labels[degrees(c) == 0] = [index[l.leaf] for l in leaves(t)]
+
+    return CompactPhyloTree(c.parents, labels, names)
+
+
+def compact_to_phylotree(c):
+    """
+    Returns the `PhyloTree` encoded by c.
+    :param c: `CompactPhyloTree` instance.
+    :return: `PhyloTree` instance.
+    """
+    labels = c.labels.tolist()
+    names = c.names
+    return _build(c.parents.tolist(), lambda i: PhyloTree(names[labels[i]]), lambda i, chs: PhyloTree(None, chs))
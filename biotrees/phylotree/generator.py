@@ -6,6 +6,7 @@ from itertools import permutations
 
 from biotrees.util import and_then, iter_merge, unique
 from biotrees.phylotree import PhyloTree, get_leaves_names_set
+from biotrees.traversal import fold
 
 
 def add_leaf_to_edge(t, leaf_id):
@@ -47,13 +48,7 @@ def delete_nodes_with_out_degree_one(t):
     Deletes all nodes in the input `PhyloTree` instance with only one leave, for they are redundant
     :return: `PhyloTree` instance
     """
-    if t.is_leaf():
-        return t
-    else:
-        if len(t.children) == 1:
-            return delete_nodes_with_out_degree_one(t.children[0])
-        else:
-            return PhyloTree(None, [delete_nodes_with_out_degree_one(ch) for ch in t.children])
+    return fold(t, lambda s: s, lambda s, chs: chs[0] if len(chs) == 1 else PhyloTree(None, chs))
 
 
 def duplicate_leaf(t, l, newl):
@@ -66,13 +61,9 @@ def duplicate_leaf(t, l, newl):
     """
     l_leaf = l.leaf
 
-    def recurse(t, l, newl):
-        if t.is_leaf():
-            return add_leaf_to_edge(t, newl) if t.leaf == l_leaf else t
-        else:
-            return PhyloTree(None, sorted([recurse(ch, l, newl) for ch in t.children]))
-
-    return recurse(t, l, newl)
+    return fold(t,
+                lambda s: add_leaf_to_edge(s, newl) if s.leaf == l_leaf else s,
+                lambda s, chs: PhyloTree(None, sorted(chs)))
 
 
 def relabel(t, rlbl):
@@ -82,13 +73,13 @@ def relabel(t, rlbl):
     :param rlbl: `list` instance.
     :return: `PhyloTree` instance.
     """
-    if t.is_leaf():
-        l2 = rlbl.get(t.leaf, None)
+    def leaf(s):
+        l2 = rlbl.get(s.leaf, None)
         if l2 is not None:
             return PhyloTree(l2)
-        return t
-    else:
-        return PhyloTree(None, sorted([relabel(ch, rlbl) for ch in t.children]))
+        return s
+
+    return fold(t, leaf, lambda s, chs: PhyloTree(None, sorted(chs)))
 
 
 def relabellings(t):
@@ -1,4 +1,6 @@
 from biotrees.phylotree import PhyloTree
+from biotrees.shape.newick import newick_node_to_str, _descendants
+from biotrees.traversal import fold
 import newick as _newick
 
 
@@ -8,7 +10,7 @@ def to_newick(phylo):
     :param: `PhyloTree` instance.
     :return: `str` instance.
     """
-    return phylo_to_newick_node(phylo).newick
+    return newick_node_to_str(phylo_to_newick_node(phylo))
 
 
 def from_newick(nwk):
@@ -35,9 +37,8 @@ def newick_node_to_phylo(node):
     :param node: `Node` instance.
     :return: `PhyloTree` instance.
     """
-    if not bool(node.descendants):
-        return PhyloTree(node.name, None)
-    return PhyloTree(None, sorted([newick_node_to_phylo(x) for x in node.descendants]))
+    return fold(node, lambda n: PhyloTree(n.name, None), lambda n, chs: PhyloTree(None, sorted(chs)),
+                children=_descendants)
 
 
 def phylo_to_newick_node(phylo):
@@ -46,9 +47,7 @@ def phylo_to_newick_node(phylo):
     :param phylo: `PhyloTree` instance.
     :return: `Node` instance.
     """
-    if phylo.is_leaf():
-        return _newick.Node.create(str(phylo.leaf))
-    return _newick.Node.create(descendants=[phylo_to_newick_node(child) for child in phylo.children])
+    return fold(phylo, lambda t: _newick.Node.create(str(t.leaf)), lambda t, chs: _newick.Node.create(descendants=chs))
 
 
 def trees_from_file(fname, encoding='utf8', strip_comments=False, **kw):
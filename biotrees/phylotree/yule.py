@@ -1,56 +1,147 @@
+from fractions import Fraction
 from functools import lru_cache
 from math import factorial
 import random
 
-from biotrees.phylotree import PhyloTree, count_leaves, get_leaves
+from biotrees.traversal import fold
+from biotrees.shape import Shape, is_binary
+from biotrees.shape.generator import all_binary_trees_with_n_leaves
+from biotrees.phylotree import PhyloTree, count_leaves, get_leaves, shape_to_phylotree
 from biotrees.phylotree.generator import duplicate_leaf, relabellings
-from biotrees.util import parametric_total_probabilities, and_then
+from biotrees.probability import ProbabilityTable
+from biotrees.util import unique
 
 
-def sim_yule_from_t(t):
+def sim_yule_from_t(t, rng=random):
     lvs = get_leaves(t)
     n = len(lvs)
 
-    return duplicate_leaf(t, random.choice(lvs), str(n+1))
-
-def sim_yule(n):
-    t = PhyloTree("1")
-
-    for i in range(n-1):
-        t = sim_yule_from_t(t)
-
-    return t
-
-
-@and_then(parametric_total_probabilities)
-def yule_from_t(t, prob):
+    return duplicate_leaf(t, rng.choice(lvs), str(n+1))
+
+
+def sim_yule_nodes(n, rng=random):
+    """
+    Simulates a tree with n leaves under the Yule model on a mutable structure: the nodes are numbered in the order in
+    which they appear, so that every node comes before its children, and a list with the current leaves lets us choose
+    the leaf to split in constant time. Returns the list with the pair of children of each node (or `None` for the
+    leaves) and the list with the name, an `int` from 1 to n, of each leaf (as in `sim_yule`, the leaf named k+1 is the
+    new sibling of the leaf split at the k-th step).
+    :param n: `int` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: `tuple` instance.
+    """
+    assert n >= 1
+    children = [None]
+    names = [1]
+    lvs = [0]
+
+    for k in range(1, n):
+        i = rng.randrange(k)
+        v = lvs[i]
+
+        children[v] = (len(children), len(children) + 1)
+        children.extend((None, None))
+        names.extend((names[v], k+1))
+
+        lvs[i] = children[v][0]
+        lvs.append(children[v][1])
+
+    return children, names
+
+
+def sim_yule(n, rng=random):
+    """
+    Returns a random phylogenetic tree with leaves named from 1 to n under the Yule model, in O(n log n) expected time:
+    the tree is simulated with `sim_yule_nodes` and then built from its leaves up, sorting the children of each node by
+    their keys (see `PhyloTree.sort_key`).
+    :param n: `int` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: `PhyloTree` instance.
+    """
+    children, names = sim_yule_nodes(n, rng)
+    built = [None] * len(children)
+
+    for v in reversed(range(len(children))):
+        if children[v] is None:
+            name = str(names[v])
+            built[v] = (Shape.LEAF.sort_key(), (name,), PhyloTree(name), Shape.LEAF)
+        else:
+            (k1, ns1, t1, s1), (k2, ns2, t2, s2) = sorted((built[w] for w in children[v]), key=lambda b: b[:2])
+            s = Shape([s1, s2])
+            built[v] = (s.sort_key(), ns1 + ns2, PhyloTree(None, [t1, t2]), s)
+            built[children[v][0]] = built[children[v][1]] = None
+
+    return built[0][2]
+
+
+def yule_from_t(t, prob=1):
+    """
+    Returns a `ProbabilityTable` with each phylogenetic tree obtained from t (assuming t has probability prob) by
+    splitting one of its leaves, whose new sibling is named n+1, and their associate probability under the Yule model.
+    :param t: `PhyloTree` instance.
+    :param prob: `Fraction` instance, or a number.
+    :return: `ProbabilityTable` instance.
+    """
     lvs = get_leaves(t)
     n = len(lvs)
 
-    for l in lvs:
-        yield duplicate_leaf(t, l, str(n+1)), lambda *p: prob(*p)/n
+    return ProbabilityTable((duplicate_leaf(t, l, str(n+1)), prob * Fraction(1, n)) for l in lvs)
 
 
 @lru_cache(maxsize=-1)
 def pseudo_yule(n):
+    """
+    Returns a `ProbabilityTable` with the phylogenetic trees with n leaves obtained under the Yule model when the leaves
+    are named 1, 2, ..., n in the order in which they appear, and their corresponding probability.
+    :param n: `int` instance.
+    :return: `ProbabilityTable` instance.
+    """
     if n < 1:
-        pass
-    elif n == 1:
-        yield PhyloTree("1"), lambda *p: 1
-    elif n == 2:
-        yield PhyloTree(None, [PhyloTree("1"), PhyloTree("2")]), lambda *p: 1
-    else:
-        for t1, prob1 in pseudo_yule(n-1):
-            for t2, prob2 in yule_from_t(t1, prob1):
-                yield t2, lambda *p, prob2=prob2: prob2(*p)
+        return ProbabilityTable()
 
+    table = ProbabilityTable([(PhyloTree("1"), Fraction(1))])
 
-@lru_cache(maxsize=-1)
-@and_then(parametric_total_probabilities)
-def yule(n):
-    n_factorial = factorial(n)
+    for _ in range(n-1):
+        next_table = ProbabilityTable()
+        for t, p in table:
+            next_table.update(yule_from_t(t, p))
+        table = next_table
+
+    return table
 
-    for t1, prob in pseudo_yule(n):
-        for t in relabellings(t1):
-            yield t, lambda *p, prob=prob: prob(*p)/n_factorial
 
+def yule_probability(t):
+    """
+    Returns the probability of the phylogenetic tree t under the Yule model, which is 0 unless t is binary and
+    otherwise 2^(n-1) / n! times the product of 1/(n_v - 1) over the interior nodes v of t, where n_v is the number of
+    leaves that descend from v.
+    :param t: `PhyloTree` instance.
+    :return: `Fraction` instance.
+    """
+    if not is_binary(t):
+        return Fraction(0)
+
+    d = [1]
+
+    def go(s, ns):
+        k = sum(ns)
+        d[0] *= k - 1
+        return k
+
+    n = fold(t, lambda s: 1, go)
+    return Fraction(2**(n-1), factorial(n) * d[0])
+
+
+@lru_cache(maxsize=-1)
+def yule(n):
+    """
+    Returns a `ProbabilityTable` with all the phylogenetic trees with leaves named from 1 to n that can be obtained
+    under the Yule model and their corresponding probability.
+    :param n: `int` instance.
+    :return: `ProbabilityTable` instance.
+    """
+    ts = unique((t for s in all_binary_trees_with_n_leaves(n)
+                 for t in relabellings(shape_to_phylotree(s, gen=lambda i: str(i+1)))),
+                sort=True)
+
+    return ProbabilityTable((t, yule_probability(t)) for t in ts)
@@ -0,0 +1,297 @@
+"""
+Probability distributions over trees, stored as tables.
+
+A `ProbabilityTable` maps each distinct object (a `Shape`, a `PhyloTree`, ...) to its probability. Equal objects are
+aggregated by hashing, so building a distribution from a list of (object, probability) pairs takes linear time, and
+the probabilities are stored values rather than functions to be called, so they can be read, summed or evaluated any
+number of times.
+
+Probabilities are usually `Fraction` instances. Under models with parameters they are `RationalFunction` instances:
+quotients of polynomials with integer coefficients in the parameters which, for a whole table, usually share the same
+denominator. Such a table can be compiled into a `CompiledTable`, which keeps the coefficients of all the polynomials in
+matrices and evaluates every probability at many values of the parameters at once with NumPy.
+"""
+
+from collections.abc import Hashable
+from fractions import Fraction
+
+import numpy as np
+from sympy.polys.domains import ZZ
+from sympy.polys.rings import ring
+
+from biotrees.util import sort_key
+
+
+class ProbabilityTable(object):
+    """
+    A `ProbabilityTable` instance is a finite distribution: a mapping from objects to their probabilities.
+    Iterating over it yields the pairs (x, p), sorted by x.
+    """
+    __slots__ = ('_entries', '_sorted')
+
+    def __init__(self, xps=()):
+        """
+        Create a new `ProbabilityTable` object with the given pairs (x, p); the probabilities of equal x are added.
+        :param xps: iterable of `tuple` instances.
+        :return: `ProbabilityTable` instance.
+        """
+        self._entries = {}
+        self._sorted = None
+        self.update(xps)
+
+    def add(self, x, p):
+        """
+        Adds p to the probability of x.
+        :param x: the object.
+        :param p: its probability.
+        """
+        k = x if isinstance(x, Hashable) else sort_key(x)
+        e = self._entries.get(k)
+
+        if e is None:
+            self._entries[k] = [x, p]
+        else:
+            e[1] = e[1] + p
+
+        self._sorted = None
+
+    def update(self, xps):
+        """
+        Adds each pair (x, p) in xps to self.
+        :param xps: iterable of `tuple` instances.
+        """
+        for x, p in xps:
+            self.add(x, p)
+
+    def __getitem__(self, x):
+        """
+        Returns the probability of x, or 0 if x is not in self.
+        :param x: the object.
+        :return: its probability.
+        """
+        e = self._entries.get(x if isinstance(x, Hashable) else sort_key(x))
+        return 0 if e is None else e[1]
+
+    def __contains__(self, x):
+        return (x if isinstance(x, Hashable) else sort_key(x)) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        if self._sorted is None:
+            self._sorted = sorted(((x, p) for x, p in self._entries.values()), key=lambda xp: sort_key(xp[0]))
+
+        return iter(self._sorted)
+
+    def objects(self):
+        """
+        Returns the list of the objects in self, sorted.
+        :return: `list` instance.
+        """
+        return [x for x, _ in self]
+
+    def probabilities(self):
+        """
+        Returns the list of the probabilities in self, in the same order as `objects`.
+        :return: `list` instance.
+        """
+        return [p for _, p in self]
+
+    def total(self):
+        """
+        Returns the sum of all the probabilities in self.
+        :return: the sum, which is 1 for a complete distribution.
+        """
+        return sum((p for _, p in self._entries.values()), 0)
+
+    def map(self, f):
+        """
+        Returns a new `ProbabilityTable` with the probability p of each x replaced by f(p).
+        :param f: `function` instance.
+        :return: `ProbabilityTable` instance.
+        """
+        return ProbabilityTable((x, f(p)) for x, p in self._entries.values())
+
+    def evaluate(self, *args):
+        """
+        Returns a new `ProbabilityTable` with every `RationalFunction` probability evaluated at args.
+        :return: `ProbabilityTable` instance.
+        """
+        return self.map(lambda p: p(*args) if isinstance(p, RationalFunction) else p)
+
+    def compile(self):
+        """
+        Returns the `CompiledTable` of self, whose probabilities must be `RationalFunction` instances or numbers.
+        :return: `CompiledTable` instance.
+        """
+        return CompiledTable(self)
+
+    def __repr__(self):
+        return 'ProbabilityTable({})'.format(list(self))
+
+
+Polynomials, alpha, gamma = ring('a, c', ZZ)
+"""
+The ring of polynomials with integer coefficients in the parameters alpha (`a`) and gamma (`c`) of the Alpha-Gamma
+model, from `sympy`, and its generators.
+"""
+
+
+class RationalFunction(object):
+    """
+    A `RationalFunction` instance is a quotient of two polynomials of `Polynomials`, which is not simplified.
+    It can be called with the values of the parameters to evaluate it.
+    """
+    __slots__ = ('numerator', 'denominator')
+
+    def __init__(self, numerator, denominator=1):
+        """
+        Create a new `RationalFunction` object.
+        :param numerator: `int` instance or element of `Polynomials`.
+        :param denominator: `int` instance or element of `Polynomials`.
+        :return: `RationalFunction` instance.
+        """
+        self.numerator = Polynomials(numerator)
+        self.denominator = Polynomials(denominator)
+
+    def __add__(self, other):
+        if not isinstance(other, RationalFunction):
+            other = RationalFunction(other)
+
+        if self.denominator == other.denominator:
+            return RationalFunction(self.numerator + other.numerator, self.denominator)
+        else:
+            return RationalFunction(self.numerator * other.denominator + other.numerator * self.denominator,
+                                    self.denominator * other.denominator)
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        if not isinstance(other, RationalFunction):
+            other = RationalFunction(other)
+
+        return RationalFunction(self.numerator * other.numerator, self.denominator * other.denominator)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if not isinstance(other, RationalFunction):
+            other = RationalFunction(other)
+
+        return self.numerator * other.denominator == other.numerator * self.denominator
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __call__(self, *args):
+        """
+        Evaluates self at the values args of the parameters, with the arithmetic of the values: `Fraction` instances
+        give exact results, `float` instances give floating point ones and `sympy` symbols give expressions.
+        :return: the value of self.
+        """
+        num = evaluate_polynomial(self.numerator, *args)
+        den = evaluate_polynomial(self.denominator, *args)
+
+        if isinstance(num, int) and isinstance(den, int):
+            return Fraction(num, den)
+        return num / den
+
+    def __repr__(self):
+        return '({})/({})'.format(self.numerator, self.denominator)
+
+
+def evaluate_polynomial(p, *args):
+    """
+    Evaluates the polynomial p of `Polynomials` at the values args of the parameters, using only additions and
+    multiplications of the values.
+    :param p: element of `Polynomials`.
+    :return: the value of p.
+    """
+    return sum(int(coeff) * _monomial(exps, args) for exps, coeff in p.terms())
+
+
+def _monomial(exps, args):
+    m = 1
+    for x, e in zip(args, exps):
+        if e:
+            m = m * x**e
+    return m
+
+
+class CompiledTable(object):
+    """
+    A `CompiledTable` instance holds the objects of a `ProbabilityTable` of `RationalFunction` instances and the
+    coefficients of their numerators and (distinct) denominators as rows of matrices indexed by the monomials that
+    appear in any of them. Evaluating the whole table at S values of the parameters then amounts to computing these S
+    values of each monomial and two matrix products.
+    """
+    __slots__ = ('objects', 'monomials', 'numerators', 'denominators', 'denominator_index')
+
+    def __init__(self, table):
+        """
+        Create a new `CompiledTable` object.
+        :param table: `ProbabilityTable` instance.
+        :return: `CompiledTable` instance.
+        """
+        fs = [(x, p if isinstance(p, RationalFunction) else RationalFunction(p)) for x, p in table]
+
+        ps = [f.numerator for _, f in fs]
+        qs = []
+        ks = []
+        index = {}
+        for _, f in fs:
+            k = tuple(sorted(f.denominator.terms()))
+            if k not in index:
+                index[k] = len(qs)
+                qs.append(f.denominator)
+            ks.append(index[k])
+
+        monomials = sorted({exps for p in ps + qs for exps in p.keys()})
+        columns = {exps: j for j, exps in enumerate(monomials)}
+
+        def coefficients(polys):
+            cs = np.zeros((len(polys), len(monomials)), dtype=object)
+            for i, p in enumerate(polys):
+                for exps, coeff in p.terms():
+                    cs[i, columns[exps]] = int(coeff)
+            return cs
+
+        self.objects = [x for x, _ in fs]
+        self.monomials = monomials
+        self.numerators = coefficients(ps)
+        self.denominators = coefficients(qs)
+        self.denominator_index = np.array(ks, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def evaluate(self, *args, exact=False):
+        """
+        Evaluates all the probabilities of self at the values args of the parameters, which can be numbers or
+        (broadcastable) arrays of numbers of any shape S. The values are `float` instances, or, if exact is True,
+        `Fraction` instances computed without rounding.
+        :param exact: `bool` instance.
+        :return: `numpy.ndarray` instance of shape (len(self),) + S, whose i-th row holds the probability of the i-th
+        object of self.
+        """
+        dtype = object if exact else np.float64
+        args = np.broadcast_arrays(*(np.asarray(x, dtype=dtype) for x in args))
+        shape = args[0].shape if args else ()
+        args = [x.reshape(-1) for x in args]
+
+        if exact:
+            args = [np.array([Fraction(v) for v in x], dtype=object) for x in args]
+        num, den = self.numerators.astype(dtype), self.denominators.astype(dtype)
+
+        values = np.empty((len(self.monomials), int(np.prod(shape))), dtype=dtype)
+        for j, exps in enumerate(self.monomials):
+            values[j] = _monomial(exps, args)
+
+        ps = num.dot(values) / den.dot(values)[self.denominator_index]
+        return ps.reshape((len(self),) + shape)
+
+    def __repr__(self):
+        return 'CompiledTable({})'.format(self.objects)
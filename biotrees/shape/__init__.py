@@ -1,9 +1,24 @@
+from itertools import count
+from weakref import WeakValueDictionary
+
+from biotrees.traversal import iter_preorder, iter_preorder_with_depth
 from biotrees.util import iter_merge, skip_nth
 
 """
 A `Shape` represents a topological tree. The data structure implemented here is of recursive type: a `Shape` can be
 either a leaf or a list of `Shape` objects. Leaves are not distinguishable, but we know that they are leaves.
 We choose a sorted shape to be the class representant of all shapes isomorphic to it.
+
+`Shape` instances are hash-consed: every sorted shape is built only once and kept in an intern table, so isomorphic
+shapes are the very same object and identical subtrees are shared in memory. The table holds weak references, so shapes
+that are no longer used are freed. Each shape carries an integer `id`, which identifies it only while it is alive: it
+depends on the order in which shapes were built, and a shape that is freed and built again gets a new one. The canonical
+number of a shape among those with the same number of leaves is given by `biotrees.shape.generator.rank`.
+Every shape also has a `sort_key`, a `bytes` string such that comparing keys gives the same order as comparing shapes,
+so that lists of shapes can be sorted with `sorted(ts, key=sort_key)` without calling `Shape.compare`.
+
+They are also immutable, so their number of leaves (`leaf_count`), number of nodes (`node_count`) and depth
+(`height`) are computed from those of their children when they are built and can be read in constant time.
 """
 
 __all__ = ['Shape']
@@ -16,15 +31,74 @@ class Shape(object):
     """
     A `Shape` instance is either a leaf or a list of `Shape` instances that hang from a root.
     """
-    def __init__(self, children=None):
+    __slots__ = ('children', 'id', 'leaf_count', 'node_count', 'height', '_sort_key', '__weakref__')
+
+    _interned = WeakValueDictionary()
+    _ids = count()
+
+    def __new__(cls, children=None):
+        """
+        Create a new `Shape` object, or return the existing one if an isomorphic shape has already been built.
+        The children are sorted and stored as a `tuple`, so that the result is the class representant.
+        :param children: iterable of `Shape` instances, or `None` for a leaf.
+        :return: `Shape` instance.
         """
-        Create a new `Shape` object.
-        The boolean is_leaf is True if the object is a leaf; it is False otherwise.
-        :param children: `list` instance.
+        if children is not None:
+            children = tuple(sorted(children))
+            assert len(children) > 0
+
+        return cls._from_sorted(children)
+
+    @classmethod
+    def _from_sorted(cls, children, sort_key=None):
+        """
+        Returns the `Shape` with the given children, as `Shape(children)` does, but without sorting them; this is meant
+        for generators that already build the children in order. If sort_key is given, it is kept as the `sort_key` of
+        the shape, which saves computing it again.
+        :param children: sorted `tuple` of `Shape` instances, or `None` for a leaf.
+        :param sort_key: `bytes` instance, or `None`.
         :return: `Shape` instance.
         """
-        assert children is None or len(children) > 0
-        self.children = children
+        key = () if children is None else tuple([ch.id for ch in children])
+        t = Shape._interned.get(key)
+
+        if t is None:
+            t = object.__new__(cls)
+            setattr_ = object.__setattr__
+            setattr_(t, 'children', children)
+            setattr_(t, 'id', next(Shape._ids))
+            setattr_(t, '_sort_key', sort_key)
+
+            if children is None:
+                setattr_(t, 'leaf_count', 1)
+                setattr_(t, 'node_count', 1)
+                setattr_(t, 'height', 0)
+            else:
+                leaf_count, node_count, height = 0, 1, 0
+                for ch in children:
+                    leaf_count += ch.leaf_count
+                    node_count += ch.node_count
+                    height = max(height, ch.height)
+
+                setattr_(t, 'leaf_count', leaf_count)
+                setattr_(t, 'node_count', node_count)
+                setattr_(t, 'height', height + 1)
+
+            Shape._interned[key] = t
+        elif sort_key is not None and t._sort_key is None:
+            object.__setattr__(t, '_sort_key', sort_key)
+
+        return t
+
+    def __setattr__(self, name, value):
+        raise AttributeError("'Shape' instances are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("'Shape' instances are immutable")
+
+    def __reduce__(self):
+        # the flat sort key, so that deep shapes are pickled and unpickled without recursion
+        return _shape_from_sort_key, (self.sort_key(),)
 
     def is_leaf(self):
         return self.children is None
@@ -35,34 +109,39 @@ class Shape(object):
 
     def clone(self):
         """
-        Returns `Shape` instance which is exactly the same as self.
+        Returns `Shape` instance which is exactly the same as self. Since shapes are interned, this is self.
         :return: `Shape` instance.
         """
-        if self.is_leaf():
-            return Shape()
-        else:
-            return Shape([ch.clone() for ch in self.children])
+        return self
 
     def _is_sorted(self):
-        if self.is_leaf():
-            return True
-
-        children = self.children
-
-        return all(ch._is_sorted() for ch in children) and \
-               all(ch1 <= ch2 for ch1, ch2 in zip(children[:-1], children[1:]))
+        """
+        Returns True if the children of every node of self are sorted. `Shape` instances are sorted on construction.
+        :return: `bool` instance.
+        """
+        return True
 
     def _sort(self):
         """
-        Sorts self using lexicographical order.
+        Sorts self using lexicographical order. `Shape` instances are sorted on construction, so this does nothing.
         """
-        if self.is_leaf():
-            return
+        pass
 
-        for t in self.children:
-            t._sort()
+    def sort_key(self):
+        """
+        Returns the sequence of the out-degrees of the nodes of self in preorder, encoded as a `bytes` instance: each
+        out-degree below 255 takes one byte, and larger ones take the byte 255 followed by 4 bytes in big-endian order.
+        Comparing the keys of two shapes gives the same result as comparing the shapes. The key is computed the first
+        time it is requested and then kept (only for self, not for its subtrees).
+        :return: `bytes` instance.
+        """
+        key = self._sort_key
+
+        if key is None:
+            key = b''.join(_degree_bytes(len(s.children) if s.children else 0) for s in iter_preorder(self))
+            object.__setattr__(self, '_sort_key', key)
 
-        self.children.sort()
+        return key
 
     def compare(self, t2):
         """
@@ -72,23 +151,29 @@ class Shape(object):
         :param t2: `Shape` instance.
         :return: `int` instance.
         """
-        if self.is_leaf() and t2.is_leaf():
-            return 0
-        elif self.is_leaf():
-            return -1
-        elif t2.is_leaf():
-            return 1
-        else:
-            c = len(self.children) - len(t2.children)
+        k1, k2 = self._sort_key, getattr(t2, '_sort_key', None)
+        if k1 is not None and k2 is not None:
+            return (k1 > k2) - (k1 < k2)
+
+        stack = [(self, t2)]
+
+        while stack:
+            t1, t2 = stack.pop()
+
+            if t1 is t2 or (t1.is_leaf() and t2.is_leaf()):
+                continue
+            elif t1.is_leaf():
+                return -1
+            elif t2.is_leaf():
+                return 1
+
+            c = len(t1.children) - len(t2.children)
             if c != 0:
                 return c
 
-            for t1, t2 in zip(self.children, t2.children):
-                c = t1.compare(t2)
-                if c != 0:
-                    return c
+            stack.extend(zip(reversed(t1.children), reversed(t2.children)))
 
-            return c
+        return 0
 
     def __lt__(self, t2):
         """
@@ -108,19 +193,22 @@ class Shape(object):
 
     def __eq__(self, t2):
         """
-        Uses the comparing method above to decide if self is equal to T2.
+        Decides if self is equal to T2. Since shapes are interned, this is an identity check.
         :param t2: the `Shape` object against which we compare self.
         :return: `bool` instance.
         """
-        return self.compare(t2) == 0
+        return self is t2
 
     def __ne__(self, t2):
         """
-        Uses the comparing method above to decide if self is not equal to T2.
+        Decides if self is not equal to T2. Since shapes are interned, this is an identity check.
         :param t2: the `Shape` object against which we compare self.
         :return: `bool` instance.
         """
-        return self.compare(t2) != 0
+        return self is not t2
+
+    def __hash__(self):
+        return self.id
 
     def __ge__(self, t2):
         """
@@ -157,13 +245,59 @@ Shape.LEAF = Shape()
 Shape.CHERRY = Shape([Shape.LEAF, Shape.LEAF])
 
 
+_SMALL_DEGREE_BYTES = [bytes([d]) for d in range(255)]
+
+
+def _degree_bytes(d):
+    return _SMALL_DEGREE_BYTES[d] if d < 255 else b'\xff' + d.to_bytes(4, 'big')
+
+
+def _shape_from_sort_key(key):
+    """
+    Returns the `Shape` whose `sort_key` is key. The nodes are built in reverse preorder, so that the children of each
+    node, already sorted, are on top of a stack when it is reached.
+    :param key: `bytes` instance.
+    :return: `Shape` instance.
+    """
+    degrees = []
+    i = 0
+
+    while i < len(key):
+        d = key[i]
+        if d < 255:
+            i += 1
+        else:
+            d = int.from_bytes(key[i+1:i+5], 'big')
+            i += 5
+        degrees.append(d)
+
+    stack = []
+
+    for d in reversed(degrees):
+        if d == 0:
+            stack.append(Shape.LEAF)
+        else:
+            children = tuple(stack[-1:-d-1:-1])
+            del stack[-d:]
+            stack.append(Shape._from_sorted(children))
+
+    return stack[0]
+
+
+def sort_key(t):
+    """
+    Returns the key of t to be used to sort `Shape` (or `PhyloTree`) instances, as in `sorted(ts, key=sort_key)`.
+    :return: `bytes` instance, or `tuple` instance for `PhyloTree` instances.
+    """
+    return t.sort_key()
+
+
 def is_binary(t):
     """
     Returns True if t is a binary shape.
     :return: `bool` instance
     """
-    return t.is_leaf() or \
-        (len(t.children) == 2 and all(is_binary(ch) for ch in t.children))
+    return all(s.is_leaf() or len(s.children) == 2 for s in iter_preorder(t))
 
 
 def count_leaves(t):
@@ -171,10 +305,15 @@ def count_leaves(t):
     Returns the number of leaves in t.
     :return: `int` instance.
     """
-    if t.is_leaf():
-        return 1
-    else:
-        return sum(count_leaves(t) for t in t.children)
+    return t.leaf_count
+
+
+def count_nodes(t):
+    """
+    Returns the number of nodes (leaves included) in t.
+    :return: `int` instance.
+    """
+    return t.node_count
 
 
 def get_depth(t):
@@ -183,10 +322,7 @@ def get_depth(t):
     of its furthest leaves.
     :return: `int` instance.
     """
-    if t.is_leaf():
-        return 0
-    else:
-        return max(get_depth(ch) for ch in t.children) + 1
+    return t.height
 
 
 def leaf_depths(t):
@@ -194,12 +330,9 @@ def leaf_depths(t):
     Returns a generator of integers representing the depth of each leaf in the tree
     :return: generator of integers
     """
-    if t.is_leaf():
-        yield 0
-    else:
-        for ch in t.children:
-            for depth in leaf_depths(ch):
-                yield depth+1
+    for s, depth in iter_preorder_with_depth(t):
+        if s.is_leaf():
+            yield depth
 
 
 def get_leaf_depths(t):
@@ -214,21 +347,14 @@ def count_nodes_by_depth(t):
     total_depth = get_depth(t)
     nodes_by_depth = [0]*(total_depth+1)
 
-    def navigate(t2, d):
-        if not t2.is_leaf():
-            d1 = d+1
-            nodes_by_depth[d1] += len(t2.children)
-
-            for ch in t2.children:
-                navigate(ch, d1)
+    for _, d in iter_preorder_with_depth(t):
+        nodes_by_depth[d] += 1
 
-    nodes_by_depth[0] += 1
-    navigate(t, 0)
     return nodes_by_depth
 
 
 def root_join(ts):
-    return Shape(sorted(ts))
+    return Shape(ts)
 
 
 def rooted_deg(t):
@@ -1,64 +1,610 @@
+from collections import Counter
 from functools import lru_cache
-from sympy import simplify
+from math import factorial, log
+from multiprocessing import Pool
+import random
 
+import numpy as np
+
+from sympy.polys.domains import ZZ
+from sympy.polys.fields import field
+
+from biotrees.probability import ProbabilityTable, RationalFunction, Polynomials, alpha, gamma
 from biotrees.shape import Shape, count_leaves
+from biotrees.shape.compact import forest_from_parents
 from biotrees.shape.generator import add_leaf_to_edge, add_leaf_to_node, iter_replace_tree_at
-from biotrees.util import and_then, parametric_total_probabilities
+from biotrees.traversal import fold, iter_preorder
 
 
-import sys
-sys.setrecursionlimit(2000)
+_Fractions, _fractions_alpha, _fractions_gamma = field('a, c', ZZ)
 
 
-@and_then(parametric_total_probabilities)
-def alphagamma_from_t(t, prob):
+def _alphagamma_insertions(t):
     """
-    Returns a list of tuples containing each shape obtained from `Shape` sh (assuming sh has probability prob) with
-    their associate probability under the Alpha-Gamma model.
-    :param sh: `Shape` instance.
-    :param prob: `function` instance.
-    :return: `list` instance.
+    Returns a `dict` that maps each `Shape` instance obtained from t by adding a new leaf to the weight, an element of
+    `Polynomials`, with which the Alpha-Gamma model adds it: 1 - alpha for each pendant edge, gamma for each interior
+    edge (including the root edge) and (k-1)*alpha - gamma for each interior node with k children. The weights of a
+    tree with n leaves add up to n - alpha.
+    :param t: `Shape` instance.
+    :return: `dict` instance.
+    """
+    def leaf(s):
+        return {Shape.CHERRY: 1 - alpha}
+
+    def node(s, insertions):
+        ws = {}
+
+        for i, ins in enumerate(insertions):
+            if i > 0 and s.children[i] == s.children[i-1]:
+                continue
+
+            # all the children equal to this one give the same trees
+            mult = sum(1 for ch in s.children if ch == s.children[i])
+
+            for ti, w in ins.items():
+                t2 = Shape(list(iter_replace_tree_at(s.children, i, ti)))
+                ws[t2] = ws.get(t2, Polynomials(0)) + mult * w
+
+        e = add_leaf_to_edge(s)
+        ws[e] = ws.get(e, Polynomials(0)) + gamma
+        v = add_leaf_to_node(s)
+        ws[v] = ws.get(v, Polynomials(0)) + (len(s.children) - 1) * alpha - gamma
+        return ws
+
+    return fold(t, leaf, node, shared=True)
+
+
+def alphagamma_from_t(t, prob=1):
+    """
+    Returns a `ProbabilityTable` with each shape obtained from `Shape` t (assuming t has probability prob) and their
+    associate probability under the Alpha-Gamma model.
+    :param t: `Shape` instance.
+    :param prob: `RationalFunction` instance, or a number.
+    :return: `ProbabilityTable` instance.
     """
     n = count_leaves(t)
-    if t.is_leaf():
-        return [(add_leaf_to_edge(t), lambda a, c: simplify(prob(a, c) * (1 - a) / (n - a)))]
-    else:
-        for i in range(len(t.children)):
-            k = count_leaves(t.children[i])
-            if n > 1:
-                p_times_m = lambda a, c, k=k: simplify(prob(a, c) * (k - a) / (n - a))
-            else:
-                p_times_m = prob
-            for ti, q in alphagamma_from_t(t.children[i], p_times_m):
-                ts2 = list(iter_replace_tree_at(t.children, i, ti))
-                yield (Shape(ts2), q)
-
-        yield (add_leaf_to_edge(t), lambda a, c: simplify(prob(a, c) * c / (n - a)))
-
-        k = len(t.children)
-        if k > 1:
-            prob2 = lambda a, c, k=k: simplify(prob(a, c) * ((k - 1) * a - c) / (n - a))
-        else:
-            prob2 = prob
+    d = n - alpha
 
-        yield (add_leaf_to_node(t), prob2)
+    return ProbabilityTable((t2, prob * RationalFunction(w, d)) for t2, w in _alphagamma_insertions(t).items())
 
 
 @lru_cache(maxsize=None)
-@and_then(parametric_total_probabilities)
 def alphagamma(n):
     """
-    Returns a list of tuples containing all the shapes of n leaves that can be obtained under the Alpha-Gamma model and
-    their corresponding probability.
+    Returns a `ProbabilityTable` with all the shapes of n leaves that can be obtained under the Alpha-Gamma model and
+    their corresponding probability, as `RationalFunction` instances of alpha (`a`) and gamma (`c`) with the common
+    denominator (2-a)(3-a)...(n-1-a).
     :param n: `int` instance.
-    :return: `list` instance.
+    :return: `ProbabilityTable` instance.
     """
     if n <= 0:
-        pass
+        return ProbabilityTable()
     elif n == 1:
-        yield (Shape.LEAF, lambda a, c: 1)
-    elif n == 2:
-        yield (Shape([Shape.LEAF, Shape.LEAF]), lambda a, c: 1)
+        return ProbabilityTable([(Shape.LEAF, RationalFunction(1))])
+
+    numerators = {Shape.CHERRY: Polynomials(1)}
+    d = Polynomials(1)
+
+    for k in range(2, n):
+        nums = {}
+
+        for t, p in numerators.items():
+            for t2, w in _alphagamma_insertions(t).items():
+                nums[t2] = nums.get(t2, Polynomials(0)) + p * w
+
+        numerators = nums
+        d *= k - alpha
+
+    return ProbabilityTable((t, RationalFunction(p, d)) for t, p in numerators.items())
+
+
+@lru_cache(maxsize=None)
+def compiled_alphagamma(n):
+    """
+    Returns the `CompiledTable` of `alphagamma(n)`, which evaluates the probabilities of all the shapes of n leaves at
+    whole arrays of values of alpha and gamma at once; for instance, `compiled_alphagamma(n).evaluate(a, c)` with
+    a, c = numpy.meshgrid(...) gives their probabilities over a grid of the parameters.
+    :param n: `int` instance.
+    :return: `CompiledTable` instance.
+    """
+    return alphagamma(n).compile()
+
+
+def sim_alphagamma(n, alpha, gamma, rng=random):
+    """
+    Returns a random `Shape` with n leaves under the Alpha-Gamma model, grown with the insertion weights of
+    `_alphagamma_insertions` in O(1) time per leaf. The k leaves of the tree weigh k(1-alpha) in total and its interior
+    nodes, together with the edges that end at them, weigh (d-1)alpha each (d being its number of children), which adds
+    up to (k-1)alpha. So we first choose between leaves and interior nodes; a uniform leaf is taken from the list of
+    leaves, and an interior node with probability proportional to d-1 from a list in which each one appears d-1 times.
+    Then the new leaf goes to the edge that ends at the node with probability gamma/((d-1)alpha), or to the node itself.
+    :param n: `int` instance.
+    :param alpha: `float` instance.
+    :param gamma: `float` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: `Shape` instance.
+    """
+    assert n >= 1 and 0 <= gamma <= alpha <= 1
+    parents = [-1]
+    degrees = [0]
+    lvs = [0]
+    extra = []
+
+    for k in range(1, n):
+        x = len(parents)
+
+        if k == 1 or rng.random() * (k - alpha) < k * (1 - alpha):
+            v = lvs[rng.randrange(k)]
+            on_edge = True
+        else:
+            v = extra[rng.randrange(k-1)]
+            on_edge = rng.random() * (degrees[v] - 1) * alpha < gamma
+
+        if on_edge:
+            w = x + 1
+            parents.extend((w, parents[v]))
+            degrees.extend((0, 2))
+            parents[v] = w
+            extra.append(w)
+        else:
+            parents.append(v)
+            degrees.append(0)
+            degrees[v] += 1
+            extra.append(v)
+
+        lvs.append(x)
+
+    children = [[] for _ in parents]
+    for v, p in enumerate(parents):
+        if p >= 0:
+            children[p].append(v)
+
+    # the children of a node are built before it if we visit the nodes in the reverse of the preorder
+    order = []
+    stack = [parents.index(-1)]
+    while stack:
+        v = stack.pop()
+        order.append(v)
+        stack.extend(children[v])
+
+    built = [None] * len(parents)
+    for v in reversed(order):
+        built[v] = Shape([built[w] for w in children[v]]) if children[v] else Shape.LEAF
+
+    return built[order[0]]
+
+
+def sim_alphagamma_forest(n, size, alpha, gamma, rng=None):
+    """
+    Returns a `CompactForest` with size independent random trees with n leaves under the Alpha-Gamma model, simulated
+    all at once with NumPy with the same steps as `sim_alphagamma`, each of them a few vectorized draws.
+    :param n: `int` instance.
+    :param size: `int` instance.
+    :param alpha: `float` instance.
+    :param gamma: `float` instance.
+    :param rng: `numpy.random.Generator` instance, or a seed for `numpy.random.default_rng`.
+    :return: `CompactForest` instance.
+    """
+    assert n >= 1 and 0 <= gamma <= alpha <= 1
+    rng = np.random.default_rng(rng)
+    rows = np.arange(size)
+
+    parents = np.full((size, 2*n - 1), -1, dtype=np.int32)
+    degrees = np.zeros((size, 2*n - 1), dtype=np.int32)
+    lvs = np.zeros((size, n), dtype=np.int32)
+    extra = np.zeros((size, max(n - 1, 1)), dtype=np.int32)
+    used = np.ones(size, dtype=np.int32)
+
+    for k in range(1, n):
+        to_leaf = rng.random(size) * (k - alpha) < k * (1 - alpha) if k > 1 else np.ones(size, dtype=bool)
+        v = np.where(to_leaf, lvs[rows, rng.integers(0, k, size=size)],
+                     extra[rows, rng.integers(0, max(k - 1, 1), size=size)])
+        on_edge = to_leaf | (rng.random(size) * (degrees[rows, v] - 1) * alpha < gamma)
+
+        x = used
+        e, w, ve = rows[on_edge], x[on_edge] + 1, v[on_edge]
+        parents[e, w] = parents[e, ve]
+        parents[e, ve] = w
+        parents[e, x[on_edge]] = w
+        degrees[e, w] = 2
+
+        nd, vn = rows[~on_edge], v[~on_edge]
+        parents[nd, x[~on_edge]] = vn
+        degrees[nd, vn] += 1
+
+        extra[:, k-1] = np.where(on_edge, x + 1, v)
+        lvs[:, k] = x
+        used = used + 1 + on_edge
+
+    return forest_from_parents(parents, used)
+
+
+def _split_probability(ns, a, c):
+    """
+    Returns the probability under the Alpha-Gamma model with parameters a and c that the root of a tree with sum(ns)
+    leaves has a child with ns[i] leaves for each i.
+
+    The root split evolves as follows: a new leaf grows the subtree with m leaves with weight m-a, becomes a new child
+    of the root with weight (k-1)a-c (k being the number of children) and hangs, together with the whole tree of m
+    leaves, from a new root with weight c. Therefore, if the last new root appears when the tree has m leaves (m = 1
+    meaning the initial cherry), its child with m leaves grows to some child A of the final root, its other child to
+    some child B, and the remaining children are created afterwards one by one, as the tables of a Chinese restaurant
+    process. Every factor below is a ratio of comparable magnitude, so that floating point values do not overflow.
+    :param ns: `list` instance.
+    :param a: the value of alpha.
+    :param c: the value of gamma.
+    :return: the probability, computed with the arithmetic of a and c.
+    """
+    n = sum(ns)
+    k = len(ns)
+    mults = Counter(ns)
+    one = 0*a + 1
+
+    if n == 2:
+        # the initial cherry
+        return one
+
+    def grow(m):
+        # (1-a)(2-a)...(m-1-a) / (m-1)!
+        r = one
+        for i in range(1, m):
+            r = r * (i - a) / i
+        return r
+
+    # the children created afterwards, in order, with weights a-c, 2a-c, ..., (k-2)a-c
+    new_children = one
+    for j in range(1, k-1):
+        new_children = new_children * (j*a - c) / j
+
+    p = 0
+
+    for na in mults:
+        for nb in mults:
+            if na == nb and mults[na] < 2:
+                continue
+
+            rest = mults.copy()
+            rest[na] -= 1
+            rest[nb] -= 1
+            rest = +rest  # drops the sizes that no other child has
+
+            pc = new_children * grow(nb) * (factorial(k-2) // _multinomial_denominator(rest))
+            for nc, mc in rest.items():
+                pc = pc * (grow(nc) / nc)**mc
+
+            # g = (n-m-1)! / (na-m)! / ((na-a)(na+1-a)...(n-1-a)) for m = 1, ..., na;
+            # the factor 1-a of the cases m = 1 cancels the factor 1/(1-a) of g when na = 1
+            g = 1 / (n - 1 - a)
+            for i in range(max(na, 2), n-1):
+                g = g * i / (i - a)
+
+            s = g if na == 1 else (1 - a) * g
+            for m in range(1, na):
+                g = g * (na - m) / (n - m - 1)
+                s = s + c * g
+
+            p = p + pc * s
+
+    return p
+
+
+def _split_ways(t):
+    """
+    Returns the number of ways to assign the children of t to the children of a root with their numbers of leaves:
+    children with equal number of leaves can be swapped, unless they are equal.
+    :param t: `Shape` instance.
+    :return: `int` instance.
+    """
+    return _multinomial_denominator(Counter(ch.leaf_count for ch in t.children)) \
+        // _multinomial_denominator(Counter(t.children))
+
+
+def _multinomial_denominator(mults):
+    d = 1
+    for m in mults.values():
+        d *= factorial(m)
+    return d
+
+
+def alphagamma_probability(t, a=alpha, c=gamma):
+    """
+    Returns the probability of t under the Alpha-Gamma model with parameters a and c, without generating any other
+    shape: the model is Markov branching, so it is the product over the interior nodes of t of the probability of the
+    number of leaves of their children, times the number of ways to assign their children to them. It takes
+    polynomial time in the number of leaves.
+    By default, a and c are the generators of `Polynomials` and the result is a `RationalFunction` instance; otherwise
+    the result is computed with the arithmetic of a and c (`Fraction` instances give exact results, `float` instances
+    give floating point ones).
+    :param t: `Shape` instance.
+    :param a: the value of alpha.
+    :param c: the value of gamma.
+    :return: `RationalFunction` instance, or a number.
+    """
+    symbolic = a is alpha and c is gamma
+    if symbolic:
+        a, c = _fractions_alpha, _fractions_gamma
+
+    def leaf(s):
+        return 1
+
+    def node(s, probs):
+        p = _split_probability([ch.leaf_count for ch in s.children], a, c) * _split_ways(s)
+
+        for pch in probs:
+            p = p * pch
+        return p
+
+    p = fold(t, leaf, node, shared=True)
+
+    if symbolic:
+        p = _Fractions(p)
+        return RationalFunction(Polynomials(p.numer.as_expr()), Polynomials(p.denom.as_expr()))
+    return p
+
+
+def _split_counts(ts):
+    """
+    Returns the number of times that each root split (the sorted tuple of the numbers of leaves of the children of a
+    node) appears in the interior nodes of the trees in ts, together with the sum of the logarithms of the numbers of
+    ways to assign the children of these nodes (see `_split_ways`). The log-likelihood of ts under the Alpha-Gamma model
+    only depends on them. Each distinct shape is visited once, since equal shapes (and subtrees) are the same object.
+    :param ts: iterable of `Shape` instances.
+    :return: `tuple` instance.
+    """
+    counts = Counter(ts)
+
+    # visit the shapes from the largest ones, so that the count of a shape is complete before passing it down
+    shapes = {s for t in counts for s in iter_preorder(t) if not s.is_leaf()}
+    splits = Counter()
+    log_ways = 0
+
+    for s in sorted(shapes, key=lambda s: s.node_count, reverse=True):
+        w = counts[s]
+        splits[tuple(sorted(ch.leaf_count for ch in s.children))] += w
+        log_ways += w * log(_split_ways(s))
+
+        for ch in s.children:
+            counts[ch] += w
+
+    return splits, log_ways
+
+
+def alphagamma_log_likelihood(ts, a, c):
+    """
+    Returns the log-likelihood of the parameters a and c of the Alpha-Gamma model given the trees in ts (the sum of the
+    logarithms of their probabilities). The values a and c can be `float` instances or (broadcastable) arrays of them,
+    and then so is the result; for instance, with a, c = numpy.meshgrid(...) it gives the log-likelihood over a grid.
+    It is -inf where the trees have probability 0, and nan outside the region 0 <= c <= a <= 1.
+    :param ts: iterable of `Shape` instances.
+    :param a: the value of alpha.
+    :param c: the value of gamma.
+    :return: `float` instance, or `numpy.ndarray` instance.
+    """
+    splits, log_ways = _split_counts(ts)
+    a, c = np.asarray(a, dtype=np.float64), np.asarray(c, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        l = log_ways + sum(w * np.log(_split_probability(ns, a, c)) for ns, w in splits.items())
+
+    return np.where((0 <= c) & (c <= a) & (a <= 1), l, np.nan)[()]
+
+
+class _SplitRows(object):
+    """
+    The root splits of `fit_alphagamma` laid out for `_log_likelihood_with_gradient`. `_split_probability` is a sum over
+    the choices of the numbers of leaves na and nb of the children A and B of the last new root, so every split but the
+    cherry (whose probability is 1) is expanded into a row for each choice. A row holds the index of its split, its
+    numbers of leaves and children, na, nb, the number of orders (k-2)! / prod(mc!) in which the remaining children can
+    be created, and their distinct numbers of leaves and multiplicities, padded with 1 leaf and multiplicity 0. None of
+    them depend on alpha and gamma, so they are computed once.
+    """
+    __slots__ = ('weights', 'index', 'n', 'k', 'na', 'nb', 'orders', 'rest_sizes', 'rest_mults')
+
+    def __init__(self, splits):
+        """
+        Create a new `_SplitRows` object.
+        :param splits: `list` of pairs (ns, w), w being the number of times that the root split ns appears.
+        :return: `_SplitRows` instance.
+        """
+        splits = [(ns, w) for ns, w in splits if sum(ns) > 2]
+        rows = []
+
+        for s, (ns, _) in enumerate(splits):
+            mults = Counter(ns)
+            n, k = sum(ns), len(ns)
+
+            for na in mults:
+                for nb in mults:
+                    if na == nb and mults[na] < 2:
+                        continue
+
+                    rest = mults.copy()
+                    rest[na] -= 1
+                    rest[nb] -= 1
+                    rest = +rest
+
+                    orders = factorial(k-2) // _multinomial_denominator(rest)
+                    rows.append((s, n, k, na, nb, float(orders), sorted(rest.items())))
+
+        d = max([len(r[-1]) for r in rows] + [1])
+        columns = list(zip(*rows)) if rows else [()] * 7
+
+        self.weights = np.array([w for _, w in splits], dtype=np.float64)
+        self.index, self.n, self.k, self.na, self.nb = (np.array(x, dtype=np.int64) for x in columns[:5])
+        self.orders = np.array(columns[5], dtype=np.float64)
+        self.rest_sizes = np.ones((len(rows), d), dtype=np.int64)
+        self.rest_mults = np.zeros((len(rows), d), dtype=np.int64)
+
+        for i, r in enumerate(rows):
+            for j, (nc, mc) in enumerate(r[-1]):
+                self.rest_sizes[i, j] = nc
+                self.rest_mults[i, j] = mc
+
+
+def _mul(x, y):
+    # the product of two triples (value, derivative with respect to alpha, derivative with respect to gamma)
+    return x[0] * y[0], x[1] * y[0] + x[0] * y[1], x[2] * y[0] + x[0] * y[2]
+
+
+def _log_likelihood_with_gradient(rows, a, c):
+    """
+    Returns the sum of w log p over the splits of rows, where p is the probability of each root split and w the number
+    of times that it appears, and its derivatives with respect to alpha and gamma.
+    This is `_split_probability` computed for all the rows at once: its factors that only depend on a number of leaves
+    or children are computed (with their derivatives) in tables up to the largest one, and the sum over m of the
+    products g, which do not depend on alpha and gamma, is (na-1) / (n-na) times the first of them.
+    :param rows: `_SplitRows` instance.
+    :param a: `float` instance.
+    :param c: `float` instance.
+    :return: `tuple` instance.
+    """
+    if len(rows.weights) == 0:
+        return 0., 0., 0.
+
+    a, c = float(a), float(c)
+    n, na, nb = rows.n, rows.na, rows.nb
+    big_n, big_k = int(n.max()), int(rows.k.max())
+
+    # grow(m) = (1-a)(2-a)...(m-1-a) / (m-1)!, new(k) = (a-c)(2a-c)...((k-2)a-c) / (k-2)! and
+    # h(j) = 2 3 ... j / ((2-a)(3-a)...(j-a)), with their derivatives
+    grow, grow_a = np.ones(big_n + 1), np.zeros(big_n + 1)
+    for m in range(2, big_n + 1):
+        f = (m - 1 - a) / (m - 1)
+        grow_a[m] = grow_a[m-1] * f - grow[m-1] / (m - 1)
+        grow[m] = grow[m-1] * f
+
+    new, new_a, new_c = np.ones(big_k + 1), np.zeros(big_k + 1), np.zeros(big_k + 1)
+    for k in range(3, big_k + 1):
+        j = k - 2
+        f = (j*a - c) / j
+        new_a[k] = new_a[k-1] * f + new[k-1]
+        new_c[k] = new_c[k-1] * f - new[k-1] / j
+        new[k] = new[k-1] * f
+
+    h, h_a = np.ones(big_n + 1), np.zeros(big_n + 1)
+    for j in range(2, big_n + 1):
+        f = j / (j - a)
+        h_a[j] = h_a[j-1] * f + h[j-1] * f / (j - a)
+        h[j] = h[j-1] * f
+
+    zeros = np.zeros(len(n))
+    p = _mul((new[rows.k], new_a[rows.k], new_c[rows.k]), (grow[nb] * rows.orders, grow_a[nb] * rows.orders, zeros))
+
+    for j in range(rows.rest_sizes.shape[1]):
+        nc, mc = rows.rest_sizes[:, j], rows.rest_mults[:, j]
+        f, f_a = grow[nc] / nc, grow_a[nc] / nc
+        p = _mul(p, (f**mc, np.where(mc > 0, mc * f**np.maximum(mc - 1, 0) * f_a, 0.), zeros))
+
+    # the first g = h(n-2) / (h(max(na, 2) - 1) (n-1-a)), which is positive
+    i = np.maximum(na, 2) - 1
+    g = h[n-2] / (h[i] * (n - 1 - a))
+    p = _mul(p, (g, g * (h_a[n-2] / h[n-2] - h_a[i] / h[i] + 1 / (n - 1 - a)), zeros))
+
+    # the factor 1-a of the cases m = 1 cancels with g when na = 1, and then the sum over the other m is empty
+    r = (na - 1) / (n - na)
+    p = _mul(p, (np.where(na == 1, 1., 1 - a + c*r), np.where(na == 1, 0., -1.), r))
+
+    size = len(rows.weights)
+    p, p_a, p_c = (np.bincount(rows.index, weights=x, minlength=size) for x in p)
+
+    if np.any(p <= 0):
+        return float('-inf'), 0., 0.
+
+    w = rows.weights
+    return float(w.dot(np.log(p))), float(w.dot(p_a / p)), float(w.dot(p_c / p))
+
+
+_worker_splits = None
+_worker_rows = {}
+
+
+def _init_worker(splits):
+    global _worker_splits
+    _worker_splits = splits
+
+
+def _worker_log_likelihood(args):
+    i, j, a, c = args
+    if (i, j) not in _worker_rows:
+        _worker_rows[i, j] = _SplitRows(_worker_splits[i:j])
+    return _log_likelihood_with_gradient(_worker_rows[i, j], a, c)
+
+
+def _project(a, c):
+    """
+    Returns the closest point to (a, c) in the feasible region of the Alpha-Gamma model, 0 <= c <= a <= 1.
+    :return: `tuple` instance.
+    """
+    if 0 <= c <= a <= 1:
+        return a, c
+
+    clamp = lambda x: min(max(x, 0.), 1.)
+    m = clamp((a + c) / 2)
+    candidates = [(clamp(a), 0.), (1., clamp(c)), (m, m)]
+
+    return min(candidates, key=lambda p: (p[0] - a)**2 + (p[1] - c)**2)
+
+
+def fit_alphagamma(ts, a=0.5, c=0.25, processes=None, tol=1e-10, max_iter=1000):
+    """
+    Returns the maximum likelihood estimates of the parameters alpha and gamma of the Alpha-Gamma model given the trees
+    in ts, with their log-likelihood, as a tuple (alpha, gamma, log-likelihood).
+    The trees are reduced to the number of times that each root split appears in them (see `_split_counts`), so each
+    distinct split is evaluated only once at every step, and the log-likelihood is maximized by projected gradient
+    ascent on the region 0 <= gamma <= alpha <= 1 starting at (a, c). If processes is given, the splits are evaluated
+    in parallel by a pool of that many processes.
+    :param ts: iterable of `Shape` instances.
+    :param a: `float` instance.
+    :param c: `float` instance.
+    :param processes: `int` instance, or `None`.
+    :param tol: `float` instance.
+    :param max_iter: `int` instance.
+    :return: `tuple` instance.
+    """
+    splits, log_ways = _split_counts(ts)
+    splits = sorted(splits.items())
+    total = sum(w for _, w in splits) or 1
+
+    pool = None
+    if processes is not None and processes > 1 and len(splits) > 0:
+        pool = Pool(processes, initializer=_init_worker, initargs=(splits,))
+        step = -(-len(splits) // processes)
+        chunks = [(i, min(i + step, len(splits))) for i in range(0, len(splits), step)]
     else:
-        for t, prob in alphagamma(n-1):
-            yield from alphagamma_from_t(t, prob)
+        rows = _SplitRows(splits)
+
+    def evaluate(a, c):
+        if pool is None:
+            return _log_likelihood_with_gradient(rows, a, c)
+
+        rs = pool.map(_worker_log_likelihood, [(i, j, a, c) for i, j in chunks])
+        return tuple(sum(r[i] for r in rs) for i in range(3))
+
+    try:
+        a, c = _project(a, c)
+        l, la, lc = evaluate(a, c)
+        # the step is relative to the mean log-likelihood per node, so that it does not depend on the size of ts
+        rate = 1.
+
+        for _ in range(max_iter):
+            while True:
+                a2, c2 = _project(a + rate * la / total, c + rate * lc / total)
+                l2, la2, lc2 = evaluate(a2, c2)
+
+                # sufficient increase (Armijo) condition along the projected step
+                if l2 >= l + 1e-4 * (la * (a2 - a) + lc * (c2 - c)) or rate < tol:
+                    break
+                rate /= 2
+
+            moved = abs(a2 - a) + abs(c2 - c)
+            if l2 >= l:
+                a, c, l, la, lc = a2, c2, l2, la2, lc2
+            if moved < tol:
+                break
+            rate *= 2
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return a, c, log_ways + l
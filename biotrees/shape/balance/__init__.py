@@ -4,6 +4,7 @@ from biotrees.shape.balance.qcolless import binary_qcolless_index, normalized_bi
 from biotrees.shape.balance.cophenetic import cophenetic_index, normalized_cophenetic_index
 from biotrees.shape.balance.quartets import binary_quartet_index, quartet_index, normalized_binary_quartet_index, normalized_quartet_index
 from biotrees.shape.balance.sackin import sackin_index, normalized_sackin_index
+from biotrees.shape.balance.fused import compute_indices, register_combiner, Combiner, NodeStatistics
 
 __all__ = ["is_symmetric", "count_automorphisms", "count_symmetries",
            "binary_colless_index",
@@ -15,5 +16,6 @@ __all__ = ["is_symmetric", "count_automorphisms", "count_symmetries",
            "normalized_binary_qcolless_index",
            "normalized_cophenetic_index",
            "normalized_binary_quartet_index", "normalized_quartet_index",
-           "normalized_sackin_index"
+           "normalized_sackin_index",
+           "compute_indices", "register_combiner", "Combiner", "NodeStatistics"
            ]
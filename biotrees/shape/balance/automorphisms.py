@@ -1,5 +1,6 @@
 from math import factorial
 
+from biotrees.traversal import fold
 from biotrees.shape.iso import isomorphic
 from biotrees.shape.generator import star, comb
 
@@ -19,16 +20,14 @@ def count_symmetries(t):
     Returns the number of symmetric interior nodes in t.
     :return: `int` instance.
     """
-    if t.is_leaf():
-        return 0
-    else:
-        return int(is_symmetric(t)) + sum(count_symmetries(ch) for ch in t.children)
+    return fold(t, lambda s: 0, lambda s, syms: int(is_symmetric(s)) + sum(syms), shared=True)
 
 
 def count_automorphisms(t):
-    if t.is_leaf():
-        return 1
+    return fold(t, lambda s: 1, _node_automorphisms, shared=True)
 
+
+def _node_automorphisms(t, auts):
     aut = 1
     cur_sym_class_rep = None
     cur_sym_class_aut = 1
@@ -50,7 +49,7 @@ def count_automorphisms(t):
             aut *= cur_sym_class_aut**cur_sym_class_len * factorial(cur_sym_class_len)
 
             cur_sym_class_rep = ti
-            cur_sym_class_aut = count_automorphisms(ti)
+            cur_sym_class_aut = auts[i]
             cur_sym_class_len = 1
         else:
             cur_sym_class_len += 1
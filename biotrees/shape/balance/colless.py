@@ -5,10 +5,12 @@ index and the bifurcating trees that achieve it", as well as the value of the in
 """
 
 from functools import lru_cache
+from itertools import islice
+import random
 
-from biotrees.util import unique
-from biotrees.shape import Shape, count_leaves
-from biotrees.shape.generator import comb, binary_max_balanced
+from biotrees.traversal import fold
+from biotrees.shape import Shape, count_leaves, sort_key
+from biotrees.shape.generator import comb, sum_over_binary_max_balanced, _multiset_unrank
 
 
 def binary_colless_index(tree):
@@ -17,21 +19,35 @@ def binary_colless_index(tree):
     :param tree: `Shape` instance.
     :return: `int` instance.
     """
-    def go(t):
-        if t.is_leaf():
-            return 0, 1
-
-        left, right = t.children
-        (cil, nl), (cir, nr) = go(left), go(right)
+    def go(t, values):
+        (cil, nl), (cir, nr) = values
         return abs(nl - nr) + cil + cir, nl + nr
 
-    return go(tree)[0]
+    return fold(tree, lambda t: (0, 1), go, shared=True)[0]
 
 
 def normalized_binary_colless_index(tree):
     n = count_leaves(tree)
 
-    return binary_colless_index(tree) / (binary_colless_index(max_colless(n)[0]) - binary_colless_index(binary_max_balanced(n)))
+    return binary_colless_index(tree) / (max_colless_value(n) - min_colless_value(n))
+
+
+def max_colless_value(n):
+    """
+    Returns the maximum Colless index of the binary trees with `int` n leaves, that of the comb.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return (n-1) * (n-2) // 2
+
+
+def min_colless_value(n):
+    """
+    Returns the minimum Colless index of the binary trees with `int` n leaves, that of the maximum balanced tree.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return sum_over_binary_max_balanced(n, lambda k1, k2: k2 - k1)
 
 
 def binary(n):
@@ -61,27 +77,101 @@ def last1(bn):
     return len(bn) - 1 - max(filter(lambda i : bn[i] == '1', range(0, len(bn))))
 
 
-@lru_cache(maxsize=None)
 def min_colless(n):
     """
-    Returns all the `Shape` instances that attain the minimum Colless index with `int` n leaves.
+    Returns all the `Shape` instances that attain the minimum Colless index with `int` n leaves: those of each split
+    (n1, n2) of `min_colless_root`(n), in this order, and sorted within each split. This is not the order of
+    `iter_min_colless`, which does not sort them.
     :param n: `int` instance.
     :return: `list` instance.
     """
+    if n <= 1:
+        return list(iter_min_colless(n))
 
-    if n == 0:
-        return []
-    elif n == 1:
-        return [Shape.LEAF]
-    elif n == 2:
-        return [Shape.CHERRY]
-    else:
-        tss = []
+    return [t for n1, n2 in min_colless_root(n) for t in sorted(_iter_min_colless_split(n1, n2), key=sort_key)]
+
+
+def iter_min_colless(n):
+    """
+    Yields all the `Shape` instances that attain the minimum Colless index with `int` n leaves, without repetitions:
+    for each split (n1, n2) of `min_colless_root`(n), the trees whose root has children t1 and t2 with n1 and n2 leaves
+    and minimum Colless index, with t1 before t2 in `iter_min_colless`(n1) if n1 = n2. Only the trees on the current
+    path of the recursion are kept, so the memory it takes does not depend on the number of trees.
+    :param n: `int` instance.
+    :return: generator of `Shape` instances.
+    """
+    if n == 1:
+        yield Shape.LEAF
+    elif n > 1:
         for n1, n2 in min_colless_root(n):
-            ts = unique([Shape(sorted([t1, t2])) for t1 in min_colless(n1)
-                         for t2 in min_colless(n2)])
-            tss.extend(ts)
-        return tss
+            yield from _iter_min_colless_split(n1, n2)
+
+
+def _iter_min_colless_split(n1, n2):
+    if n1 == n2:
+        # the pairs of ranks r1 <= r2 by increasing r2, as `_multiset_unrank` orders them
+        for r2, t2 in enumerate(iter_min_colless(n2)):
+            for t1 in islice(iter_min_colless(n1), r2 + 1):
+                yield Shape([t1, t2])
+    else:
+        for t1 in iter_min_colless(n1):
+            for t2 in iter_min_colless(n2):
+                yield Shape([t1, t2])
+
+
+@lru_cache(maxsize=None)
+def count_min_colless(n):
+    """
+    Returns the number of `Shape` instances that attain the minimum Colless index with `int` n leaves.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    if n <= 1:
+        return n
+
+    return sum(_count_min_colless_split(n1, n2) for n1, n2 in min_colless_root(n))
+
+
+def _count_min_colless_split(n1, n2):
+    c1 = count_min_colless(n1)
+    return c1 * (c1 + 1) // 2 if n1 == n2 else c1 * count_min_colless(n2)
+
+
+def unrank_min_colless(n, i):
+    """
+    Returns the i-th `Shape` instance yielded by `iter_min_colless`(n), without generating the previous ones.
+    :param n: `int` instance.
+    :param i: `int` instance.
+    :return: `Shape` instance.
+    """
+    assert 0 <= i < count_min_colless(n)
+
+    if n == 1:
+        return Shape.LEAF
+
+    for n1, n2 in min_colless_root(n):
+        c = _count_min_colless_split(n1, n2)
+        if i < c:
+            break
+        i -= c
+
+    if n1 == n2:
+        r1, r2 = _multiset_unrank(i, count_min_colless(n1), 2)
+    else:
+        r1, r2 = divmod(i, count_min_colless(n2))
+
+    return Shape([unrank_min_colless(n1, r1), unrank_min_colless(n2, r2)])
+
+
+def random_min_colless(n, rng=random):
+    """
+    Returns a `Shape` instance with n leaves chosen uniformly at random among those that attain the minimum Colless
+    index.
+    :param n: `int` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: `Shape` instance.
+    """
+    return unrank_min_colless(n, rng.randrange(count_min_colless(n)))
 
 
 @lru_cache(maxsize=None)
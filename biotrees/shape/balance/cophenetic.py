@@ -4,30 +4,45 @@ Francesc Rosselló and Lucía Rotger in their paper "A new balance index for phy
 the index in a given tree.
 """
 
-from biotrees.util import binom2
+from biotrees.traversal import fold
+from biotrees.util import binom, binom2
 from biotrees.shape import count_leaves
-from biotrees.shape.generator import comb, binary_max_balanced
+from biotrees.shape.generator import comb, binary_max_balanced, sum_over_binary_max_balanced
 
 
 def cophenetic_index(tree):
-    def go(t):
-        if t.is_leaf():
-            return 0, 1
-
-        cophs, kappas = zip(*map(go, t.children))
+    def go(t, values):
+        cophs, kappas = zip(*values)
         kappa = sum(kappas)
         coph = binom2(kappa) + sum(cophs)
         return coph, kappa
 
-    if tree.is_leaf():
-        return 0
-    else:
-        return sum(go(ch)[0] for ch in tree.children)
+    # go counts the root too, which does not contribute to the index
+    coph, kappa = fold(tree, lambda t: (0, 1), go, shared=True)
+    return coph - binom2(kappa)
 
 def normalized_cophenetic_index(tree):
     n = count_leaves(tree)
 
-    return cophenetic_index(tree) / (cophenetic_index(max_cophenetic(n)[0]) - cophenetic_index(min_cophenetic(n)[0]))
+    return cophenetic_index(tree) / (max_cophenetic_value(n) - min_cophenetic_value(n))
+
+
+def max_cophenetic_value(n):
+    """
+    Returns the maximum Cophenetic index of the binary trees with `int` n leaves, that of the comb: binom(n, 3).
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return binom(n, 3)
+
+
+def min_cophenetic_value(n):
+    """
+    Returns the minimum Cophenetic index of the binary trees with `int` n leaves, that of the maximum balanced tree.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return sum_over_binary_max_balanced(n, lambda k1, k2: binom2(k1) + binom2(k2))
 
 
 def max_cophenetic(n):
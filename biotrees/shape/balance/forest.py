@@ -0,0 +1,366 @@
+"""
+This computes balance indices of all the trees of a `CompactForest` at once, with NumPy, returning a vector with the
+value of the index in each tree.
+
+The number of leaves (kappa) of every node is accumulated level by level: the nodes of all the trees are grouped by
+their height, the leaves first, and the values of the nodes of each level are added to their parents in a single
+vectorized step, so it takes as many steps as the largest depth in the forest and time linear in its number of nodes.
+The indices then add, for each tree, a contribution of each node computed from the kappas of its children.
+`forest_indices` computes the levels and the kappas once for several indices.
+
+The values are `int64`, except for the quartet indices, which grow like the fourth power of the number of leaves:
+their nodes are computed with Python integers when they could overflow `int64`, which happens for trees with some
+tens of thousands of leaves.
+"""
+
+import numpy as np
+
+
+class _ForestNodes(object):
+    """
+    The global parents, the degrees, the levels and the kappas of the nodes of a `CompactForest`, with the array of the
+    nodes other than the roots and the array of their parents. The parents of the nodes of each level are given as
+    themselves, if the level is large, or as the pair of the array of the distinct ones and the position of the parent
+    of each node in it, so that adding the values of a level to its parents takes time proportional to its size.
+    """
+    __slots__ = ('forest', 'parents', 'nonroot', 'child_parents', 'degrees', 'levels', 'level_parents', 'kappas',
+                 '_binary_children')
+
+    def __init__(self, f):
+        self.forest = f
+        self.parents = f.global_parents()
+        self.nonroot = np.flatnonzero(self.parents >= 0)
+        self.child_parents = self.parents[self.nonroot]
+        self.degrees = np.bincount(self.child_parents, minlength=len(self.parents))
+        self.levels = _levels(self.parents, self.degrees)
+        self.level_parents = [self.parents[level] if 8 * len(level) > len(self.parents)
+                              else np.unique(self.parents[level], return_inverse=True)
+                              for level in self.levels]
+        self.kappas = self.subtree_sums(self.degrees == 0)
+        self._binary_children = _UNKNOWN
+
+    def binary_children(self):
+        """
+        Returns the triple of the array of the interior nodes and the arrays of the kappas of their two children, or
+        None if some interior node does not have two children. It is computed the first time it is requested.
+        """
+        if self._binary_children is _UNKNOWN:
+            interior = np.flatnonzero(self.degrees)
+
+            if len(interior) > 0 and (self.degrees.max() != 2 or len(self.nonroot) != 2 * len(interior)):
+                self._binary_children = None
+            else:
+                # the last child of each node, and then the other one
+                child = np.zeros(len(self.parents), dtype=np.int64)
+                child[self.child_parents] = self.nonroot
+                ks = self.kappas[child[interior]]
+                self._binary_children = interior, ks, self.kappas[interior] - ks
+
+        return self._binary_children
+
+    def subtree_sums(self, values):
+        """
+        Returns, for each node, the sum of values over the nodes of the subtree rooted at it.
+        """
+        sums = np.array(_integer_array(values))
+        size = len(sums)
+
+        for level, ps in zip(self.levels, self.level_parents):
+            if isinstance(ps, tuple):
+                ps, positions = ps
+                sums[ps] += _sum_at(positions, sums[level], len(ps))
+            else:
+                sums += _sum_at(ps, sums[level], size)
+
+        return sums
+
+    def children_sums(self, values):
+        """
+        Returns, for each node, the sum of values over its children, given the values of the nodes in nonroot.
+        """
+        return _sum_at(self.child_parents, _integer_array(values), len(self.parents))
+
+    def tree_sums(self, values):
+        """
+        Returns, for each tree, the sum of values over its nodes.
+        """
+        if len(self.forest) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.add.reduceat(_integer_array(values), self.forest.offsets[:-1])
+
+
+def _integer_array(values):
+    # Python integers (for values that would overflow int64) and weights given as floats are kept
+    values = np.asarray(values)
+    return values if values.dtype == object or values.dtype.kind == 'f' else values.astype(np.int64, copy=False)
+
+
+def _sum_at(index, values, size):
+    """
+    Returns the array of the given size whose i-th element is the sum of the values whose index is i, as `np.add.at`
+    on an array of zeros does. `numpy.bincount` is much faster, but it adds in float64: it is used for floats and for
+    integers that add up to less than 2^52 (the values of the kernels are not negative), whose sums it computes
+    exactly.
+    """
+    if values.dtype.kind == 'f':
+        return np.bincount(index, weights=values, minlength=size)
+
+    if values.dtype != object and values.sum(dtype=np.float64) < 2**52:
+        return np.bincount(index, weights=values, minlength=size).astype(np.int64)
+
+    sums = np.zeros(size, dtype=values.dtype)
+    np.add.at(sums, index, values)
+    return sums
+
+
+def _exact(nodes, values, factor=1):
+    """
+    Returns values, which are kappas of nodes, as Python integers if factor times the fourth power of the largest kappa
+    does not fit in `int64`, so that the quartet indices computed from them do not overflow.
+    """
+    if len(nodes.kappas) > 0 and int(nodes.kappas.max())**4 * factor >= 2**63:
+        return values.astype(object)
+
+    return values
+
+
+_UNKNOWN = object()
+
+
+def _levels(parents, degrees):
+    """
+    Returns the list of the arrays of the nodes other than the roots at each height: the leaves, the nodes whose
+    children are all leaves, and so on. A node joins a level when the last of its children has been placed in the
+    previous one.
+    """
+    pending = degrees.copy()
+    slot = np.zeros(len(parents), dtype=np.int64)
+
+    levels = []
+    level = np.flatnonzero(degrees == 0)
+
+    while len(level) > 0:
+        level = level[parents[level] >= 0]
+        levels.append(level)
+        ps = parents[level]
+
+        if 8 * len(ps) > len(parents):
+            counts = np.bincount(ps, minlength=len(parents))
+            pending -= counts
+            level = np.flatnonzero((counts > 0) & (pending == 0))
+        else:
+            np.subtract.at(pending, ps, 1)
+            ps = ps[pending[ps] == 0]
+
+            # a parent appears once for each of its children in the level: only one of them is kept
+            ks = np.arange(len(ps))
+            slot[ps] = ks
+            level = ps[slot[ps] == ks]
+
+    return levels
+
+
+def forest_kappas(f):
+    """
+    Returns the number of leaves of the subtree rooted at each node of f.
+    :param f: `CompactForest` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    return _ForestNodes(f).kappas
+
+
+def _sackin(nodes):
+    # the depth of a leaf is the number of its ancestors other than the root
+    return nodes.tree_sums(np.where(nodes.parents >= 0, nodes.kappas, 0))
+
+
+def _binary_colless_differences(nodes):
+    children = nodes.binary_children()
+    assert children is not None, 'the trees must be binary'
+
+    interior, k1, k2 = children
+    differences = np.zeros(len(nodes.parents), dtype=np.int64)
+    differences[interior] = np.abs(k1 - k2)
+    return differences
+
+
+def _binary_colless(nodes):
+    return nodes.tree_sums(_binary_colless_differences(nodes))
+
+
+def _binary_qcolless(nodes):
+    return nodes.tree_sums(_binary_colless_differences(nodes)**2)
+
+
+def _cophenetic(nodes):
+    kappas = nodes.kappas
+    return nodes.tree_sums(np.where(nodes.parents >= 0, kappas * (kappas - 1) // 2, 0))
+
+
+def _binary_quartet_values(nodes, interior, k1, k2):
+    # binom2(k1) binom2(k2) for the kappas k1, k2 of the two children of each interior node
+    values = np.zeros(len(nodes.parents), dtype=object if k1.dtype == object else np.int64)
+    values[interior] = (k1 * (k1 - 1) // 2) * (k2 * (k2 - 1) // 2)
+    return values
+
+
+def _binary_quartet(nodes):
+    children = nodes.binary_children()
+
+    if children is not None:
+        interior, k1, k2 = children
+        return nodes.tree_sums(_binary_quartet_values(nodes, interior, _exact(nodes, k1), _exact(nodes, k2)))
+
+    kappas = _exact(nodes, nodes.kappas[nodes.nonroot])
+    bs = kappas * (kappas - 1) // 2
+    b1 = nodes.children_sums(bs)
+    b2 = nodes.children_sums(bs * bs)
+    return nodes.tree_sums((b1 * b1 - b2) // 2)
+
+
+def _binary_trees_quartet(nodes, vs, interior, k1, k2):
+    # the only quartets of binary trees are the comb, which quartet_index only counts in the nodes that are a comb with
+    # 4 leaves, and the balanced one, which is counted in the nodes whose children have at least 2 leaves each
+    factor = 4 * max(1, abs(vs[3]))
+    values = vs[3] * _binary_quartet_values(nodes, interior, _exact(nodes, k1, factor), _exact(nodes, k2, factor))
+    combs = interior[(k1 + k2 == 4) & (k1 * k2 == 3)]
+    values = values.astype(np.result_type(values, np.asarray(vs[0])))
+    values[combs] = vs[0]
+    return nodes.tree_sums(values)
+
+
+def _quartet(nodes, vs=range(5)):
+    children = nodes.binary_children()
+    if children is not None:
+        return _binary_trees_quartet(nodes, vs, *children)
+
+    kappas = _exact(nodes, nodes.kappas, 4 * max([1] + [abs(v) for v in vs]))
+    ks = kappas[nodes.nonroot]
+    ks2 = ks * ks
+    p2, p3, p4 = (nodes.children_sums(x) for x in (ks2, ks2 * ks, ks2 * ks2))
+
+    # only the nodes with at least 3 leaves contribute; the kappas of their children add up to p1
+    nodes3 = np.flatnonzero(nodes.kappas >= 3)
+    p1, p2, p3, p4 = kappas[nodes3], p2[nodes3], p3[nodes3], p4[nodes3]
+
+    # the elementary symmetric polynomials of the kappas of the children
+    e2 = (p1*p1 - p2) // 2
+    e3 = (p1*p1*p1 - 3*p1*p2 + 2*p3) // 6
+    e4 = (e3*p1 - e2*p2 + p1*p3 - p4) // 4
+
+    # the number of triples of leaves below each node whose subtree is a star
+    triples = np.zeros(len(kappas), dtype=kappas.dtype)
+    triples[nodes3] = e3
+    triples = nodes.subtree_sums(triples)
+    kt = nodes.children_sums(ks * triples[nodes.nonroot])[nodes3]
+    t1 = triples[nodes3] - e3
+
+    # with a_i = binom2(k_i): s1 = sum of a_i e2(the other kappas), s3 = sum of a_i a_j with i < j
+    a1, a2, a3 = (p2 - p1) // 2, (p3 - p2) // 2, (p4 - p3) // 2
+    s1 = e2*a1 - p1*a2 + a3
+    s2 = p1*t1 - kt
+    s3 = (a1*a1 - (p4 - 2*p3 + p2) // 4) // 2
+    s4 = e4
+
+    values = np.where(p1 >= 4, vs[1]*s1 + vs[2]*s2 + vs[3]*s3 + vs[4]*s4, 0)
+
+    # quartet_index gives the weight of the first quartet shape to the nodes that are that shape (a leaf and a comb with
+    # 3 leaves as children) and computes the rest
+    parents, degrees = nodes.parents, nodes.degrees
+    q0 = np.zeros(len(kappas), dtype=bool)
+    q0[nodes3] = (p1 == 4) & (degrees[nodes3] == 2) & (p2 == 10)
+    big = np.flatnonzero((parents >= 0) & (nodes.kappas == 3))
+    big = big[q0[parents[big]]]
+    q0[parents[big]] = degrees[big] == 2
+    values = np.where(q0[nodes3], vs[0], values)
+
+    node_values = np.zeros(len(kappas), dtype=values.dtype)
+    node_values[nodes3] = values
+    return nodes.tree_sums(node_values)
+
+
+_kernels = {
+    'sackin': _sackin,
+    'binary_colless': _binary_colless,
+    'binary_qcolless': _binary_qcolless,
+    'cophenetic': _cophenetic,
+    'binary_quartet': _binary_quartet,
+    'quartet': _quartet,
+}
+
+
+def forest_indices(f, indices=None):
+    """
+    Returns a `dict` from the name of each index in indices to the vector of its values in the trees of f, computing
+    the kappas of the forest once for all of them. The names are those of `compute_indices`: 'sackin',
+    'binary_colless', 'binary_qcolless', 'cophenetic', 'binary_quartet' and 'quartet'; if indices is None, all of them
+    are computed. The Colless indices require every tree of f to be binary.
+    :param f: `CompactForest` instance.
+    :param indices: iterable of `str` instances, or `None`.
+    :return: `dict` instance.
+    """
+    names = list(_kernels if indices is None else indices)
+    kernels = [_kernels[name] for name in names]
+    nodes = _ForestNodes(f)
+    return {name: kernel(nodes) for name, kernel in zip(names, kernels)}
+
+
+def forest_sackin_index(f):
+    """
+    Returns the Sackin index of each tree of f: the sum of the depths of its leaves.
+    :param f: `CompactForest` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    return _sackin(_ForestNodes(f))
+
+
+def forest_binary_colless_index(f):
+    """
+    Returns the Colless index of each tree of f, which must be binary.
+    :param f: `CompactForest` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    return _binary_colless(_ForestNodes(f))
+
+
+def forest_binary_qcolless_index(f):
+    """
+    Returns the Quadratic Colless index of each tree of f, which must be binary.
+    :param f: `CompactForest` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    return _binary_qcolless(_ForestNodes(f))
+
+
+def forest_cophenetic_index(f):
+    """
+    Returns the Cophenetic index of each tree of f: the sum of binom2(kappa) over its nodes other than the root.
+    :param f: `CompactForest` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    return _cophenetic(_ForestNodes(f))
+
+
+def forest_binary_quartet_index(f):
+    """
+    Returns the binary rooted quartet index of each tree of f, as `binary_quartet_index` does: the sum over its nodes
+    of the products binom2(k1) binom2(k2) of the kappas of each pair of children, which is
+    ((sum of binom2(k))^2 - sum of binom2(k)^2) / 2.
+    :param f: `CompactForest` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    return _binary_quartet(_ForestNodes(f))
+
+
+def forest_quartet_index(f, vs=range(5)):
+    """
+    Returns the rooted quartet index of each tree of f with weights vs, as `quartet_index` does. The sums over the
+    triples and quadruples of children of each node are computed from the power sums p_j of the kappas of its children
+    with Newton's identities, so every node takes constant time after the kappas of the forest are known. If all the
+    trees are binary, only the two binary quartets appear and the power sums are not needed.
+    :param f: `CompactForest` instance.
+    :param vs: sequence of the 5 weights.
+    :return: `numpy.ndarray` instance.
+    """
+    return _quartet(_ForestNodes(f), vs)
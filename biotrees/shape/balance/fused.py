@@ -0,0 +1,235 @@
+"""
+This computes several balance indices of a tree in a single postorder traversal, instead of one traversal per index.
+
+Every index is computed by a `Combiner`, which gives a value to each leaf and computes the value of each interior node
+from the values of its children. The traversal also computes, for every node, its `NodeStatistics`: its number of
+leaves (kappa), its height and the sum of the depths and of the squared depths of its leaves, which are passed to the
+combiners. The combiners are registered by name, with `register_combiner`, so new indices join the same traversal.
+"""
+
+from fractions import Fraction
+
+from biotrees.traversal import fold
+from biotrees.util import binom2
+from biotrees.shape.balance.automorphisms import is_symmetric, _node_automorphisms
+from biotrees.shape.balance.quartets import _quartet_node
+
+
+class NodeStatistics(object):
+    """
+    A `NodeStatistics` instance holds the number of leaves (kappa) of the subtree rooted at a node, its height and the
+    sum of the depths and of the squared depths of its leaves, measured from the node.
+    """
+    __slots__ = ('kappa', 'height', 'depth_sum', 'depth_square_sum')
+
+    def __init__(self, kappa, height, depth_sum, depth_square_sum):
+        self.kappa = kappa
+        self.height = height
+        self.depth_sum = depth_sum
+        self.depth_square_sum = depth_square_sum
+
+    @staticmethod
+    def combine(stats):
+        """
+        Returns the `NodeStatistics` of a node whose children have the given ones: the depth of a leaf from the node is
+        1 plus its depth from its child, so sum(d+1) = sum(d) + kappa and sum((d+1)^2) = sum(d^2) + 2 sum(d) + kappa.
+        :param stats: `list` of `NodeStatistics` instances.
+        :return: `NodeStatistics` instance.
+        """
+        kappa = height = depth_sum = depth_square_sum = 0
+
+        for s in stats:
+            kappa += s.kappa
+            height = max(height, s.height)
+            depth_sum += s.depth_sum + s.kappa
+            depth_square_sum += s.depth_square_sum + 2*s.depth_sum + s.kappa
+
+        return NodeStatistics(kappa, height + 1, depth_sum, depth_square_sum)
+
+    def __repr__(self):
+        return 'NodeStatistics(kappa={}, height={}, depth_sum={}, depth_square_sum={})'.format(
+            self.kappa, self.height, self.depth_sum, self.depth_square_sum)
+
+
+_LEAF_STATISTICS = NodeStatistics(1, 0, 0, 0)
+
+
+class Combiner(object):
+    """
+    A `Combiner` instance computes an index in the traversal of `compute_indices`: leaf() is the value of a leaf,
+    node(t, values, stats) the value of an interior node t, given the list of the values and the list of the
+    `NodeStatistics` of its children, and result(value, stats) the index of the tree, given the value and the
+    `NodeStatistics` of its root. The values must depend only on the subtree rooted at each node.
+    By default the index is the value of the root, and indices that only depend on the statistics of the root need no
+    values at all. An index that is not defined for some trees (as the Colless indices for binary trees) has the value
+    None in them.
+    """
+
+    def leaf(self):
+        return None
+
+    def node(self, t, values, stats):
+        return None
+
+    def result(self, value, stats):
+        return value
+
+
+class _StatisticCombiner(Combiner):
+    def __init__(self, f):
+        self.f = f
+
+    def result(self, value, stats):
+        return self.f(stats)
+
+
+class _KappaSumCombiner(Combiner):
+    """
+    Adds f(kappas) over the interior nodes, kappas being the numbers of leaves of the children of each node. If binary
+    is True, the index is only defined for binary trees.
+    """
+    def __init__(self, f, binary=False):
+        self.f = f
+        self.binary = binary
+
+    def leaf(self):
+        return 0
+
+    def node(self, t, values, stats):
+        if self.binary and (len(stats) != 2 or None in values):
+            return None
+
+        return sum(values) + self.f([s.kappa for s in stats])
+
+
+class _CopheneticCombiner(Combiner):
+    # each node but the root adds binom2 of its kappa, which is added by its parent
+    def leaf(self):
+        return 0
+
+    def node(self, t, values, stats):
+        return sum(values) + sum(binom2(s.kappa) for s in stats)
+
+
+class _BinaryQuartetCombiner(Combiner):
+    def leaf(self):
+        return 0
+
+    def node(self, t, values, stats):
+        kappas = [s.kappa for s in stats]
+
+        if sum(kappas) < 4:
+            return 0
+
+        return sum(values) + sum(binom2(kappas[i1]) * binom2(kappas[i2])
+                                 for i1 in range(len(kappas))
+                                 for i2 in range(i1+1, len(kappas)))
+
+
+class _QuartetCombiner(Combiner):
+    def __init__(self, vs=range(5)):
+        self.vs = vs
+
+    def leaf(self):
+        return 0, 0, 1
+
+    def node(self, t, values, stats):
+        return _quartet_node(t, values, self.vs)
+
+    def result(self, value, stats):
+        return value[0]
+
+
+class _SymmetriesCombiner(Combiner):
+    def leaf(self):
+        return 0
+
+    def node(self, t, values, stats):
+        return int(is_symmetric(t)) + sum(values)
+
+
+class _AutomorphismsCombiner(Combiner):
+    def leaf(self):
+        return 1
+
+    def node(self, t, values, stats):
+        return _node_automorphisms(t, values)
+
+
+def _var_depths(stats):
+    n = stats.kappa
+    return float(Fraction(n * stats.depth_square_sum - stats.depth_sum**2, n * n))
+
+
+_combiners = {}
+
+
+def register_combiner(name, combiner):
+    """
+    Registers combiner, so that `compute_indices` computes the index name with it.
+    :param name: `str` instance.
+    :param combiner: `Combiner` instance.
+    """
+    assert isinstance(combiner, Combiner)
+    _combiners[name] = combiner
+
+
+def get_combiner(name):
+    """
+    Returns the `Combiner` registered with the given name.
+    :param name: `str` instance.
+    :return: `Combiner` instance.
+    """
+    return _combiners[name]
+
+
+register_combiner('leaves', _StatisticCombiner(lambda s: s.kappa))
+register_combiner('depth', _StatisticCombiner(lambda s: s.height))
+register_combiner('sackin', _StatisticCombiner(lambda s: s.depth_sum))
+register_combiner('var_depths', _StatisticCombiner(_var_depths))
+register_combiner('binary_colless', _KappaSumCombiner(lambda ks: abs(ks[0] - ks[1]), binary=True))
+register_combiner('binary_qcolless', _KappaSumCombiner(lambda ks: (ks[0] - ks[1])**2, binary=True))
+register_combiner('cophenetic', _CopheneticCombiner())
+register_combiner('binary_quartet', _BinaryQuartetCombiner())
+register_combiner('quartet', _QuartetCombiner())
+register_combiner('symmetries', _SymmetriesCombiner())
+register_combiner('automorphisms', _AutomorphismsCombiner())
+
+
+def compute_indices(tree, indices=None):
+    """
+    Returns a `dict` from the name of each index in indices to its value in tree, computing all of them in a single
+    postorder traversal which visits each distinct subtree once. The names are those of `register_combiner`: 'leaves',
+    'depth', 'sackin', 'var_depths', 'binary_colless', 'binary_qcolless', 'cophenetic', 'binary_quartet', 'quartet',
+    'symmetries' and 'automorphisms' are registered by default; if indices is None, all the registered ones that are
+    defined for tree are computed (the Colless indices are left out for trees that are not binary), and otherwise an
+    `AssertionError` is raised if one of them is not defined. For instance,
+    compute_indices(t, ['sackin', 'cophenetic']).
+    :param tree: `Shape` instance.
+    :param indices: iterable of `str` instances, or `None`.
+    :return: `dict` instance.
+    """
+    names = list(_combiners if indices is None else indices)
+    combiners = [_combiners[name] for name in names]
+    leaf_values = [c.leaf() for c in combiners]
+
+    def leaf(t):
+        return _LEAF_STATISTICS, leaf_values
+
+    def node(t, children):
+        stats = [s for s, _ in children]
+        values = [c.node(t, [vs[i] for _, vs in children], stats) for i, c in enumerate(combiners)]
+        return NodeStatistics.combine(stats), values
+
+    stats, values = fold(tree, leaf, node, shared=True)
+    results = {}
+
+    for name, c, v in zip(names, combiners, values):
+        r = c.result(v, stats)
+
+        if r is not None:
+            results[name] = r
+        else:
+            assert indices is None, "the index '{}' is not defined for this tree".format(name)
+
+    return results
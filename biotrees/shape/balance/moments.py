@@ -0,0 +1,230 @@
+"""
+This computes the exact distribution, expected value and variance of balance indices of binary trees under the Yule
+model and the uniform model (which gives the same probability to every phylogenetic tree with n leaves, also called the
+PDA model), without generating any tree.
+
+Both models are Markov branching: the number k of leaves of the first child of the root of a tree with n leaves has a
+known distribution and, given k, the two subtrees are independent trees of the same model with k and n-k leaves. The
+indices considered here are additive, I(t) = I(t1) + I(t2) + f(k, n-k), so their moments and distributions follow from
+recurrences over the root split. The tables of the recurrences are kept and grow as larger numbers of leaves are
+requested. The exact moments are computed with integers, which grow like n! and make the first query for n = 1000 take
+tens of seconds for each index and model; with exact=False they are computed in floating point instead, with one
+vectorized sum per number of leaves.
+"""
+
+from fractions import Fraction
+from math import log, sqrt
+
+import numpy as np
+
+from biotrees.probability import ProbabilityTable
+from biotrees.shape import count_leaves
+from biotrees.shape.balance.colless import binary_colless_index
+from biotrees.shape.balance.cophenetic import cophenetic_index
+from biotrees.shape.balance.qcolless import binary_qcolless_index
+from biotrees.shape.balance.quartets import binary_quartet_index, quartet_index
+from biotrees.shape.balance.sackin import sackin_index
+from biotrees.util import binom, binom2
+
+
+_root_contributions = {
+    sackin_index: lambda k1, k2: k1 + k2,
+    binary_colless_index: lambda k1, k2: abs(k1 - k2),
+    binary_qcolless_index: lambda k1, k2: (k1 - k2)**2,
+    cophenetic_index: lambda k1, k2: binom2(k1) + binom2(k2),
+    binary_quartet_index: lambda k1, k2: binom2(k1) * binom2(k2),
+    # on binary trees only the quartets with two leaves on each side of their root count, each with weight 3
+    quartet_index: lambda k1, k2: 3 * binom2(k1) * binom2(k2),
+}
+
+_weights_tables = {}
+_moments_tables = {}
+_float_moments_tables = {}
+_distribution_tables = {}
+
+
+def _weights(model, n):
+    """
+    Returns a list whose m-th element, for m up to (at least) n, is a pair (r, ws) such that the probability under
+    model that the children of the root of a tree with m leaves have k and m-k leaves, for k <= m/2, is
+    ws[k] r(k) r(m-k) / r(m), with ws[k] an `int`: r(m) = (m-1)! and ws[k] = binom(m-2, k-1) (twice unless 2k = m) under
+    the Yule model, and r(m) = (2m-3)!!, the number of binary phylogenetic trees with m leaves, and ws[k] = binom(m, k)
+    (halved if 2k = m) under the uniform model. Thus r(m) times the moments of an index are integers, and so are their
+    recurrences.
+    :param model: 'yule' or 'uniform'.
+    :param n: `int` instance.
+    :return: `list` instance.
+    """
+    if model not in ('yule', 'uniform'):
+        raise ValueError('unknown model: {}'.format(model))
+
+    table = _weights_tables.setdefault(model, [None, (1, [None])])
+
+    for m in range(len(table), n+1):
+        r = table[-1][0]
+        if model == 'yule':
+            r *= m - 1
+            ws = [None] + [binom(m-2, k-1) * (1 if 2*k == m else 2) for k in range(1, m//2 + 1)]
+        else:
+            r *= 2*m - 3
+            ws = [None] + [binom(m, k) // (2 if 2*k == m else 1) for k in range(1, m//2 + 1)]
+        table.append((r, ws))
+
+    return table
+
+
+def _root_contribution(index):
+    f = _root_contributions.get(index)
+    if f is None:
+        raise ValueError('the moments of {} are not supported'.format(getattr(index, '__name__', index)))
+    return f
+
+
+def _moments_table(index, model, n):
+    """
+    Returns two lists whose m-th elements, for m up to (at least) n, are r(m) times the expected values of I and I^2 on
+    trees with m leaves, I being index and r as in `_weights`. If I = I1 + I2 + f, with I1 and I2 independent given the
+    root split, E[I^2] = E[I1^2] + E[I2^2] + f^2 + 2 E[I1] E[I2] + 2 f (E[I1] + E[I2]).
+    :return: `tuple` instance.
+    """
+    f = _root_contribution(index)
+    ws = _weights(model, n)
+    es, ss = _moments_tables.setdefault((index, model), ([None, 0], [None, 0]))
+
+    for m in range(len(es), n+1):
+        e = s = 0
+
+        # the splits k and m-k give the same values, so each pair is added once
+        for k in range(1, m//2 + 1):
+            w = ws[m][1][k]
+            fk = f(k, m-k)
+            r1, r2 = ws[k][0], ws[m-k][0]
+            e1, e2 = es[k], es[m-k]
+            e12 = e1*r2 + r1*e2
+
+            e += w * (e12 + fk*r1*r2)
+            s += w * (ss[k]*r2 + r1*ss[m-k] + fk*fk*r1*r2 + 2*e1*e2 + 2*fk*e12)
+
+        es.append(e)
+        ss.append(s)
+
+    return es, ss
+
+
+def _float_moments_table(index, model, n):
+    """
+    Returns two lists whose m-th elements, for m up to (at least) n, are the expected value and the variance of index
+    on trees with m leaves under model, as `float` instances. If I = I1 + I2 + f and g(k) = E[I1] + E[I2] + f given
+    the root split k, then Var[I] = E[Var[I1] + Var[I2]] + Var[g(k)].
+    :return: `tuple` instance.
+    """
+    f = _root_contribution(index)
+    if model not in ('yule', 'uniform'):
+        raise ValueError('unknown model: {}'.format(model))
+
+    es, vs = _float_moments_tables.setdefault((index, model), ([0., 0.], [0., 0.]))
+
+    if model == 'uniform':
+        # the logarithms of j! and of the numbers (2j-3)!! = (2j-2)! / (2^(j-1) (j-1)!) of binary phylogenetic trees
+        log_factorials = np.concatenate([[0.], np.cumsum(np.log(np.arange(1, 2*n + 1)))])
+        js = np.arange(1, n+1)
+        log_counts = np.concatenate([[0.], log_factorials[2*js - 2] - (js - 1) * log(2) - log_factorials[js - 1]])
+
+    for m in range(len(es), n+1):
+        ks = np.arange(1, m)
+
+        if model == 'yule':
+            ps = np.full(m-1, 1 / (m-1))
+        else:
+            ps = np.exp(log_factorials[m] - log_factorials[ks] - log_factorials[m - ks]
+                        + log_counts[ks] + log_counts[m - ks] - log(2) - log_counts[m])
+
+        e, v = np.array(es), np.array(vs)
+        gs = e[ks] + e[m - ks] + np.array([f(k, m-k) for k in range(1, m)], dtype=np.float64)
+        mean = ps.dot(gs)
+
+        es.append(float(mean))
+        vs.append(float(ps.dot(v[ks] + v[m - ks]) + ps.dot((gs - mean)**2)))
+
+    return es, vs
+
+
+def expected_value(index, n, model='yule', exact=True):
+    """
+    Returns the expected value of index on the binary trees with n leaves under model.
+    :param index: one of the balance indices of binary trees, such as `sackin_index`.
+    :param n: `int` instance.
+    :param model: 'yule' or 'uniform'.
+    :param exact: `bool` instance.
+    :return: `Fraction` instance, or `float` instance if exact is False.
+    """
+    if not exact:
+        return _float_moments_table(index, model, n)[0][n]
+
+    return Fraction(_moments_table(index, model, n)[0][n], _weights(model, n)[n][0])
+
+
+def variance(index, n, model='yule', exact=True):
+    """
+    Returns the variance of index on the binary trees with n leaves under model.
+    :param index: one of the balance indices of binary trees, such as `sackin_index`.
+    :param n: `int` instance.
+    :param model: 'yule' or 'uniform'.
+    :param exact: `bool` instance.
+    :return: `Fraction` instance, or `float` instance if exact is False.
+    """
+    if not exact:
+        return _float_moments_table(index, model, n)[1][n]
+
+    es, ss = _moments_table(index, model, n)
+    r = _weights(model, n)[n][0]
+    return Fraction(ss[n]*r - es[n]**2, r*r)
+
+
+def standardized_index(index, t, model='yule', exact=True):
+    """
+    Returns the value of index on the binary tree t minus its expected value under model, divided by its standard
+    deviation (or 0 if it is constant).
+    :param index: one of the balance indices of binary trees, such as `sackin_index`.
+    :param t: `Shape` instance.
+    :param model: 'yule' or 'uniform'.
+    :param exact: `bool` instance, whether the moments are computed exactly.
+    :return: `float` instance.
+    """
+    n = count_leaves(t)
+    v = variance(index, n, model, exact)
+    return float(index(t) - expected_value(index, n, model, exact)) / sqrt(v) if v > 0 else 0.
+
+
+def distribution(index, n, model='yule'):
+    """
+    Returns a `ProbabilityTable` with the values of index on the binary trees with n leaves and their probability
+    under model. The distribution on m leaves is the mixture over the root splits of the distributions of the sums of
+    the values of the two subtrees, so it takes about as many operations as the product of the numbers of values on
+    k and m-k leaves, for each k.
+    :param index: one of the balance indices of binary trees, such as `sackin_index`.
+    :param n: `int` instance.
+    :param model: 'yule' or 'uniform'.
+    :return: `ProbabilityTable` instance.
+    """
+    f = _root_contribution(index)
+    ws = _weights(model, n)
+    ds = _distribution_tables.setdefault((index, model), [None, {0: 1}])
+
+    # ds[m][x] is r(m) times the probability of x
+    for m in range(len(ds), n+1):
+        d = {}
+
+        for k in range(1, m//2 + 1):
+            w = ws[m][1][k]
+            fk = f(k, m-k)
+
+            for x1, c1 in ds[k].items():
+                for x2, c2 in ds[m-k].items():
+                    x = x1 + x2 + fk
+                    d[x] = d.get(x, 0) + w * c1 * c2
+
+        ds.append(d)
+
+    r = ws[n][0]
+    return ProbabilityTable((x, Fraction(c, r)) for x, c in ds[n].items())
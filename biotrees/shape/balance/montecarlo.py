@@ -0,0 +1,330 @@
+"""
+This estimates the distributions of balance indices under a random model of trees by Monte Carlo simulation. The trees
+are simulated in chunks, possibly in parallel by a pool of processes, and every chunk has its own random number
+generator, seeded from a `numpy.random.SeedSequence`: the streams of different chunks are independent and the results
+only depend on the seed, not on the number of processes. The values of the indices are streamed into
+`OnlineStatistics` instances, which take bounded memory, so the trees are discarded as soon as their indices are
+computed.
+"""
+
+from bisect import bisect_right
+from collections import Counter
+from math import sqrt
+from multiprocessing import Pool
+import random
+import time
+
+import numpy as np
+
+
+class _QuantileSketch(object):
+    """
+    A `_QuantileSketch` instance summarizes a stream of numbers, to estimate its quantiles, with a bounded number of
+    items. The items are kept in levels, and every item of level h stands for 2^h numbers. When a level holds more
+    than k items, they are sorted and every other one (alternately the even and the odd ones, so that the errors tend
+    to cancel) is promoted to the next level; this changes the rank of any number by at most 2^h. Hence the sketch keeps
+    at most k items in each of about log2(count / k) levels. Two sketches can be merged.
+    """
+    __slots__ = ('k', 'levels', '_parities')
+
+    def __init__(self, k=512):
+        self.k = k
+        self.levels = [[]]
+        self._parities = [0]
+
+    def add(self, x):
+        self.levels[0].append(x)
+
+        if len(self.levels[0]) > self.k:
+            self._compress()
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append([])
+                self._parities.append(0)
+            self.levels[h].extend(items)
+
+        self._compress()
+
+    def _compress(self):
+        h = 0
+
+        while h < len(self.levels):
+            items = self.levels[h]
+
+            if len(items) > self.k:
+                items.sort()
+                # an odd item out stays in its level
+                rest = items[-1:] if len(items) % 2 == 1 else []
+                items = items[:len(items) - len(rest)]
+
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                    self._parities.append(0)
+
+                self.levels[h] = rest
+                self.levels[h+1].extend(items[self._parities[h]::2])
+                self._parities[h] ^= 1
+
+            h += 1
+
+    def items(self):
+        """
+        Returns the sorted list of the pairs (x, w) of the items x of self and the numbers w that they stand for.
+        """
+        return sorted((x, 2**h) for h, items in enumerate(self.levels) for x in items)
+
+
+class OnlineStatistics(object):
+    """
+    An `OnlineStatistics` instance aggregates a stream of numbers in bounded memory: it keeps their count, mean and
+    sum of squared deviations (updated with Welford's method), their minimum and maximum, the counts of a histogram
+    with fixed bins (if they are given) and a `_QuantileSketch`, from which quantiles are estimated. Optionally, it
+    also keeps the number of times that each value appears, which makes the quantiles and histograms exact but takes
+    memory that grows with the number of distinct values. Two aggregates can be merged.
+    """
+    __slots__ = ('count', 'mean', '_m2', '_min', '_max', 'bins', 'bin_counts', 'counts', '_sketch')
+
+    def __init__(self, xs=(), bins=None, exact=False, sketch_size=512):
+        """
+        Create a new `OnlineStatistics` object with the numbers in xs.
+        :param xs: iterable of numbers.
+        :param bins: the increasing sequence of the edges of the bins of the histogram, or `None`.
+        :param exact: `bool` instance; if True, the number of times that each value appears is kept in counts.
+        :param sketch_size: `int` instance, the number of items of each level of the quantile sketch.
+        :return: `OnlineStatistics` instance.
+        """
+        self.count = 0
+        self.mean = 0.
+        self._m2 = 0.
+        self._min = self._max = None
+        self.bins = None if bins is None else list(bins)
+        self.bin_counts = None if bins is None else [0] * (len(self.bins) - 1)
+        self.counts = Counter() if exact else None
+        self._sketch = _QuantileSketch(sketch_size)
+        self.update(xs)
+
+    def add(self, x):
+        """
+        Adds the number x to self.
+        :param x: a number.
+        """
+        self.count += 1
+        d = x - self.mean
+        self.mean += d / self.count
+        self._m2 += d * (x - self.mean)
+
+        if self.count == 1:
+            self._min = self._max = x
+        elif x < self._min:
+            self._min = x
+        elif x > self._max:
+            self._max = x
+
+        if self.bins is not None:
+            # as in numpy.histogram, the last bin includes its right edge
+            i = bisect_right(self.bins, x) - 1
+            if i == len(self.bin_counts) and x == self.bins[-1]:
+                i -= 1
+            if 0 <= i < len(self.bin_counts):
+                self.bin_counts[i] += 1
+
+        if self.counts is not None:
+            self.counts[x] += 1
+
+        self._sketch.add(x)
+
+    def update(self, xs):
+        """
+        Adds each number in xs to self.
+        :param xs: iterable of numbers.
+        """
+        for x in xs:
+            self.add(x)
+
+    def merge(self, other):
+        """
+        Adds all the numbers aggregated in other to self, which must have the same bins and keep exact counts only if
+        other does.
+        :param other: `OnlineStatistics` instance.
+        """
+        assert self.bins == other.bins
+        assert self.counts is None or other.counts is not None
+
+        if other.count == 0:
+            return
+
+        count = self.count + other.count
+        d = other.mean - self.mean
+        self.mean += d * other.count / count
+        self._m2 += other._m2 + d * d * self.count * other.count / count
+        self._min = other._min if self.count == 0 else min(self._min, other._min)
+        self._max = other._max if self.count == 0 else max(self._max, other._max)
+        self.count = count
+
+        if self.bins is not None:
+            self.bin_counts = [c1 + c2 for c1, c2 in zip(self.bin_counts, other.bin_counts)]
+
+        if self.counts is not None:
+            self.counts.update(other.counts)
+
+        self._sketch.merge(other._sketch)
+
+    def variance(self):
+        """
+        Returns the sample variance of the numbers in self.
+        :return: `float` instance.
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.
+
+    def std(self):
+        """
+        Returns the sample standard deviation of the numbers in self.
+        :return: `float` instance.
+        """
+        return sqrt(self.variance())
+
+    def min(self):
+        return self._min
+
+    def max(self):
+        return self._max
+
+    def quantile(self, q):
+        """
+        Returns the q-quantile of the numbers in self: the least value x such that at least a fraction q of them are
+        less than or equal to x. It is exact if self keeps exact counts, and otherwise it is estimated from the
+        quantile sketch.
+        :param q: `float` instance between 0 and 1.
+        :return: a number.
+        """
+        assert self.count > 0 and 0 <= q <= 1
+
+        if self.counts is not None:
+            items = sorted(self.counts.items())
+        else:
+            items = self._sketch.items()
+
+        total = sum(w for _, w in items)
+        acc = 0
+
+        for x, w in items:
+            acc += w
+            if acc >= q * total:
+                return x
+
+        return items[-1][0]
+
+    def histogram(self, bins=None):
+        """
+        Returns the histogram of the numbers in self, as `numpy.histogram` does. If bins is None, these are the fixed
+        bins of self, if it has them, and 10 equal bins otherwise. The histogram is exact for the fixed bins or if self
+        keeps exact counts; otherwise it is estimated from the quantile sketch.
+        :param bins: `int` instance, the sequence of the edges of the bins, or `None`.
+        :return: `tuple` instance.
+        """
+        if bins is None and self.bins is not None:
+            return np.array(self.bin_counts), np.array(self.bins)
+
+        if self.counts is not None:
+            items = sorted(self.counts.items())
+        else:
+            items = self._sketch.items()
+
+        return np.histogram([x for x, _ in items], bins=10 if bins is None else bins, weights=[w for _, w in items])
+
+    def __repr__(self):
+        return 'OnlineStatistics(count={}, mean={}, std={})'.format(self.count, self.mean, self.std())
+
+
+class MonteCarloResult(object):
+    """
+    A `MonteCarloResult` instance holds the `OnlineStatistics` of each index, by name, of a Monte Carlo simulation, with
+    the number of trees simulated and the time it took.
+    """
+    __slots__ = ('statistics', 'size', 'seconds')
+
+    def __init__(self, statistics, size, seconds):
+        self.statistics = statistics
+        self.size = size
+        self.seconds = seconds
+
+    def __getitem__(self, name):
+        return self.statistics[name]
+
+    def throughput(self):
+        """
+        Returns the number of trees simulated (and measured) per second.
+        :return: `float` instance.
+        """
+        return self.size / self.seconds if self.seconds > 0 else float('inf')
+
+    def __repr__(self):
+        return 'MonteCarloResult({}, size={}, {:.1f} trees/s)'.format(self.statistics, self.size, self.throughput())
+
+
+def _new_statistics(indices, bins, exact):
+    bins = bins or {}
+    return {name: OnlineStatistics(bins=bins.get(name), exact=exact) for name in indices}
+
+
+def _run_chunk(args):
+    sim, n, indices, size, seed, bins, exact = args
+    rng = random.Random(int(seed.generate_state(1, dtype=np.uint64)[0]))
+    stats = _new_statistics(indices, bins, exact)
+
+    for _ in range(size):
+        t = sim(n, rng=rng)
+        for name, index in indices.items():
+            stats[name].add(index(t))
+
+    return stats
+
+
+def monte_carlo(indices, sim, n, size, processes=None, seed=None, chunk_size=1000, bins=None, exact=False):
+    """
+    Simulates size trees with n leaves by calling sim(n, rng=rng) and returns the `MonteCarloResult` with the
+    distribution of each index in indices over them. The functions sim and the indices must be defined at the top
+    level of a module (or be `functools.partial` instances of such functions) when processes is given, since they are
+    sent to the processes of the pool; for instance,
+
+        monte_carlo({'sackin': sackin_index, 'colless': binary_colless_index}, sim_yule, 100, 10**5, processes=4)
+
+    or, for the Alpha-Gamma model, sim=functools.partial(sim_alphagamma, alpha=0.5, gamma=0.2).
+    The histograms of the indices named in bins have the given bins, and exact is passed to each `OnlineStatistics`.
+    :param indices: `dict` instance, from names to functions that take a `Shape` instance.
+    :param sim: `function` instance.
+    :param n: `int` instance.
+    :param size: `int` instance.
+    :param processes: `int` instance, or `None` to run in this process.
+    :param seed: `int` instance, or `None`.
+    :param chunk_size: `int` instance.
+    :param bins: `dict` instance, from names to the edges of the bins of their histograms, or `None`.
+    :param exact: `bool` instance.
+    :return: `MonteCarloResult` instance.
+    """
+    sizes = [min(chunk_size, size - i) for i in range(0, size, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(sim, n, indices, k, s, bins, exact) for k, s in zip(sizes, seeds)]
+
+    start = time.perf_counter()
+    stats = _new_statistics(indices, bins, exact)
+
+    if processes is None:
+        results = map(_run_chunk, tasks)
+        pool = None
+    else:
+        pool = Pool(processes)
+        results = pool.imap(_run_chunk, tasks)
+
+    try:
+        for r in results:
+            for name, s in r.items():
+                stats[name].merge(s)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return MonteCarloResult(stats, size, time.perf_counter() - start)
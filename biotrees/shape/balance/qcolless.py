@@ -4,7 +4,8 @@ Bartoszek, Tomás M. Coronado, Arnau Mir and Francesc Rosselló in their paper "
 yields a better balance index", as well as the value of the index in a given tree.
 """
 
-from biotrees.shape.generator import comb, binary_max_balanced
+from biotrees.traversal import fold
+from biotrees.shape.generator import comb, binary_max_balanced, sum_over_binary_max_balanced
 from biotrees.shape import count_leaves
 
 
@@ -14,21 +15,36 @@ def binary_qcolless_index(tree):
     :param tree: `Shape` instance.
     :return: `int` instance.
     """
-    def go(t):
-        if t.is_leaf():
-            return 0, 1
-
-        left, right = t.children
-        (cil, nl), (cir, nr) = go(left), go(right)
+    def go(t, values):
+        (cil, nl), (cir, nr) = values
         return (nl - nr)**2 + cil + cir, nl + nr
 
-    return go(tree)[0]
+    return fold(tree, lambda t: (0, 1), go, shared=True)[0]
 
 
 def normalized_binary_qcolless_index(tree):
     n = count_leaves(tree)
 
-    return binary_qcolless_index(tree) / (binary_qcolless_index(max_qcolless(n)[0]) - binary_qcolless_index(min_qcolless(n)[0]))
+    return binary_qcolless_index(tree) / (max_qcolless_value(n) - min_qcolless_value(n))
+
+
+def max_qcolless_value(n):
+    """
+    Returns the maximum QColless index of the binary trees with `int` n leaves, that of the comb: the sum of the
+    squares of 0, ..., n-2.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return (n-2) * (n-1) * (2*n-3) // 6 if n > 1 else 0
+
+
+def min_qcolless_value(n):
+    """
+    Returns the minimum QColless index of the binary trees with `int` n leaves, that of the maximum balanced tree.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return sum_over_binary_max_balanced(n, lambda k1, k2: (k2 - k1)**2)
 
 def min_qcolless(n):
     """
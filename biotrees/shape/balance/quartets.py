@@ -7,20 +7,17 @@ quartets", as well as the value of the index in a given tree.
 from functools import lru_cache
 
 from biotrees.shape import Shape, count_leaves
-from biotrees.shape.iso import isomorphic
-from biotrees.shape.generator import star, comb, binary_max_balanced
+from biotrees.shape.generator import star, comb, binary_max_balanced, sum_over_binary_max_balanced
 
-from biotrees.util import binom2
+from biotrees.traversal import fold
+from biotrees.util import binom, binom2
 
 
 
 def binary_quartet_index(tree):
-    def go(t):
-        if t.is_leaf():
-            return 0, 1
-
+    def go(t, values):
         ts = t.children
-        quartets, kappas = zip(*map(go, ts))
+        quartets, kappas = zip(*values)
         kappa = sum(kappas)
 
         if kappa < 4:
@@ -34,19 +31,56 @@ def binary_quartet_index(tree):
 
         return s0+s3, kappa
 
-    return go(tree)[0]
+    return fold(tree, lambda t: (0, 1), go, shared=True)[0]
 
 
 def normalized_binary_quartet_index(tree):
     n = count_leaves(tree)
 
-    return binary_quartet_index(tree) / binary_quartet_index(max_binary_quartet(n)[0])
+    return binary_quartet_index(tree) / max_binary_quartet_value(n)
 
 
 def normalized_quartet_index(tree):
     n = count_leaves(tree)
 
-    return quartet_index(tree) / quartet_index(max_quartet(n)[0])
+    return quartet_index(tree) / max_quartet_value(n)
+
+
+def max_quartet_value(n):
+    """
+    Returns the maximum Quartet index of the trees with `int` n leaves, that of the star: each of its binom(n, 4)
+    quartets is a star with weight 4.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return 4 * binom(n, 4)
+
+
+def min_quartet_value(n):
+    """
+    Returns the minimum Quartet index of the trees with `int` n leaves, that of the comb.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return 0
+
+
+def max_binary_quartet_value(n):
+    """
+    Returns the maximum binary Quartet index of the binary trees with `int` n leaves, that of the maximum balanced tree.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return sum_over_binary_max_balanced(n, lambda k1, k2: binom2(k1) * binom2(k2))
+
+
+def min_binary_quartet_value(n):
+    """
+    Returns the minimum binary Quartet index of the binary trees with `int` n leaves, that of the comb.
+    :param n: `int` instance.
+    :return: `int` instance.
+    """
+    return 0
 
 
 @lru_cache(maxsize=1)
@@ -60,64 +94,52 @@ def get_quartets():
 
 
 def quartet_index(tree, vs = range(5)):
-    Q = get_quartets()
-    t0 = Shape([Shape.LEAF, Shape.LEAF, Shape.LEAF])
-
-    def go(t):
-        if t.is_leaf():
-            return 0, 0, 1
-
-        ts = t.children
-        quartets, triples, kappas = zip(*map(go, ts))
-        kappa = sum(kappas)
-
-        if kappa < 3:
-            triple = 0
-        elif isomorphic(t, t0):
-            triple = 1
-        else:
-            t_s0 = sum(triples)
-
-            t_s1 = sum(kappas[i1] * kappas[i2] * kappas[i3]
-                        for i1 in range(len(ts))
-                        for i2 in range(i1+1, len(ts))
-                        for i3 in range(i2+1, len(ts)))
+    return fold(tree, lambda t: (0, 0, 1), lambda t, values: _quartet_node(t, values, vs), shared=True)[0]
 
-            triple = t_s0 + t_s1
-
-        if kappa < 4:
-            return 0, triple, kappa
 
-        for q, v in zip(Q, vs):
-            if isomorphic(t, q):
-                return v, triple, kappa
-
-            s0 = sum(quartets)
-
-            s1 = sum(binom2(kappas[i1]) * kappas[i2] * kappas[i3] +
-                     binom2(kappas[i2]) * kappas[i1] * kappas[i3] +
-                     binom2(kappas[i3]) * kappas[i1] * kappas[i2]
-                        for i1 in range(len(ts))
-                        for i2 in range(i1+1, len(ts))
-                        for i3 in range(i2+1, len(ts)))
-
-            s2 = sum(kappas[i1] * triples[i2] + kappas[i2] * triples[i1]
-                        for i1 in range(len(ts))
-                        for i2 in range(i1+1, len(ts)))
-
-            s3 = sum(binom2(kappas[i1]) * binom2(kappas[i2])
-                        for i1 in range(len(ts))
-                        for i2 in range(i1+1, len(ts)))
-
-            s4 = sum(kappas[i1] * kappas[i2] * kappas[i3] * kappas[i4]
-                        for i1 in range(len(ts))
-                        for i2 in range(i1+1, len(ts))
-                        for i3 in range(i2+1, len(ts))
-                        for i4 in range(i3+1, len(ts)))
-
-            return s0 + vs[1]*s1 + vs[2]*s2 + vs[3]*s3 + vs[4]*s4, triple, kappa
-
-    return go(tree)[0]
+def _quartet_node(t, values, vs=range(5)):
+    """
+    Returns the triple (quartet index, number of triples, kappa) of the node t of a tree, given those of its children,
+    for `quartet_index` with weights vs. The sums over the pairs, triples and quadruples of children are computed from
+    the power sums p_j of their kappas, with the elementary symmetric polynomials e_j given by Newton's identities, so
+    this takes time linear in the number of children.
+    """
+    quartets, triples, kappas = zip(*values)
+    p1 = p2 = p3 = p4 = 0
+
+    for k in kappas:
+        k2 = k*k
+        p1 += k
+        p2 += k2
+        p3 += k2*k
+        p4 += k2*k2
+
+    e2 = (p1*p1 - p2) // 2
+    e3 = (p1*p1*p1 - 3*p1*p2 + 2*p3) // 6
+    e4 = (e3*p1 - e2*p2 + p1*p3 - p4) // 4
+
+    # the triples whose subtree is a star and that have their root at t take a leaf from 3 different children
+    t_s0 = sum(triples)
+    triple = t_s0 + e3
+
+    if p1 < 4:
+        return 0, triple, p1
+
+    # the first quartet shape, a leaf and a comb with 3 leaves, is the only one with kappa 4 and 2 children with
+    # kappas 1 and 3 (p2 = 10) whose child with 3 leaves is binary
+    if p1 == 4 and len(kappas) == 2 and p2 == 10 and len(t.children[kappas.index(3)].children) == 2:
+        return vs[0], triple, p1
+
+    s0 = sum(quartets)
+
+    # with a_i = binom2(k_i): s1 is the sum of a_i times e2 of the other kappas and s3 the sum of a_i a_j for i < j
+    a1, a2, a3 = (p2 - p1) // 2, (p3 - p2) // 2, (p4 - p3) // 2
+    s1 = e2*a1 - p1*a2 + a3
+    s2 = p1*t_s0 - sum(k * tr for k, tr in zip(kappas, triples))
+    s3 = (a1*a1 - (p4 - 2*p3 + p2) // 4) // 2
+    s4 = e4
+
+    return s0 + vs[1]*s1 + vs[2]*s2 + vs[3]*s3 + vs[4]*s4, triple, p1
 
 
 def min_quartet(n):
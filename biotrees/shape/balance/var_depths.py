@@ -46,8 +46,8 @@ def min_var_depths(n):
     else:
         var, ls = min_var_depths_vector(n)
         t = binary_max_balanced(twotod)
-        t = _prune_lis(t, ls)
-        t = _prune_m1(n, t, ls)
+        chs = _prune_lis(t, ls)
+        t = _prune_m1(n, chs, ls)
 
         return var, t
 
@@ -97,28 +97,31 @@ def _liss(n):
     return liss
 
 
-def _prune_m1(n, t, lis):
+def _prune_m1(n, chs, lis):
     m = int(floor(log(n, 2)))
     m1 = 2**(m+1) - sum(2**li - 1 for li in lis) - n
-    t2 = t.clone()
-    t2.children[1] = binary_max_balanced(2**m - m1)
 
-    return t2
+    return Shape([chs[0], binary_max_balanced(2**m - m1)])
 
 
 def _prune_lis(t, lis):
+    """
+    Returns the two children of the root of t after pruning it, in their original positions: `_prune_m1` replaces
+    the second one, and `Shape` instances sort their children.
+    """
 
     def go(t, dis):
         if dis:
-            if dis[0] != 0:
-                return Shape([go(t.children[0], [di - 1 for di in dis]), t.children[1]])
-            else:
-                return Shape([Shape.LEAF, go(t.children[1], [di - 1 for di in dis[1:]])])
-
+            return Shape(go_children(t, dis))
         else:
             return t
 
+    def go_children(t, dis):
+        if dis[0] != 0:
+            return [go(t.children[0], [di - 1 for di in dis]), t.children[1]]
+        else:
+            return [Shape.LEAF, go(t.children[1], [di - 1 for di in dis[1:]])]
+
     d = get_depth(t)
     dis = tuple(reversed(tuple(d - li - 1 for li in lis)))
-    return go(t, dis)
-
+    return go_children(t, dis) if dis else list(t.children)
@@ -0,0 +1,289 @@
+"""
+A compact representation of `Shape` instances as NumPy arrays.
+
+A tree with m nodes is stored as an `int32` array `parents` of length m, in which every node comes after all its
+descendants (as it happens, for instance, in postorder) and thus the root is the last node: `parents[i]` is the index
+of the parent of the node i, or -1 if i is the root. The children of a node are ordered by their index. This takes 4
+bytes per node, and the traversals below run directly on the arrays.
+
+A `CompactForest` stores many trees in a single `parents` buffer (each tree with its own local indices) together
+with an array of `offsets`, so that the nodes of the i-th tree are `parents[offsets[i]:offsets[i+1]]`.
+"""
+
+import numpy as np
+
+from biotrees.shape import Shape
+
+
+class CompactShape(object):
+    """
+    A `CompactShape` instance is the array encoding of a tree; see the module documentation.
+    """
+    __slots__ = ('parents',)
+
+    def __init__(self, parents):
+        """
+        Create a new `CompactShape` object.
+        :param parents: sequence of `int`, the parent of each node, with the root (-1) in the last position.
+        :return: `CompactShape` instance.
+        """
+        self.parents = np.asarray(parents, dtype=np.int32)
+        assert self.parents.ndim == 1 and len(self.parents) > 0 and self.parents[-1] == -1
+
+    def __len__(self):
+        """
+        Returns the number of nodes of self.
+        :return: `int` instance.
+        """
+        return len(self.parents)
+
+    def __str__(self):
+        return str(compact_to_shape(self))
+
+    def __repr__(self):
+        return str(self)
+
+
+class CompactForest(object):
+    """
+    A `CompactForest` instance is the array encoding of a list of trees; see the module documentation.
+    """
+    __slots__ = ('parents', 'offsets')
+
+    def __init__(self, parents, offsets):
+        """
+        Create a new `CompactForest` object.
+        :param parents: sequence of `int`, the concatenation of the `parents` arrays of all the trees.
+        :param offsets: sequence of `int`, the position in which each tree starts, followed by the total length.
+        :return: `CompactForest` instance.
+        """
+        self.parents = np.asarray(parents, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        assert len(self.offsets) > 0 and self.offsets[0] == 0 and self.offsets[-1] == len(self.parents)
+
+    def __len__(self):
+        """
+        Returns the number of trees in self.
+        :return: `int` instance.
+        """
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """
+        Returns the i-th tree of self, as a `CompactShape` that shares memory with self.
+        :param i: `int` instance.
+        :return: `CompactShape` instance.
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('forest index out of range')
+
+        return CompactShape(self.parents[self.offsets[i]:self.offsets[i+1]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def tree_ids(self):
+        """
+        Returns, for each node in the forest, the index of the tree it belongs to.
+        :return: `numpy.ndarray` instance.
+        """
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+
+    def global_parents(self):
+        """
+        Returns the parent of each node as an index into the whole forest buffer (-1 for the roots).
+        :return: `numpy.ndarray` instance.
+        """
+        starts = np.repeat(self.offsets[:-1], np.diff(self.offsets))
+        return np.where(self.parents >= 0, self.parents + starts, -1)
+
+
+def shape_to_compact(t):
+    """
+    Returns the `CompactShape` encoding of t, with its nodes in postorder.
+    :param t: `Shape` instance.
+    :return: `CompactShape` instance.
+    """
+    # Visiting the children from the last one to the first one yields the reverse of the postorder.
+    rev_parents = []
+    stack = [(t, -1)]
+
+    while stack:
+        s, p = stack.pop()
+        i = len(rev_parents)
+        rev_parents.append(p)
+
+        if not s.is_leaf():
+            stack.extend((ch, i) for ch in s.children)
+
+    m = len(rev_parents)
+    parents = (m - 1) - np.array(rev_parents[::-1], dtype=np.int32)
+    parents[-1] = -1
+    return CompactShape(parents)
+
+
+def _build(parents, make_leaf, make_node):
+    """
+    Builds a tree bottom-up from the `parents` array of a compact encoding.
+    :param parents: `list` instance.
+    :param make_leaf: `function` that takes the index of a leaf and returns its tree.
+    :param make_node: `function` that takes the index of a node and the list of trees of its children.
+    :return: the tree returned by make_leaf or make_node for the root.
+    """
+    pending = [None] * len(parents)
+
+    for i, p in enumerate(parents):
+        children = pending[i]
+        pending[i] = None
+        t = make_leaf(i) if children is None else make_node(i, children)
+
+        if p < 0:
+            return t
+        elif pending[p] is None:
+            pending[p] = [t]
+        else:
+            pending[p].append(t)
+
+
+def compact_to_shape(c):
+    """
+    Returns the `Shape` encoded by c.
+    :param c: `CompactShape` instance.
+    :return: `Shape` instance.
+    """
+    return _build(c.parents.tolist(), lambda i: Shape.LEAF, lambda i, chs: Shape(chs))
+
+
+def forest_to_compact(ts):
+    """
+    Returns the `CompactForest` encoding of the given trees.
+    :param ts: iterable of `Shape` instances.
+    :return: `CompactForest` instance.
+    """
+    cs = [shape_to_compact(t).parents for t in ts]
+    offsets = np.zeros(len(cs) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in cs], out=offsets[1:])
+
+    parents = np.concatenate(cs) if cs else np.zeros(0, dtype=np.int32)
+    return CompactForest(parents, offsets)
+
+
+def forest_from_parents(parents, sizes=None):
+    """
+    Returns the `CompactForest` of the trees given by the matrix parents, with a row for each tree and a column for each
+    of its nodes, in any order: parents[i, j] is the column of the parent of the node j of the i-th tree, or -1 if it is
+    its root. If sizes is given, the i-th tree only has the nodes in the first sizes[i] columns and the rest of its row
+    is ignored. The nodes of each tree are reordered by decreasing depth, so that every node comes after its
+    descendants.
+    :param parents: `numpy.ndarray` instance.
+    :param sizes: `numpy.ndarray` instance, or `None`.
+    :return: `CompactForest` instance.
+    """
+    parents = np.asarray(parents, dtype=np.int64)
+    m, k = parents.shape
+    rows = np.arange(m, dtype=np.int64)[:, None]
+
+    if sizes is None:
+        used = np.ones((m, k), dtype=bool)
+    else:
+        used = np.arange(k)[None, :] < np.asarray(sizes)[:, None]
+        parents = np.where(used, parents, -1)
+
+    # the unused nodes go after the roots, which have depth 0
+    depths = node_depths(np.where(parents >= 0, parents + rows * k, -1).reshape(-1)).reshape(m, k)
+    order = np.argsort(np.where(used, -depths, 1), axis=1, kind='stable')
+    position = np.empty_like(order)
+    position[rows, order] = np.arange(k)
+
+    ps = np.take_along_axis(parents, order, axis=1)
+    ps = np.where(ps >= 0, position[rows, np.maximum(ps, 0)], -1)
+
+    offsets = np.zeros(m + 1, dtype=np.int64)
+    np.cumsum(used.sum(axis=1), out=offsets[1:])
+    return CompactForest(ps[np.take_along_axis(used, order, axis=1)], offsets)
+
+
+def compact_to_forest(f):
+    """
+    Returns the list of `Shape` instances encoded by f.
+    :param f: `CompactForest` instance.
+    :return: `list` instance.
+    """
+    return [compact_to_shape(c) for c in f]
+
+
+def degrees(c):
+    """
+    Returns the number of children of each node of c.
+    :param c: `CompactShape` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    return np.bincount(c.parents[:-1], minlength=len(c.parents))
+
+
+def node_depths(parents):
+    """
+    Returns the depth of each node given the `parents` array of a `CompactShape` or a `CompactForest` (for the latter,
+    use its `global_parents`). It uses pointer jumping, so it takes O(log(depth)) vectorized steps.
+    :param parents: `numpy.ndarray` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    anc = np.array(parents, dtype=np.int64)
+    depths = (anc >= 0).astype(np.int64)
+    active = np.flatnonzero(anc >= 0)
+
+    while len(active) > 0:
+        a = anc[active]
+        depths[active] += depths[a]
+        anc[active] = anc[a]
+        active = active[anc[active] >= 0]
+
+    return depths
+
+
+def count_leaves(c):
+    """
+    Returns the number of leaves in c.
+    :param c: `CompactShape` instance.
+    :return: `int` instance.
+    """
+    return int(np.count_nonzero(degrees(c) == 0))
+
+
+def get_depth(c):
+    """
+    Returns an integer representing the maximal depth of c, from the root to one of its furthest leaves.
+    :param c: `CompactShape` instance.
+    :return: `int` instance.
+    """
+    return int(node_depths(c.parents).max())
+
+
+def leaf_depths(c):
+    """
+    Returns the depth of each leaf in c, from left to right.
+    :param c: `CompactShape` instance.
+    :return: `numpy.ndarray` instance.
+    """
+    return node_depths(c.parents)[degrees(c) == 0]
+
+
+def get_leaf_depths(c):
+    """
+    Returns a list of integers representing the depth of each leaf in c, from left to right.
+    :param c: `CompactShape` instance.
+    :return: `list` instance.
+    """
+    return leaf_depths(c).tolist()
+
+
+def count_nodes_by_depth(c):
+    """
+    Returns a list whose d-th element is the number of nodes of c at depth d.
+    :param c: `CompactShape` instance.
+    :return: `list` instance.
+    """
+    return np.bincount(node_depths(c.parents)).tolist()
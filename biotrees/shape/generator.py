@@ -1,10 +1,14 @@
 """
 This file contains several functions that generate `Shape` instances.
 """
-from functools import lru_cache
+from functools import lru_cache, partial
+from itertools import groupby
+import random
 
-from biotrees.shape import Shape
-from biotrees.util import and_then, iter_merge, skip_nth, unique
+from biotrees.shape import Shape, is_binary, sort_key, _degree_bytes
+from biotrees.shape.counting import _binary_shapes_table, count_binary_shapes_with_root_split
+from biotrees.traversal import fold
+from biotrees.util import and_then, iter_merge, skip_nth, unique, binom
 
 
 def add_leaf_to_edge(t):
@@ -25,7 +29,7 @@ def add_leaf_to_node(t):
     if t.is_leaf():
         return add_leaf_to_edge(t)
     else:
-        return Shape([Shape.LEAF] + t.children)
+        return Shape((Shape.LEAF,) + t.children)
 
 
 def iter_insert_tree(ts, t):
@@ -45,16 +49,10 @@ def delete_nodes_with_out_degree_one(t):
     Deletes all nodes in the input `Shape` instance with only one child, for they are redundant
     :return: `Shape` instance
     """
-    if t.is_leaf():
-        return t
-    else:
-        if len(t.children) == 1:
-            return delete_nodes_with_out_degree_one(t.children[0])
-        else:
-            return Shape([delete_nodes_with_out_degree_one(ch) for ch in t.children])
+    return fold(t, lambda s: s, lambda s, chs: chs[0] if len(chs) == 1 else Shape(chs), shared=True)
 
 
-@and_then(unique)
+@and_then(partial(unique, sort=True))
 def all_binary_trees_from_t(t):
     """
     Returns a list with all the binary `Shape` instances that can be obtained from the input tree.
@@ -70,7 +68,7 @@ def all_binary_trees_from_t(t):
     yield add_leaf_to_edge(t)
 
 
-@and_then(unique)
+@and_then(partial(unique, sort=True))
 def all_trees_from_t(t):
     """
     Returns a list with all the `Shape` instances that can be obtained from the input tree.
@@ -88,42 +86,146 @@ def all_trees_from_t(t):
     yield add_leaf_to_edge(t)
 
 
-@lru_cache(maxsize=None)
-@and_then(unique)
 def all_binary_trees_with_n_leaves(n):
     """
-    Returns a list with all the binary `Shape` instances that have n leaves.
+    Returns a list with all the binary `Shape` instances that have n leaves, sorted.
     :param n: `int` instance.
     :return: `list` instance.
     """
-    if n <= 0:
-        pass
-    elif n == 1:
-        yield Shape.LEAF
-    elif n == 2:
-        yield Shape([Shape.LEAF, Shape.LEAF])
-    else:
-        for t in all_binary_trees_with_n_leaves(n-1):
-            yield from all_binary_trees_from_t(t)
+    return sorted(iter_binary_trees_with_n_leaves(n), key=sort_key)
 
 
-@lru_cache(maxsize=None)
-@and_then(unique)
 def all_trees_with_n_leaves(n):
     """
-    Returns a list with all the `Shape` instances that have n leaves.
+    Returns a list with all the `Shape` instances that have n leaves, sorted.
     :param n: `int` instance.
     :return: `list` instance.
     """
-    if n <= 0:
-        pass
-    elif n == 1:
+    return sorted(iter_trees_with_n_leaves(n), key=sort_key)
+
+
+def iter_binary_trees_with_n_leaves(n):
+    """
+    Yields each binary `Shape` instance with n leaves exactly once, lazily, in the order given by `rank_binary`.
+    This is not the order given by `Shape.compare`, in which the first children of the trees mix shapes of all sizes,
+    so it could not be followed without keeping every shape with less than n leaves; `all_binary_trees_with_n_leaves`
+    sorts them. Only the shapes with at most n/2 leaves are kept in memory; larger subtrees are generated as needed,
+    each of them once per tree that is built on top of it.
+    :param n: `int` instance.
+    :return: generator of `Shape` instances.
+    """
+    return _iter_binary_trees(n, {})
+
+
+def iter_trees_with_n_leaves(n):
+    """
+    Yields each `Shape` instance with n leaves exactly once, lazily, in the order given by `rank`, which is not the
+    order given by `Shape.compare` (see `iter_binary_trees_with_n_leaves`). Only the shapes with at most n/2 leaves are
+    kept in memory.
+    :param n: `int` instance.
+    :return: generator of `Shape` instances.
+    """
+    return _iter_trees(n, {})
+
+
+def _small_trees(small, n, gen):
+    """
+    Returns the tuple of all the shapes with n leaves generated by gen, which is kept in the `dict` small.
+    """
+    ts = small.get(n)
+
+    if ts is None:
+        ts = small[n] = tuple(gen(n, small))
+
+    return ts
+
+
+def _node(chs):
+    """
+    Returns the `Shape` whose children are the shapes chs, which have been generated here. Their sort keys are known,
+    since every generated shape is given the one built from the keys of its children, so the children are sorted by
+    comparing keys instead of calling `Shape.compare`.
+    """
+    chs = tuple(sorted(chs, key=sort_key))
+    return Shape._from_sorted(chs, _degree_bytes(len(chs)) + b''.join(t.sort_key() for t in chs))
+
+
+def _binary_node(t1, t2):
+    """
+    Returns the `Shape` whose children are the shapes t1 and t2, as `_node` does.
+    """
+    k1, k2 = t1.sort_key(), t2.sort_key()
+
+    if k2 < k1:
+        t1, t2, k1, k2 = t2, t1, k2, k1
+
+    return Shape._from_sorted((t1, t2), b'\x02' + k1 + k2)
+
+
+def _iter_binary_trees(n, small):
+    if n == 1:
         yield Shape.LEAF
-    elif n == 2:
-        yield Shape.CHERRY
-    else:
-        for t in all_trees_with_n_leaves(n-1):
-            yield from all_trees_from_t(t)
+        return
+
+    for n1 in range(1, n//2 + 1):
+        n2 = n - n1
+        ts1 = _small_trees(small, n1, _iter_binary_trees)
+
+        if n1 < n2:
+            for t2 in _iter_binary_trees(n2, small):
+                for t1 in ts1:
+                    yield _binary_node(t1, t2)
+        else:
+            for t1, t2 in _iter_multisets(ts1, 2, len(ts1)):
+                yield _binary_node(t1, t2)
+
+
+def _iter_trees(n, small):
+    if n == 1:
+        yield Shape.LEAF
+    elif n > 1:
+        for chs in _iter_forests(n, n-1, small):
+            yield _node(chs)
+
+
+def _iter_forests(k, m, small):
+    """
+    Yields the multisets of `Shape` instances with at most m leaves each and k leaves in total, as tuples, in the
+    order given by `rank`: by the number of leaves of their largest shapes, then by how many shapes have that many
+    leaves, then by the multiset of these shapes and finally by the remaining forest.
+    """
+    if k == 0:
+        yield ()
+        return
+
+    for m1 in range(1, min(m, k) + 1):
+        if 2*m1 > k:
+            # a single shape with m1 leaves, which is not kept in memory
+            for t in _iter_trees(m1, small):
+                for rest in _iter_forests(k - m1, m1 - 1, small):
+                    yield rest + (t,)
+        else:
+            ts = _small_trees(small, m1, _iter_trees)
+
+            for j in range(1, k//m1 + 1):
+                for ms in _iter_multisets(ts, j, len(ts)):
+                    for rest in _iter_forests(k - j*m1, m1 - 1, small):
+                        yield rest + ms
+
+
+def _iter_multisets(xs, j, end):
+    """
+    Yields the multisets of j elements of xs[:end], as tuples sorted by position, in colexicographical order (see
+    `_multiset_rank`).
+    """
+    if j == 0:
+        yield ()
+        return
+
+    for i in range(end):
+        x = xs[i]
+        for ms in _iter_multisets(xs, j-1, i+1):
+            yield ms + (x,)
 
 
 def star(n):
@@ -151,6 +253,34 @@ def binary_max_balanced(n):
         return Shape([binary_max_balanced((n - s) // 2), binary_max_balanced((n - s) // 2 + s)])
 
 
+def sum_over_binary_max_balanced(n, f):
+    """
+    Returns the sum of f(k1, k2) over the interior nodes of `binary_max_balanced`(n), where k1 <= k2 are the numbers of
+    leaves of the children of each node, without building the tree: the subtrees at each depth only have two
+    consecutive numbers of leaves, so this takes O(log(n)) calls of f.
+    :param n: `int` instance.
+    :param f: `function` instance.
+    :return: the sum.
+    """
+    total = 0
+    counts = {n: 1}
+
+    while counts:
+        next_counts = {}
+
+        for m, c in counts.items():
+            if m > 1:
+                k1 = m // 2
+                k2 = m - k1
+                total += c * f(k1, k2)
+                next_counts[k1] = next_counts.get(k1, 0) + c
+                next_counts[k2] = next_counts.get(k2, 0) + c
+
+        counts = next_counts
+
+    return total
+
+
 @lru_cache(maxsize=None)
 def comb(n):
     """
@@ -158,9 +288,269 @@ def comb(n):
     :param n: `int` instance.
     :return: `Shape` instance.
     """
-    if n == 1:
-        return Shape.LEAF
-    elif n == 2:
-        return Shape.CHERRY
-    else:
-        return Shape([Shape.LEAF, comb(n-1)])
+    t = Shape.LEAF
+
+    for _ in range(n-1):
+        t = Shape([Shape.LEAF, t])
+
+    return t
+
+
+_forest_table = ([0, 1], [[1]])
+
+
+def _forest_counts(n):
+    """
+    Returns a pair (ts, fs) such that, for k up to (at least) n, ts[k] is the number of `Shape` instances with k leaves
+    and fs[m][k], for m < n, is the number of multisets of `Shape` instances with at most m leaves each and k leaves in
+    total. A shape with k > 1 leaves is a multiset of shapes with at most k-1 leaves, so ts[k] = fs[k-1][k].
+    The tables are shared by all the calls and extended when a larger n is requested.
+    :param n: `int` instance.
+    :return: `tuple` instance.
+    """
+    ts, fs = _forest_table
+    size = len(fs[0]) - 1
+
+    if n <= size:
+        return ts, fs
+
+    fs[0].extend([0] * (n - size))
+
+    for m in range(1, n):
+        if m == len(ts):
+            ts.append(fs[m-1][m])
+        if m == len(fs):
+            fs.append([])
+
+        # multisets of j shapes with exactly m leaves, followed by a multiset of shapes with at most m-1 leaves
+        mss = [binom(ts[m] + j - 1, j) for j in range(n//m + 1)]
+        prev, row = fs[m-1], fs[m]
+        row.extend(sum(mss[j] * prev[k - j*m] for j in range(k//m + 1)) for k in range(len(row), n+1))
+
+    if n == len(ts):
+        ts.append(fs[n-1][n])
+
+    return ts, fs
+
+
+def _multiset_rank(rs):
+    """
+    Returns the position of the multiset of ranks rs, sorted increasingly, among all the multisets of ranks with its
+    size, in colexicographical order.
+    """
+    return sum(binom(r + i, i + 1) for i, r in enumerate(rs))
+
+
+def _multiset_unrank(q, n, j):
+    """
+    Returns the sorted list of j ranks in range(n) whose `_multiset_rank` is q.
+    """
+    rs = []
+
+    for i in range(j, 0, -1):
+        # largest c such that binom(c, i) <= q
+        lo, hi = i - 1, n + i - 2
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if binom(mid, i) <= q:
+                lo = mid
+            else:
+                hi = mid - 1
+
+        q -= binom(lo, i)
+        rs.append(lo - i + 1)
+
+    rs.reverse()
+    return rs
+
+
+def _forest_offset(ts, fs, k, m, j):
+    """
+    Returns the number of multisets of shapes with at most m leaves each and k leaves in total that have less than j
+    shapes with exactly m leaves.
+    """
+    return sum(binom(ts[m] + j1 - 1, j1) * fs[m-1][k - j1*m] for j1 in range(j))
+
+
+def _unrank_with(n, i, expand):
+    """
+    Builds the `Shape` with n leaves and rank i, given a function expand that returns, for the pair (n, i) of a node,
+    the pairs (n', i') of its children.
+    """
+    tasks = {}
+    canonical = {}
+
+    def children(task):
+        chs = tasks.get(task)
+        if chs is None:
+            # equal pairs are given as the same object, so that fold builds each subtree only once
+            chs = tasks[task] = tuple(canonical.setdefault(ch, ch) for ch in expand(*task))
+        return chs
+
+    return fold((n, i), lambda task: Shape.LEAF, lambda task, chs: Shape(chs), children=children, shared=True)
+
+
+def rank(t):
+    """
+    Returns the rank of t: an `int` in range(N), where N is the number of `Shape` instances with as many leaves as t,
+    such that unrank(n, rank(t)) is t. Shapes are ranked by the number of leaves of their children, and children with
+    the same number of leaves by their own ranks; this order is not the one given by `Shape.compare`.
+    :param t: `Shape` instance.
+    :return: `int` instance.
+    """
+    ts, fs = _forest_counts(t.leaf_count)
+
+    def go(s, ranks):
+        r = 0
+        k = s.leaf_count
+
+        for m, group in groupby(sorted(zip([ch.leaf_count for ch in s.children], ranks), reverse=True),
+                                key=lambda p: p[0]):
+            rs = sorted(r1 for _, r1 in group)
+            j = len(rs)
+            r += _forest_offset(ts, fs, k, m, j) + _multiset_rank(rs) * fs[m-1][k - j*m]
+            k -= j*m
+
+        return r
+
+    return fold(t, lambda s: 0, go, shared=True)
+
+
+def unrank(n, i):
+    """
+    Returns the `Shape` with n leaves whose rank is i. See `rank`.
+    :param n: `int` instance.
+    :param i: `int` instance.
+    :return: `Shape` instance.
+    """
+    ts, fs = _forest_counts(n)
+    assert 0 <= i < ts[n]
+
+    def expand(k, i):
+        if k == 1:
+            return []
+
+        chs = []
+        m = k
+
+        while k > 0:
+            m = min(m - 1, k)
+            j = 0
+
+            while True:
+                c = binom(ts[m] + j - 1, j) * fs[m-1][k - j*m]
+                if i < c:
+                    break
+                i -= c
+                j += 1
+
+            q, i = divmod(i, fs[m-1][k - j*m])
+            chs.extend((m, r) for r in _multiset_unrank(q, ts[m], j))
+            k -= j*m
+
+        return chs
+
+    return _unrank_with(n, i, expand)
+
+
+def rank_binary(t):
+    """
+    Returns the rank of the binary shape t: an `int` in range(N), where N is the number of binary `Shape` instances with
+    as many leaves as t, such that unrank_binary(n, rank_binary(t)) is t. Shapes are ranked by the number of leaves of
+    their smallest child, then by the rank of their largest child and then by the rank of their smallest child.
+    :param t: `Shape` instance.
+    :return: `int` instance.
+    """
+    assert is_binary(t)
+    bs = _binary_shapes_table(t.leaf_count)
+
+    def go(s, ranks):
+        (n1, r1), (n2, r2) = sorted(zip([ch.leaf_count for ch in s.children], ranks))
+        r = sum(count_binary_shapes_with_root_split(k1, n1 + n2 - k1) for k1 in range(1, n1))
+
+        if n1 < n2:
+            return r + r2 * bs[n1] + r1
+        else:
+            return r + _multiset_rank([r1, r2])
+
+    return fold(t, lambda s: 0, go, shared=True)
+
+
+def unrank_binary(n, i):
+    """
+    Returns the binary `Shape` with n leaves whose rank is i. See `rank_binary`.
+    :param n: `int` instance.
+    :param i: `int` instance.
+    :return: `Shape` instance.
+    """
+    bs = _binary_shapes_table(n)
+    assert 0 <= i < bs[n]
+
+    def expand(k, i):
+        if k == 1:
+            return []
+
+        n1 = 1
+        while i >= count_binary_shapes_with_root_split(n1, k - n1):
+            i -= count_binary_shapes_with_root_split(n1, k - n1)
+            n1 += 1
+
+        n2 = k - n1
+        if n1 < n2:
+            r2, r1 = divmod(i, bs[n1])
+        else:
+            r1, r2 = _multiset_unrank(i, bs[n1], 2)
+
+        return [(n1, r1), (n2, r2)]
+
+    return _unrank_with(n, i, expand)
+
+
+def random_tree(n, rng=random):
+    """
+    Returns a `Shape` instance with n leaves chosen uniformly at random among all of them.
+    :param n: `int` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: `Shape` instance.
+    """
+    return next(iter_random_trees(n, 1, rng))
+
+
+def random_binary_tree(n, rng=random):
+    """
+    Returns a binary `Shape` instance with n leaves chosen uniformly at random among all of them.
+    :param n: `int` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: `Shape` instance.
+    """
+    return next(iter_random_binary_trees(n, 1, rng))
+
+
+def iter_random_trees(n, size, rng=random):
+    """
+    Yields size independent `Shape` instances with n leaves chosen uniformly at random, by unranking uniform random
+    ranks; the count tables are computed once for all of them.
+    :param n: `int` instance.
+    :param size: `int` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: generator of `Shape` instances.
+    """
+    ts, _ = _forest_counts(n)
+
+    for _ in range(size):
+        yield unrank(n, rng.randrange(ts[n]))
+
+
+def iter_random_binary_trees(n, size, rng=random):
+    """
+    Yields size independent binary `Shape` instances with n leaves chosen uniformly at random, by unranking uniform
+    random ranks; the count tables are computed once for all of them.
+    :param n: `int` instance.
+    :param size: `int` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: generator of `Shape` instances.
+    """
+    bs = _binary_shapes_table(n)
+
+    for _ in range(size):
+        yield unrank_binary(n, rng.randrange(bs[n]))
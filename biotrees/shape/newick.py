@@ -3,6 +3,7 @@ In order to read Newick codes we import the newick module from https://github.co
 """
 
 from biotrees.shape import Shape
+from biotrees.traversal import fold
 
 import newick as _newick
 
@@ -13,7 +14,7 @@ def to_newick(shape):
     :param: `Shape` instance.
     :return: `str` instance.
     """
-    return shape_to_newick_node(shape).newick
+    return newick_node_to_str(shape_to_newick_node(shape))
 
 
 def from_newick(nwk):
@@ -40,9 +41,7 @@ def newick_node_to_shape(node):
     :param node: a `Node`.
     :return: `Shape` instance.
     """
-    if not bool(node.descendants):
-        return Shape(None)
-    return Shape(sorted([newick_node_to_shape(x) for x in node.descendants]))
+    return fold(node, lambda n: Shape.LEAF, lambda n, chs: Shape(chs), children=_descendants)
 
 
 def shape_to_newick_node(shape):
@@ -51,9 +50,39 @@ def shape_to_newick_node(shape):
     :param shape: `Shape` instance.
     :return: `Node` instance.
     """
-    if shape.is_leaf():
-        return _newick.Node.create("*")
-    return _newick.Node.create(descendants = [shape_to_newick_node(child) for child in shape.children])
+    return fold(shape, lambda t: _newick.Node.create("*"), lambda t, chs: _newick.Node.create(descendants = chs))
+
+
+def newick_node_to_str(node):
+    """
+    Returns the Newick code of a `Node` without branch lengths, like `Node.newick` but without recursion.
+    :param node: a `Node`.
+    :return: `str` instance.
+    """
+    tokens = []
+    stack = [node]
+
+    while stack:
+        n = stack.pop()
+
+        if isinstance(n, str):
+            tokens.append(n)
+        elif not n.descendants:
+            tokens.append(n.name or '')
+        else:
+            tokens.append('(')
+            stack.append(')' + (n.name or ''))
+
+            for i in range(len(n.descendants) - 1, 0, -1):
+                stack.append(n.descendants[i])
+                stack.append(',')
+            stack.append(n.descendants[0])
+
+    return ''.join(tokens)
+
+
+def _descendants(node):
+    return node.descendants
 
 
 def shapes_from_file(fname, encoding='utf8', strip_comments=False, **kw):
@@ -0,0 +1,35 @@
+"""
+The PDA (Proportional to Distinguishable Arrangements) model, under which all the phylogenetic trees with n leaves are
+equally likely. It grows a tree by hanging each new leaf from a uniformly chosen edge (the root edge included).
+"""
+
+import numpy as np
+
+from biotrees.shape.compact import forest_from_parents
+
+
+def sim_pda_forest(n, size, rng=None):
+    """
+    Returns a `CompactForest` with size independent random trees with n leaves under the PDA model, simulated all at
+    once with NumPy: at the k-th step, every tree chooses one of its 2k-1 edges with a single vectorized draw and the
+    new interior node 2k-1, with the new leaf 2k as a child, is inserted on it. No `Shape` instance is built.
+    :param n: `int` instance.
+    :param size: `int` instance.
+    :param rng: `numpy.random.Generator` instance, or a seed for `numpy.random.default_rng`.
+    :return: `CompactForest` instance.
+    """
+    assert n >= 1
+    rng = np.random.default_rng(rng)
+    rows = np.arange(size)
+
+    parents = np.full((size, 2*n - 1), -1, dtype=np.int32)
+
+    for k in range(1, n):
+        # the edge that ends at v
+        v = rng.integers(0, 2*k - 1, size=size)
+
+        parents[:, 2*k - 1] = parents[rows, v]
+        parents[rows, v] = 2*k - 1
+        parents[:, 2*k] = 2*k - 1
+
+    return forest_from_parents(parents)
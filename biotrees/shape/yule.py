@@ -1,40 +1,115 @@
+from fractions import Fraction
 from functools import lru_cache
+import random
 
+import numpy as np
+
+from biotrees.shape import Shape
+from biotrees.shape.compact import CompactForest
+from biotrees.traversal import iter_preorder
+from biotrees.shape.generator import all_binary_trees_with_n_leaves
 from biotrees.phylotree import shape_to_phylotree, phylotree_to_shape
 import biotrees.phylotree.yule as phylo_yule
-from biotrees.util import and_then, parametric_total_probabilities
+from biotrees.probability import ProbabilityTable
+
+
+
+def sim_yule_from_t(t, rng=random):
+    return phylotree_to_shape(phylo_yule.sim_yule_from_t(shape_to_phylotree(t), rng))
+
+
+def sim_yule(n, rng=random):
+    """
+    Returns a random `Shape` with n leaves under the Yule model, in O(n) time (see `phylotree.yule.sim_yule_nodes`).
+    :param n: `int` instance.
+    :param rng: `random.Random` instance, or the `random` module.
+    :return: `Shape` instance.
+    """
+    children, _ = phylo_yule.sim_yule_nodes(n, rng)
+    built = [None] * len(children)
+
+    for v in reversed(range(len(children))):
+        if children[v] is None:
+            built[v] = Shape.LEAF
+        else:
+            built[v] = Shape([built[w] for w in children[v]])
+
+    return built[0]
 
 
+def sim_yule_forest(n, size, rng=None):
+    """
+    Returns a `CompactForest` with size independent random trees with n leaves under the Yule model, simulated all at
+    once with NumPy: at the k-th step, every tree splits one of its k leaves, chosen with a single vectorized draw, into
+    the new nodes 2k-1 and 2k. The nodes are thus created after their parents, and numbering them backwards gives the
+    order of the compact encoding. No `Shape` instance is built.
+    :param n: `int` instance.
+    :param size: `int` instance.
+    :param rng: `numpy.random.Generator` instance, or a seed for `numpy.random.default_rng`.
+    :return: `CompactForest` instance.
+    """
+    assert n >= 1
+    rng = np.random.default_rng(rng)
+    m = 2*n - 1
+    rows = np.arange(size)
 
-def sim_yule_from_t(t):
-    return phylotree_to_shape(phylo_yule.sim_yule_from_t(shape_to_phylotree(t)))
+    parents = np.full((size, m), -1, dtype=np.int32)
+    lvs = np.zeros((size, n), dtype=np.int32)
 
+    for k in range(1, n):
+        i = rng.integers(0, k, size=size)
+        v = lvs[rows, i]
 
-def sim_yule(n):
-    return phylotree_to_shape(phylo_yule.sim_yule(n))
+        parents[:, 2*k - 1] = v
+        parents[:, 2*k] = v
+        lvs[rows, i] = 2*k - 1
+        lvs[:, k] = 2*k
 
+    parents = np.where(parents >= 0, (m - 1) - parents, -1)[:, ::-1]
+    return CompactForest(parents.reshape(-1), np.arange(size + 1, dtype=np.int64) * m)
 
-@and_then(parametric_total_probabilities)
-def yule_from_t(sh, prob):
+
+def yule_from_t(sh, prob=1):
     """
-    Returns a list of tuples containing each shape obtained from `Shape` sh (assuming sh has probability prob) with
-    their associate probability under the Yule model.
+    Returns a `ProbabilityTable` with each shape obtained from `Shape` sh (assuming sh has probability prob) and their
+    associate probability under the Yule model.
     :param sh: `Shape` instance.
-    :param prob: `function` instance.
-    :return: `list` instance.
+    :param prob: `Fraction` instance, or a number.
+    :return: `ProbabilityTable` instance.
     """
-    for t, p in phylo_yule.yule_from_t(shape_to_phylotree(sh), prob):
-        yield phylotree_to_shape(t), p
+    return ProbabilityTable((phylotree_to_shape(t), p) for t, p in phylo_yule.yule_from_t(shape_to_phylotree(sh), prob))
+
+
+def yule_probability(t):
+    """
+    Returns the probability of the shape t under the Yule model, which is 0 unless t is binary and otherwise the
+    product over the interior nodes v of t of 2/(n_v - 1), or 1/(n_v - 1) if both children of v are equal, where n_v
+    is the number of leaves that descend from v.
+    :param t: `Shape` instance.
+    :return: `Fraction` instance.
+    """
+    k = 0
+    d = 1
+
+    for s in iter_preorder(t):
+        if s.is_leaf():
+            continue
+        elif len(s.children) != 2:
+            return Fraction(0)
+
+        if s.children[0] != s.children[1]:
+            k += 1
+        d *= s.leaf_count - 1
+
+    return Fraction(2**k, d)
 
 
 @lru_cache(maxsize=-1)
-@and_then(parametric_total_probabilities)
 def yule(n):
     """
-    Returns a list of tuples containing all the shapes of n leaves that can be obtained under the Yule model and their
+    Returns a `ProbabilityTable` with all the shapes of n leaves that can be obtained under the Yule model and their
     corresponding probability.
     :param n: `int` instance.
-    :return: `list` instance.
+    :return: `ProbabilityTable` instance.
     """
-    for t, p in phylo_yule.yule(n):
-        yield phylotree_to_shape(t), p
+    return ProbabilityTable((t, yule_probability(t)) for t in all_binary_trees_with_n_leaves(n))
@@ -0,0 +1,109 @@
+"""
+Traversals of trees with an explicit stack instead of recursion, so that they take linear time and work on trees of
+any depth regardless of the interpreter recursion limit. They only look at the children of each node, given by the
+function `children` (by default, the `children` attribute, `None` for leaves), so they serve `Shape`, `PhyloTree` and
+Newick `Node` instances alike.
+"""
+
+
+def _children(t):
+    return t.children or ()
+
+
+def iter_preorder(t, children=_children):
+    """
+    Yields the nodes of t in preorder: each node before its descendants, and the children from left to right.
+    :param t: the root of the tree.
+    :param children: `function` that returns the sequence of children of a node.
+    :return: generator of nodes.
+    """
+    stack = [t]
+
+    while stack:
+        s = stack.pop()
+        yield s
+        stack.extend(reversed(children(s)))
+
+
+def iter_preorder_with_depth(t, children=_children):
+    """
+    Yields the pairs (node, depth) of t in preorder.
+    :param t: the root of the tree.
+    :param children: `function` that returns the sequence of children of a node.
+    :return: generator of `tuple` instances.
+    """
+    stack = [(t, 0)]
+
+    while stack:
+        s, d = stack.pop()
+        yield s, d
+
+        d1 = d + 1
+        stack.extend((ch, d1) for ch in reversed(children(s)))
+
+
+def iter_postorder(t, children=_children):
+    """
+    Yields the nodes of t in postorder: each node after its descendants, and the children from left to right.
+    :param t: the root of the tree.
+    :param children: `function` that returns the sequence of children of a node.
+    :return: generator of nodes.
+    """
+    stack = [(t, False)]
+
+    while stack:
+        s, visited = stack.pop()
+        chs = children(s)
+
+        if visited or not chs:
+            yield s
+        else:
+            stack.append((s, True))
+            stack.extend((ch, False) for ch in reversed(chs))
+
+
+_MISSING = object()
+
+
+def fold(t, leaf, node, children=_children, shared=False):
+    """
+    Computes a value for every node of t in postorder and returns the one of the root: leaf(s) for each leaf s and
+    node(s, values) for each interior node s, where values is the list of the values of its children.
+    If shared is True, the value of a node is assumed to depend only on the node itself, so it is computed once for
+    every distinct node object: for interned `Shape` instances this visits each distinct subtree once.
+    :param t: the root of the tree.
+    :param leaf: `function` instance.
+    :param node: `function` instance.
+    :param children: `function` that returns the sequence of children of a node.
+    :param shared: `bool` instance.
+    :return: the value of the root.
+    """
+    memo = {}
+    values = []
+    stack = [(t, False)]
+
+    while stack:
+        s, visited = stack.pop()
+
+        if visited:
+            k = len(children(s))
+            v = node(s, values[-k:])
+            del values[-k:]
+        else:
+            v = memo.get(id(s), _MISSING) if shared else _MISSING
+
+            if v is _MISSING:
+                chs = children(s)
+
+                if chs:
+                    stack.append((s, True))
+                    stack.extend((ch, False) for ch in reversed(chs))
+                    continue
+
+                v = leaf(s)
+
+        if shared:
+            memo[id(s)] = v
+        values.append(v)
+
+    return values[0]
@@ -1,4 +1,4 @@
-from collections import Hashable
+from collections.abc import Hashable
 from itertools import groupby
 from functools import reduce
 import operator
@@ -7,6 +7,16 @@ import operator
 def binom2(m):
     return m * (m-1) // 2 if m >= 2 else 0
 
+def binom(m, k):
+    if k < 0 or k > m:
+        return 0
+
+    k = min(k, m - k)
+    b = 1
+    for i in range(1, k+1):
+        b = b * (m - k + i) // i
+    return b
+
 def skip_nth(iterable, n):
     for i, x in enumerate(iterable):
         if i != n:
@@ -15,6 +25,14 @@ def skip_nth(iterable, n):
 def last(iterable):
     return list(iterable)[-1]
 
+def sort_key(x):
+    """
+    Returns the key used to sort x: x.sort_key() if x provides it (as `Shape` and `PhyloTree` instances do), or x
+    itself otherwise.
+    """
+    key = getattr(x, 'sort_key', None)
+    return key() if key is not None else x
+
 def unique(lst, sort=False):
     """
     Checks if the first element in lst is hashable. If it is, lst is converted
@@ -23,9 +41,9 @@ def unique(lst, sort=False):
     """
     lst = list(lst)
     if lst and isinstance(lst[0], Hashable):
-        return sorted(set(lst)) if sort else list(set(lst))
+        return sorted(set(lst), key=sort_key) if sort else list(set(lst))
     else:
-        return [k for k, _ in groupby(sorted(lst))]
+        return [k for k, _ in groupby(sorted(lst, key=sort_key))]
 
 def unique_unsortable(lst):
     ret = []
@@ -70,7 +88,7 @@ def parametric_total_probabilities(xps):
     :param xps: `list` instance.
     :return: `list` instance.
     """
-    xps = sorted(xps, key = lambda tp: tp[0])
+    xps = sorted(xps, key = lambda tp: sort_key(tp[0]))
     groups = groupby(xps, key = lambda tp: tp[0])
 
     return [(t, lifted_sum([p for _t, p in group]))
@@ -0,0 +1,154 @@
+import unittest
+
+import random
+
+from collections import Counter
+from fractions import Fraction
+from math import log
+
+import numpy as np
+
+from biotrees.shape import Shape, is_binary
+from biotrees.shape.compact import compact_to_forest
+from biotrees.shape.generator import comb, star, random_tree, binary_max_balanced
+from biotrees.probability import ProbabilityTable, RationalFunction, alpha, gamma
+import biotrees.shape.alphagamma as alphagamma
+import biotrees.shape.yule as yule
+
+
+class TestAlphaGamma(unittest.TestCase):
+
+    def test_alphagamma(self):
+        for n in range(1, 8):
+            ts = alphagamma.alphagamma(n)
+            self.assertEqual(ts.total(), 1)
+
+            # alpha = gamma = 0 is the Yule model
+            self.assertEqual([(t, p) for t, p in ts.evaluate(0, 0) if p != 0], list(yule.yule(n)))
+
+        ts = alphagamma.alphagamma(4).evaluate(Fraction(1, 2), Fraction(1, 2))
+        self.assertEqual(ts[comb(4)], Fraction(4, 5))
+        self.assertEqual(ts[Shape([Shape.CHERRY, Shape.CHERRY])], Fraction(1, 5))
+
+    def test_alphagamma_from_t(self):
+        ts = alphagamma.alphagamma_from_t(Shape.CHERRY)
+        self.assertEqual(ts.total(), 1)
+        self.assertEqual(ts[comb(3)], RationalFunction(2 - 2*alpha + gamma, 2 - alpha))
+
+    def test_compiled_alphagamma(self):
+        a, c = np.meshgrid(np.linspace(0, 1, 11), np.linspace(0, 1, 7))
+
+        for n in range(1, 8):
+            ts = alphagamma.alphagamma(n)
+            cs = alphagamma.compiled_alphagamma(n)
+            self.assertEqual(cs.objects, ts.objects())
+
+            ps = cs.evaluate(a, c)
+            self.assertEqual(ps.shape, (len(ts), 7, 11))
+            self.assertTrue(np.allclose(ps.sum(axis=0), 1))
+            self.assertTrue(np.allclose(ps[:, 3, 4], [float(p(a[3, 4], c[3, 4])) for p in ts.probabilities()]))
+
+            x = (Fraction(2, 3), Fraction(1, 5))
+            self.assertEqual(list(cs.evaluate(*x, exact=True)), ts.evaluate(*x).probabilities())
+
+    def test_alphagamma_probability(self):
+        x = (Fraction(1, 3), Fraction(1, 5))
+
+        for n in range(1, 8):
+            for t, p in alphagamma.alphagamma(n):
+                self.assertEqual(alphagamma.alphagamma_probability(t, *x), p(*x))
+
+                if n <= 5:
+                    self.assertEqual(alphagamma.alphagamma_probability(t), p)
+
+        self.assertEqual(alphagamma.alphagamma_probability(Shape.LEAF), 1)
+
+        for t in [comb(100), star(100), random_tree(100)]:
+            self.assertAlmostEqual(
+                alphagamma.alphagamma_probability(t, 0.3, 0.1)
+                / float(alphagamma.alphagamma_probability(t, Fraction(3, 10), Fraction(1, 10))),
+                1)
+
+        self.assertGreater(alphagamma.alphagamma_probability(comb(300), 0.3, 0.1), 0)
+
+    def test_alphagamma_log_likelihood(self):
+        ts = [random_tree(n) for n in range(2, 30)] * 2
+
+        self.assertAlmostEqual(
+            alphagamma.alphagamma_log_likelihood(ts, 0.4, 0.1),
+            sum(log(alphagamma.alphagamma_probability(t, 0.4, 0.1)) for t in ts))
+
+        a, c = np.meshgrid(np.linspace(0.1, 0.9, 3), np.linspace(0, 0.1, 2))
+        ls = alphagamma.alphagamma_log_likelihood(ts, a, c)
+        self.assertEqual(ls.shape, (2, 3))
+        self.assertAlmostEqual(ls[1, 2], alphagamma.alphagamma_log_likelihood(ts, a[1, 2], c[1, 2]))
+
+    def test_split_counts(self):
+        # the children of the roots are ordered by shape, with 4 and 3 leaves in the first tree and 3 and 4 in the
+        # second one, but both roots have the same split
+        ts = [Shape([comb(4), star(3)]), Shape([comb(3), binary_max_balanced(4)])]
+        self.assertEqual([ch.leaf_count for ch in ts[0].children], [4, 3])
+
+        splits, _ = alphagamma._split_counts(ts)
+        self.assertEqual(splits, Counter({(3, 4): 2, (1, 3): 1, (1, 2): 2, (1, 1): 4, (1, 1, 1): 1, (2, 2): 1}))
+
+    def test_fit_alphagamma(self):
+        # a sample with the exact proportions of the model with alpha = 0.6 and gamma = 0.3
+        ts = []
+        for t, p in alphagamma.alphagamma(6):
+            ts.extend([t] * round(float(p(Fraction(3, 5), Fraction(3, 10))) * 100000))
+
+        a, c, l = alphagamma.fit_alphagamma(ts)
+        self.assertAlmostEqual(a, 0.6, places=3)
+        self.assertAlmostEqual(c, 0.3, places=3)
+        self.assertAlmostEqual(l, alphagamma.alphagamma_log_likelihood(ts, a, c))
+
+        a2, c2, _ = alphagamma.fit_alphagamma(ts, processes=2)
+        self.assertAlmostEqual(a2, a)
+        self.assertAlmostEqual(c2, c)
+
+        # binary trees have probability 0 unless gamma = alpha
+        a, c, _ = alphagamma.fit_alphagamma([comb(5), comb(6), comb(4)])
+        self.assertAlmostEqual(a, c)
+
+        # leaves have no root splits
+        self.assertEqual(alphagamma.fit_alphagamma([Shape.LEAF], processes=2), (0.5, 0.25, 0.))
+
+    def test_sim_alphagamma(self):
+        n, size = 5, 20000
+
+        for a, c in [(0.6, 0.3), (0.5, 0.5), (1., 0.2)]:
+            ps = alphagamma.alphagamma(n).evaluate(Fraction(a), Fraction(c))
+
+            rng = random.Random(1)
+            counts = Counter(alphagamma.sim_alphagamma(n, a, c, rng) for _ in range(size))
+            forest_counts = Counter(compact_to_forest(alphagamma.sim_alphagamma_forest(n, size, a, c, rng=1)))
+
+            for t, p in ps:
+                self.assertAlmostEqual(counts[t] / size, float(p), delta=0.015)
+                self.assertAlmostEqual(forest_counts[t] / size, float(p), delta=0.015)
+
+        t = alphagamma.sim_alphagamma(1000, 0.5, 0.5, random.Random(2))
+        self.assertEqual(t.leaf_count, 1000)
+        self.assertTrue(is_binary(t))
+        self.assertEqual(alphagamma.sim_alphagamma(1, 0.5, 0.2), Shape.LEAF)
+
+
+class TestProbabilityTable(unittest.TestCase):
+
+    def test_probability_table(self):
+        ts = ProbabilityTable([(comb(3), Fraction(1, 3)), (Shape.CHERRY, Fraction(1, 2)),
+                               (comb(3), Fraction(1, 6))])
+
+        self.assertEqual(len(ts), 2)
+        self.assertEqual(ts.objects(), [Shape.CHERRY, comb(3)])
+        self.assertEqual(ts.probabilities(), [Fraction(1, 2), Fraction(1, 2)])
+        self.assertEqual(ts[comb(4)], 0)
+        self.assertEqual(ts.total(), 1)
+
+    def test_rational_function(self):
+        f = RationalFunction(alpha + gamma, 2 - alpha)
+
+        self.assertEqual(f + RationalFunction(2 - 2*alpha - gamma, 2 - alpha), 1)
+        self.assertEqual(f(Fraction(1, 2), 1), 1)
+        self.assertAlmostEqual(f(0.5, 1.0), 1.0)
@@ -0,0 +1,44 @@
+import unittest
+
+import random
+
+from collections import Counter
+
+from biotrees.shape import sort_key
+from biotrees.shape.generator import all_binary_trees_with_n_leaves
+from biotrees.shape.balance import binary_colless_index
+from biotrees.shape.balance.colless import min_colless, iter_min_colless, count_min_colless, unrank_min_colless, \
+    random_min_colless, min_colless_value, min_colless_root
+
+
+class TestColless(unittest.TestCase):
+
+    def test_min_colless(self):
+        for n in range(1, 14):
+            ts = all_binary_trees_with_n_leaves(n)
+            m = min(binary_colless_index(t) for t in ts)
+            ms = list(iter_min_colless(n))
+
+            self.assertEqual(set(ms), {t for t in ts if binary_colless_index(t) == m})
+            self.assertEqual(len(ms), count_min_colless(n))
+            # min_colless keeps the order of the root splits and sorts the trees of each of them
+            if n > 1:
+                splits = min_colless_root(n)
+                self.assertEqual(min_colless(n), sorted(ms, key=lambda t: (
+                    splits.index(tuple(sorted(ch.leaf_count for ch in t.children))), sort_key(t))))
+            self.assertEqual([unrank_min_colless(n, i) for i in range(len(ms))], ms)
+
+        self.assertEqual(count_min_colless(21), 16)
+        self.assertEqual(count_min_colless(2**20), 1)
+
+    def test_random_min_colless(self):
+        rng = random.Random(1)
+        size = 16000
+        counts = Counter(random_min_colless(21, rng) for _ in range(size))
+
+        self.assertEqual(len(counts), 16)
+        for c in counts.values():
+            self.assertAlmostEqual(c / size, 1 / 16, delta=0.01)
+
+        n = 10**4 + 1
+        self.assertEqual(binary_colless_index(random_min_colless(n, rng)), min_colless_value(n))
@@ -0,0 +1,106 @@
+import unittest
+
+from collections import Counter
+
+import numpy as np
+
+from biotrees.shape import Shape, count_leaves, get_depth, get_leaf_depths, count_nodes_by_depth
+from biotrees.shape.generator import all_trees_with_n_leaves, all_binary_trees_with_n_leaves, comb
+from biotrees.shape.yule import yule, sim_yule_forest
+from biotrees.shape.pda import sim_pda_forest
+from biotrees.phylotree import PhyloTree, shape_to_phylotree
+import biotrees.shape.compact as compact
+from biotrees.phylotree.compact import phylotree_to_compact, compact_to_phylotree
+
+
+class TestCompact(unittest.TestCase):
+
+    def test_shape_roundtrip(self):
+        for n in range(1, 7):
+            for t in all_trees_with_n_leaves(n):
+                c = compact.shape_to_compact(t)
+
+                self.assertEqual(c.parents.dtype, np.int32)
+                self.assertIs(compact.compact_to_shape(c), t)
+
+    def test_postorder(self):
+        c = compact.shape_to_compact(Shape([Shape.LEAF, Shape.CHERRY]))
+
+        self.assertEqual(c.parents.tolist(), [4, 3, 3, 4, -1])
+        self.assertEqual(compact.degrees(c).tolist(), [0, 0, 0, 2, 2])
+
+    def test_traversals(self):
+        for n in range(1, 7):
+            for t in all_trees_with_n_leaves(n):
+                c = compact.shape_to_compact(t)
+
+                self.assertEqual(compact.count_leaves(c), count_leaves(t))
+                self.assertEqual(compact.get_depth(c), get_depth(t))
+                self.assertEqual(compact.get_leaf_depths(c), get_leaf_depths(t))
+                self.assertEqual(compact.count_nodes_by_depth(c), count_nodes_by_depth(t))
+
+    def test_forest(self):
+        ts = all_trees_with_n_leaves(5) + [Shape.LEAF, comb(7)]
+        f = compact.forest_to_compact(ts)
+
+        self.assertEqual(len(f), len(ts))
+        self.assertEqual(compact.compact_to_forest(f), ts)
+        self.assertIs(compact.compact_to_shape(f[-1]), comb(7))
+
+        depths = compact.node_depths(f.global_parents())
+        self.assertEqual(
+            [int(depths[f.offsets[i]:f.offsets[i+1]].max()) for i in range(len(f))],
+            [get_depth(t) for t in ts])
+
+        self.assertEqual(len(compact.forest_to_compact([])), 0)
+
+    def test_phylotree_roundtrip(self):
+        t = PhyloTree(None, [PhyloTree('c'), PhyloTree(None, [PhyloTree('b'), PhyloTree('a')])])
+        c = phylotree_to_compact(t)
+
+        self.assertEqual(c.names, ('a', 'b', 'c'))
+        self.assertEqual(c.labels.tolist(), [2, 1, 0, -1, -1])
+
+        t2 = compact_to_phylotree(c)
+        self.assertEqual(str(t2), str(t))
+
+        t = shape_to_phylotree(comb(6), gen=int)
+        self.assertEqual(compact_to_phylotree(phylotree_to_compact(t)), t)
+
+    def test_forest_from_parents(self):
+        ts = [comb(4), Shape([Shape.CHERRY, Shape.CHERRY]), Shape([Shape.LEAF, Shape.LEAF, Shape.CHERRY, Shape.LEAF])]
+        rng = np.random.default_rng(0)
+        rows = []
+
+        for t in ts:
+            ps = compact.shape_to_compact(t).parents
+            # shuffle the nodes
+            perm = rng.permutation(len(ps))
+            shuffled = np.empty_like(ps)
+            shuffled[perm] = np.where(ps >= 0, perm[ps], -1)
+            rows.append(shuffled)
+
+        f = compact.forest_from_parents(np.array(rows))
+        self.assertEqual(compact.compact_to_forest(f), ts)
+
+    def test_sim_forest(self):
+        n, size = 5, 20000
+
+        for sim in [sim_yule_forest, sim_pda_forest]:
+            f = sim(n, size, rng=1)
+            self.assertEqual(len(f), size)
+            self.assertEqual(f.parents.dtype, np.int32)
+
+            counts = Counter(compact.compact_to_forest(f))
+            self.assertLessEqual(set(counts), set(all_binary_trees_with_n_leaves(n)))
+
+            if sim is sim_yule_forest:
+                for t, p in yule(n):
+                    self.assertAlmostEqual(counts[t] / size, float(p), delta=0.015)
+
+        # under the PDA model the probabilities are proportional to the number of labellings: 60, 15 and 30
+        self.assertAlmostEqual(counts[comb(5)] / size, 60 / 105, delta=0.015)
+
+        self.assertEqual(compact.compact_to_forest(sim_yule_forest(1, 3)), [Shape.LEAF] * 3)
+        self.assertEqual(
+            sim_yule_forest(20, 10, rng=2).parents.tolist(), sim_yule_forest(20, 10, rng=2).parents.tolist())
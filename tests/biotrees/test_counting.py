@@ -0,0 +1,48 @@
+import unittest
+
+from biotrees.traversal import iter_preorder
+from biotrees.shape.generator import all_trees_with_n_leaves, all_binary_trees_with_n_leaves
+import biotrees.shape.counting as counting
+
+
+def max_out_degree(t):
+    return max(len(s.children) for s in iter_preorder(t) if not s.is_leaf())
+
+
+class TestCounting(unittest.TestCase):
+
+    def test_count_shapes(self):
+        for n in range(1, 10):
+            self.assertEqual(counting.count_shapes(n), len(all_trees_with_n_leaves(n)))
+            self.assertEqual(counting.count_binary_shapes(n), len(all_binary_trees_with_n_leaves(n)))
+
+        self.assertEqual(counting.count_shapes(0), 0)
+        self.assertEqual(counting.count_shapes(20), 256738751)
+        self.assertEqual(counting.count_binary_shapes(20), 293547)
+
+    def test_count_shapes_with_max_out_degree(self):
+        for n in range(2, 9):
+            ts = all_trees_with_n_leaves(n)
+
+            for k in range(2, n+1):
+                self.assertEqual(
+                    counting.count_shapes_with_max_out_degree(n, k),
+                    sum(1 for t in ts if max_out_degree(t) <= k))
+
+        self.assertEqual(counting.count_shapes_with_max_out_degree(30, 2), counting.count_binary_shapes(30))
+
+    def test_count_shapes_with_root_split(self):
+        for n in range(2, 9):
+            ts = all_trees_with_n_leaves(n)
+
+            for t in ts:
+                ns = [ch.leaf_count for ch in t.children]
+                self.assertEqual(
+                    counting.count_shapes_with_root_split(ns),
+                    sum(1 for t2 in ts if sorted(ch.leaf_count for ch in t2.children) == sorted(ns)))
+
+                if len(ns) == 2:
+                    self.assertEqual(
+                        counting.count_binary_shapes_with_root_split(*ns),
+                        sum(1 for t2 in all_binary_trees_with_n_leaves(n)
+                            if sorted(ch.leaf_count for ch in t2.children) == sorted(ns)))
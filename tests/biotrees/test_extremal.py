@@ -0,0 +1,51 @@
+import unittest
+
+import random
+
+from biotrees.shape.generator import comb, star, binary_max_balanced, all_binary_trees_with_n_leaves
+from biotrees.shape.yule import sim_yule
+from biotrees.shape.balance import sackin_index, binary_colless_index, binary_qcolless_index, cophenetic_index, \
+    binary_quartet_index, quartet_index, normalized_sackin_index
+from biotrees.shape.balance.sackin import max_sackin_value, min_sackin_value
+from biotrees.shape.balance.colless import max_colless_value, min_colless_value
+from biotrees.shape.balance.qcolless import max_qcolless_value, min_qcolless_value
+from biotrees.shape.balance.cophenetic import max_cophenetic_value, min_cophenetic_value
+from biotrees.shape.balance.quartets import max_quartet_value, min_quartet_value, max_binary_quartet_value, \
+    min_binary_quartet_value
+
+
+class TestExtremal(unittest.TestCase):
+
+    def test_extremal_trees(self):
+        for n in range(1, 100):
+            c, b = comb(n), binary_max_balanced(n)
+
+            self.assertEqual(max_sackin_value(n), sackin_index(c))
+            self.assertEqual(min_sackin_value(n), sackin_index(b))
+            self.assertEqual(max_colless_value(n), binary_colless_index(c))
+            self.assertEqual(min_colless_value(n), binary_colless_index(b))
+            self.assertEqual(max_qcolless_value(n), binary_qcolless_index(c))
+            self.assertEqual(min_qcolless_value(n), binary_qcolless_index(b))
+            self.assertEqual(max_cophenetic_value(n), cophenetic_index(c))
+            self.assertEqual(min_cophenetic_value(n), cophenetic_index(b))
+            self.assertEqual(max_binary_quartet_value(n), binary_quartet_index(b))
+            self.assertEqual(min_binary_quartet_value(n), binary_quartet_index(c))
+            self.assertEqual(max_quartet_value(n), quartet_index(star(n)))
+            self.assertEqual(min_quartet_value(n), quartet_index(c))
+
+    def test_extremal_values(self):
+        for n in range(1, 10):
+            ts = all_binary_trees_with_n_leaves(n)
+
+            for index, lo, hi in [(sackin_index, min_sackin_value, max_sackin_value),
+                                  (binary_colless_index, min_colless_value, max_colless_value),
+                                  (binary_qcolless_index, min_qcolless_value, max_qcolless_value),
+                                  (cophenetic_index, min_cophenetic_value, max_cophenetic_value),
+                                  (binary_quartet_index, min_binary_quartet_value, max_binary_quartet_value)]:
+                values = [index(t) for t in ts]
+                self.assertEqual((min(values), max(values)), (lo(n), hi(n)))
+
+    def test_large_trees(self):
+        n = 10**5
+        t = sim_yule(n, random.Random(1))
+        self.assertEqual(normalized_sackin_index(t), sackin_index(t) / (n*(n+1)//2 - 1 - min_sackin_value(n)))
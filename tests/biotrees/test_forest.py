@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from biotrees.shape import Shape, count_leaves
+from biotrees.shape.generator import all_trees_with_n_leaves, all_binary_trees_with_n_leaves, binary_max_balanced
+from biotrees.shape.compact import forest_to_compact, compact_to_forest, CompactForest
+from biotrees.shape.yule import sim_yule_forest
+from biotrees.shape.balance import sackin_index, binary_colless_index, binary_qcolless_index, cophenetic_index, \
+    binary_quartet_index, quartet_index
+import biotrees.shape.balance.forest as forest
+
+
+class TestForest(unittest.TestCase):
+
+    def test_indices(self):
+        for n in range(1, 9):
+            ts = all_trees_with_n_leaves(n)
+            f = forest_to_compact(ts)
+
+            self.assertEqual(forest.forest_kappas(f)[f.offsets[1:] - 1].tolist(), [count_leaves(t) for t in ts])
+            self.assertEqual(forest.forest_sackin_index(f).tolist(), [sackin_index(t) for t in ts])
+            self.assertEqual(forest.forest_cophenetic_index(f).tolist(), [cophenetic_index(t) for t in ts])
+            self.assertEqual(forest.forest_binary_quartet_index(f).tolist(), [binary_quartet_index(t) for t in ts])
+
+            for vs in [range(5), [3, 1, 4, 1, 5], [7, 0, 0, 2, 9]]:
+                self.assertEqual(forest.forest_quartet_index(f, vs).tolist(), [quartet_index(t, vs) for t in ts])
+
+            bs = all_binary_trees_with_n_leaves(n)
+            f = forest_to_compact(bs)
+
+            self.assertEqual(forest.forest_binary_colless_index(f).tolist(), [binary_colless_index(t) for t in bs])
+            self.assertEqual(forest.forest_binary_qcolless_index(f).tolist(), [binary_qcolless_index(t) for t in bs])
+            self.assertEqual(forest.forest_binary_quartet_index(f).tolist(), [binary_quartet_index(t) for t in bs])
+
+            for vs in [range(5), [3, 1, 4, 1, 5], [0.5, 1, 2, 1.5, 3]]:
+                self.assertEqual(forest.forest_quartet_index(f, vs).tolist(), [quartet_index(t, vs) for t in bs])
+
+    def test_large_quartets(self):
+        # the quartet indices of trees with 2^16 leaves do not fit in int64
+        t = binary_max_balanced(2**16)
+        ts = [t, Shape([binary_max_balanced(2**15), binary_max_balanced(2**15), Shape.LEAF])]
+        f = forest_to_compact(ts)
+
+        self.assertEqual(forest.forest_binary_quartet_index(f).tolist(), [binary_quartet_index(t) for t in ts])
+        self.assertEqual(forest.forest_quartet_index(f).tolist(), [quartet_index(t) for t in ts])
+
+    def test_forest_indices(self):
+        # the nodes of simulated forests are not in postorder
+        f = sim_yule_forest(50, 200, rng=1)
+        ts = compact_to_forest(f)
+        values = forest.forest_indices(f)
+
+        for name, index in [('sackin', sackin_index), ('binary_colless', binary_colless_index),
+                            ('binary_qcolless', binary_qcolless_index), ('cophenetic', cophenetic_index),
+                            ('binary_quartet', binary_quartet_index), ('quartet', quartet_index)]:
+            self.assertEqual(values[name].dtype, np.int64)
+            self.assertEqual(values[name].tolist(), [index(t) for t in ts])
+
+        empty = CompactForest(np.zeros(0, dtype=np.int32), [0])
+        self.assertEqual(forest.forest_indices(empty, ['sackin'])['sackin'].tolist(), [])
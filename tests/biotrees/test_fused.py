@@ -0,0 +1,53 @@
+import unittest
+
+from biotrees.shape import count_leaves, get_depth, is_binary
+from biotrees.shape.generator import iter_trees_with_n_leaves, comb, star
+from biotrees.shape.balance import sackin_index, binary_colless_index, binary_qcolless_index, cophenetic_index, \
+    binary_quartet_index, quartet_index, count_symmetries, count_automorphisms, compute_indices, register_combiner, \
+    Combiner
+from biotrees.shape.balance.var_depths import var_depths
+import biotrees.shape.balance.fused as fused
+
+
+class TestFused(unittest.TestCase):
+
+    def test_compute_indices(self):
+        for n in range(2, 9):
+            for t in iter_trees_with_n_leaves(n):
+                values = compute_indices(t)
+
+                self.assertEqual(values['leaves'], count_leaves(t))
+                self.assertEqual(values['depth'], get_depth(t))
+                self.assertEqual(values['sackin'], sackin_index(t))
+                self.assertAlmostEqual(values['var_depths'], var_depths(t))
+                self.assertEqual(values['cophenetic'], cophenetic_index(t))
+                self.assertEqual(values['binary_quartet'], binary_quartet_index(t))
+                self.assertEqual(values['quartet'], quartet_index(t))
+                self.assertEqual(values['symmetries'], count_symmetries(t))
+                self.assertEqual(values['automorphisms'], count_automorphisms(t))
+
+                if is_binary(t):
+                    self.assertEqual(values['binary_colless'], binary_colless_index(t))
+                    self.assertEqual(values['binary_qcolless'], binary_qcolless_index(t))
+                else:
+                    self.assertNotIn('binary_colless', values)
+                    self.assertNotIn('binary_qcolless', values)
+
+        self.assertEqual(compute_indices(comb(5), ['sackin', 'leaves']), {'sackin': 14, 'leaves': 5})
+
+        with self.assertRaises(AssertionError):
+            compute_indices(star(5), ['binary_colless'])
+
+    def test_register_combiner(self):
+        class CherriesCombiner(Combiner):
+            def leaf(self):
+                return 0
+
+            def node(self, t, values, stats):
+                return sum(values) + int(stats[0].kappa == 1 and stats[1].kappa == 1)
+
+        register_combiner('cherries', CherriesCombiner())
+        try:
+            self.assertEqual(compute_indices(comb(6), ['cherries', 'sackin']), {'cherries': 1, 'sackin': 20})
+        finally:
+            del fused._combiners['cherries']
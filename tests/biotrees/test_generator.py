@@ -0,0 +1,89 @@
+import unittest
+
+from collections import Counter
+from itertools import chain, islice
+import random
+
+from biotrees.shape import is_binary
+from biotrees.traversal import iter_preorder
+from biotrees.shape.generator import all_trees_with_n_leaves, all_binary_trees_with_n_leaves, comb, \
+    all_trees_from_t, all_binary_trees_from_t, iter_trees_with_n_leaves, iter_binary_trees_with_n_leaves, rank, \
+    unrank, rank_binary, unrank_binary, random_tree, random_binary_tree, iter_random_trees, iter_random_binary_trees
+
+
+class TestGenerator(unittest.TestCase):
+
+    def test_rank(self):
+        for n in range(1, 10):
+            ts = all_trees_with_n_leaves(n)
+
+            self.assertEqual(sorted(rank(t) for t in ts), list(range(len(ts))))
+            for t in ts:
+                self.assertIs(unrank(n, rank(t)), t)
+
+        self.assertEqual(rank(unrank(100, 10**20)), 10**20)
+
+    def test_rank_binary(self):
+        for n in range(1, 12):
+            ts = all_binary_trees_with_n_leaves(n)
+
+            self.assertEqual(sorted(rank_binary(t) for t in ts), list(range(len(ts))))
+            for t in ts:
+                self.assertIs(unrank_binary(n, rank_binary(t)), t)
+
+        t = comb(1000)
+        self.assertIs(unrank_binary(1000, rank_binary(t)), t)
+
+    def test_all_trees_from_t(self):
+        for t in all_trees_with_n_leaves(5):
+            ts = all_trees_from_t(t)
+            self.assertEqual(ts, sorted(set(ts)))
+
+        for t in all_binary_trees_with_n_leaves(6):
+            ts = all_binary_trees_from_t(t)
+            self.assertEqual(ts, sorted(set(ts)))
+
+    def test_iter_trees(self):
+        self.assertEqual(
+            [len(list(iter_trees_with_n_leaves(n))) for n in range(1, 11)],
+            [1, 1, 2, 5, 12, 33, 90, 261, 766, 2312])
+
+        for n in range(1, 9):
+            ts = list(iter_trees_with_n_leaves(n))
+            self.assertEqual(ts, [unrank(n, i) for i in range(len(ts))])
+            self.assertEqual(all_trees_with_n_leaves(n), sorted(ts))
+
+    def test_iter_binary_trees(self):
+        self.assertEqual(
+            [len(list(iter_binary_trees_with_n_leaves(n))) for n in range(1, 13)],
+            [1, 1, 1, 2, 3, 6, 11, 23, 46, 98, 207, 451])
+
+        for n in range(1, 11):
+            ts = list(iter_binary_trees_with_n_leaves(n))
+            self.assertEqual(ts, [unrank_binary(n, i) for i in range(len(ts))])
+            self.assertEqual(all_binary_trees_with_n_leaves(n), sorted(ts))
+
+        self.assertTrue(all(is_binary(t) for t in islice(iter_binary_trees_with_n_leaves(40), 1000)))
+
+    def test_iter_trees_sort_keys(self):
+        # the generators give every shape the sort key built from those of its children
+        def degrees(t):
+            return [len(s.children) if s.children else 0 for s in iter_preorder(t)]
+
+        for t in chain(iter_trees_with_n_leaves(8), iter_binary_trees_with_n_leaves(11)):
+            self.assertEqual(list(t.sort_key()), degrees(t))
+
+    def test_random_trees(self):
+        rng = random.Random(1)
+        k = 6000
+
+        for n, sample, ts in [(5, iter_random_trees(5, k, rng), all_trees_with_n_leaves(5)),
+                              (7, iter_random_binary_trees(7, k, rng), all_binary_trees_with_n_leaves(7))]:
+            freqs = Counter(sample)
+
+            self.assertEqual(set(freqs), set(ts))
+            for t in ts:
+                self.assertAlmostEqual(freqs[t] / k, 1 / len(ts), delta=0.03)
+
+        self.assertEqual(random_tree(200, rng).leaf_count, 200)
+        self.assertTrue(is_binary(random_binary_tree(200, rng)))
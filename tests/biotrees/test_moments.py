@@ -0,0 +1,51 @@
+import unittest
+
+from collections import defaultdict
+from fractions import Fraction
+from math import factorial
+
+from biotrees.shape.generator import all_binary_trees_with_n_leaves, comb
+from biotrees.shape.balance import sackin_index, binary_colless_index, binary_qcolless_index, cophenetic_index, \
+    binary_quartet_index, quartet_index
+from biotrees.shape.balance.automorphisms import count_automorphisms
+import biotrees.shape.balance.moments as moments
+import biotrees.shape.yule as yule
+
+
+def uniform(n):
+    # the probability of a shape is its number of labellings over (2n-3)!!
+    d = 1
+    for j in range(1, 2*n - 2, 2):
+        d *= j
+    return [(t, Fraction(factorial(n), count_automorphisms(t) * d)) for t in all_binary_trees_with_n_leaves(n)]
+
+
+class TestMoments(unittest.TestCase):
+
+    def test_moments(self):
+        indices = [sackin_index, binary_colless_index, binary_qcolless_index, cophenetic_index, binary_quartet_index,
+                   quartet_index]
+
+        for n in range(1, 8):
+            for model, tps in [('yule', list(yule.yule(n))), ('uniform', uniform(n))]:
+                for index in indices:
+                    e = sum(p * index(t) for t, p in tps)
+                    self.assertEqual(moments.expected_value(index, n, model), e)
+                    self.assertEqual(moments.variance(index, n, model), sum(p * index(t)**2 for t, p in tps) - e**2)
+
+                    d = defaultdict(Fraction)
+                    for t, p in tps:
+                        d[index(t)] += p
+                    self.assertEqual(dict(moments.distribution(index, n, model)), d)
+
+        n = 100
+        h = sum(Fraction(1, i) for i in range(1, n+1))
+        self.assertEqual(moments.expected_value(sackin_index, n), 2*n*(h - 1))
+
+        for model in ['yule', 'uniform']:
+            self.assertAlmostEqual(
+                moments.variance(binary_colless_index, n, model, exact=False)
+                / float(moments.variance(binary_colless_index, n, model)), 1)
+
+        self.assertGreater(moments.standardized_index(sackin_index, comb(n)), 0)
+        self.assertRaises(ValueError, moments.expected_value, sackin_index, n, 'pda')
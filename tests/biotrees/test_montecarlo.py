@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from biotrees.shape.balance import sackin_index, binary_colless_index
+from biotrees.shape.balance.montecarlo import OnlineStatistics, monte_carlo
+from biotrees.shape.yule import sim_yule
+
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def test_online_statistics(self):
+        xs = np.random.default_rng(0).integers(0, 50, size=1000)
+        s = OnlineStatistics(xs[:300].tolist(), exact=True)
+        s.merge(OnlineStatistics(xs[300:].tolist(), exact=True))
+
+        self.assertEqual(s.count, 1000)
+        self.assertAlmostEqual(s.mean, xs.mean())
+        self.assertAlmostEqual(s.variance(), xs.var(ddof=1))
+        self.assertEqual((s.min(), s.max()), (xs.min(), xs.max()))
+        self.assertEqual(s.quantile(0.5), np.sort(xs)[499])
+        self.assertEqual(s.quantile(0.9), np.sort(xs)[899])
+
+        hist, edges = s.histogram(bins=[0, 10, 25, 50])
+        self.assertEqual(hist.tolist(), np.histogram(xs, bins=[0, 10, 25, 50])[0].tolist())
+
+    def test_online_statistics_bounded(self):
+        xs = np.random.default_rng(0).normal(size=100000)
+        bins = [-2, -1, 0, 1, 2]
+        s = OnlineStatistics(bins=bins, sketch_size=256)
+        for i in range(0, len(xs), 1000):
+            s.merge(OnlineStatistics(xs[i:i+1000].tolist(), bins=bins, sketch_size=256))
+
+        self.assertIsNone(s.counts)
+        self.assertEqual((s.min(), s.max()), (xs.min(), xs.max()))
+        self.assertLess(sum(len(items) for items in s._sketch.levels), 256 * len(s._sketch.levels))
+
+        # the fixed bins are exact, and the quantiles have a small error in rank
+        self.assertEqual(s.histogram()[0].tolist(), np.histogram(xs, bins=bins)[0].tolist())
+        ys = np.sort(xs)
+        for q in [0.05, 0.5, 0.95]:
+            self.assertAlmostEqual(np.searchsorted(ys, s.quantile(q)) / len(xs), q, delta=0.01)
+
+    def test_monte_carlo(self):
+        indices = {'sackin': sackin_index, 'colless': binary_colless_index}
+        n = 20
+
+        r = monte_carlo(indices, sim_yule, n, 3000, seed=1, chunk_size=700)
+        self.assertEqual(r['sackin'].count, 3000)
+        self.assertGreater(r.throughput(), 0)
+
+        # the expected Sackin index under the Yule model is 2n(H_n - 1)
+        h = sum(1 / i for i in range(1, n+1))
+        self.assertAlmostEqual(r['sackin'].mean, 2*n*(h - 1), delta=1)
+
+        # the results only depend on the seed
+        r2 = monte_carlo(indices, sim_yule, n, 3000, processes=2, seed=1, chunk_size=700)
+        for name in indices:
+            self.assertEqual([r2[name].quantile(q) for q in [0.1, 0.5, 0.9]],
+                             [r[name].quantile(q) for q in [0.1, 0.5, 0.9]])
+            self.assertAlmostEqual(r2[name].variance(), r[name].variance())
+
+        r3 = monte_carlo(indices, sim_yule, n, 3000, seed=1, chunk_size=700, exact=True)
+        self.assertEqual(sum(r3['colless'].counts.values()), 3000)
+        self.assertAlmostEqual(r3['colless'].mean, r['colless'].mean)
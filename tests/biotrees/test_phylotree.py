@@ -36,6 +36,20 @@ class TestPhyloTree(unittest.TestCase):
         C12.clone().children.append(L3)
         self.assertEqual(len(C12.children), 2)
 
+    def test_invariants(self):
+        t = PhyloTree(None, [L1, C23])
+        self.assertEqual((t.leaf_count, t.node_count, t.height), (3, 5, 2))
+
+        t.children.append(PhyloTree('4'))
+        self.assertEqual(t.leaf_count, 4)
+        self.assertFalse(PhyloTree(None, [L2, L1])._is_sorted())
+
+    def test_sort_key(self):
+        ts = [L1, L2, L3, C12, C13, C23, PhyloTree(None, [L1, C23]), PhyloTree(None, [L3, C12]),
+              PhyloTree(None, [L1, L2, L3])]
+
+        self.assertEqual(sorted(ts, key=PhyloTree.sort_key), sorted(ts))
+
     def test_compare_with_shape_lex(self):
         self.assertEqual(
             L1.compare_with_shape_lex(L1),
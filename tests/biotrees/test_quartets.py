@@ -0,0 +1,33 @@
+import unittest
+
+from biotrees.shape import Shape
+from biotrees.shape.generator import star, comb, iter_binary_trees_with_n_leaves
+from biotrees.shape.balance.quartets import quartet_index, binary_quartet_index, get_quartets
+from biotrees.util import binom
+
+
+class TestQuartets(unittest.TestCase):
+
+    def test_quartet_shapes(self):
+        vs = [2, 3, 5, 7, 11]
+
+        for q, v in zip(get_quartets(), vs):
+            self.assertEqual(quartet_index(q, vs), v)
+
+    def test_quartet_index(self):
+        vs = [2, 3, 5, 7, 11]
+
+        for n in [4, 10, 300]:
+            self.assertEqual(quartet_index(star(n)), 4 * binom(n, 4))
+            self.assertEqual(quartet_index(star(n), vs), 11 * binom(n, 4))
+            self.assertEqual(quartet_index(comb(n)), 0)
+
+        # Shape([t, t]) has the two t, 6*6 quartets with two leaves on each side and, with three leaves on one side, 2*4
+        # made of the star with 3 leaves and a leaf; the first quartet shape only counts when it is a whole subtree
+        t = Shape([Shape.LEAF, star(3)])
+        self.assertEqual(quartet_index(t, vs), 5)
+        self.assertEqual(quartet_index(Shape([t, t]), vs), 2*5 + 7*binom(4, 2)**2 + 5*2*4)
+
+        for n in range(1, 9):
+            for t in iter_binary_trees_with_n_leaves(n):
+                self.assertEqual(quartet_index(t), 3 * binary_quartet_index(t))
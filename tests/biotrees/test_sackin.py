@@ -0,0 +1,34 @@
+import unittest
+
+from biotrees.shape import get_leaf_depths
+from biotrees.shape.generator import all_binary_trees_with_n_leaves, binary_max_balanced
+from biotrees.shape.balance.sackin import sackin_index, min_sackin, iter_min_sackin, count_min_sackin, \
+    min_sackin_value, _min_sackin_splits
+from biotrees.util import sort_key
+
+
+class TestSackin(unittest.TestCase):
+
+    def test_min_sackin(self):
+        for n in range(1, 15):
+            ts = all_binary_trees_with_n_leaves(n)
+            m = min(sackin_index(t) for t in ts)
+            ms = list(iter_min_sackin(n))
+
+            self.assertEqual(len(ms), count_min_sackin(n))
+            self.assertEqual(sorted(ms, key=sort_key), sorted((t for t in ts if sackin_index(t) == m), key=sort_key))
+            self.assertEqual(min_sackin(n), sorted(ms, key=sort_key))
+
+        self.assertEqual(list(iter_min_sackin(64)), [binary_max_balanced(64)])
+
+        n = 40
+        for t in iter_min_sackin(n):
+            self.assertTrue(set(get_leaf_depths(t)) <= {5, 6})
+            self.assertEqual(sackin_index(t), min_sackin_value(n))
+
+    def test_count_min_sackin(self):
+        cs = [0, 1]
+        for n in range(2, 300):
+            cs.append(sum(cs[n1] * (cs[n1] + 1) // 2 if 2*n1 == n else cs[n1] * cs[n - n1]
+                          for n1 in _min_sackin_splits(n)))
+            self.assertEqual(count_min_sackin(n), cs[n])
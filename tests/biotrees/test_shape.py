@@ -1,6 +1,8 @@
+import pickle
 import unittest
 
-from biotrees.shape import Shape, rooted_deg, unrooted_deg
+from biotrees.shape import Shape, rooted_deg, unrooted_deg, sort_key
+from biotrees.shape.generator import all_trees_with_n_leaves, comb, star
 
 
 class TestShape(unittest.TestCase):
@@ -12,14 +14,65 @@ class TestShape(unittest.TestCase):
         self.assertEqual(len(Shape.CHERRY.children), 2)
 
     def test_clone(self):
-        self.assertEqual(Shape.LEAF, Shape.LEAF.clone())
-        self.assertEqual(Shape.CHERRY, Shape.CHERRY.clone())
+        self.assertIs(Shape.LEAF, Shape.LEAF.clone())
+        self.assertIs(Shape.CHERRY, Shape.CHERRY.clone())
 
-        Shape.CHERRY.clone().children[0].children = [1,2,3]
-        self.assertTrue(Shape.CHERRY.children[0].is_leaf())
+        self.assertIsInstance(Shape.CHERRY.clone().children, tuple)
 
-        Shape.CHERRY.clone().children.append(Shape.LEAF)
-        self.assertEqual(len(Shape.CHERRY.children), 2)
+    def test_interning(self):
+        self.assertIs(Shape(), Shape.LEAF)
+        self.assertIs(Shape([Shape(), Shape()]), Shape.CHERRY)
+
+        t1 = Shape([Shape.LEAF, Shape.CHERRY])
+        t2 = Shape([Shape.CHERRY, Shape.LEAF])
+
+        self.assertIs(t1, t2)
+        self.assertEqual(t1.children, (Shape.LEAF, Shape.CHERRY))
+        self.assertEqual(hash(t1), t1.id)
+        self.assertNotEqual(t1.id, Shape.CHERRY.id)
+
+        self.assertEqual(
+            len({t1, t2, Shape.CHERRY, Shape([Shape.LEAF, Shape.LEAF])}),
+            2)
+
+        self.assertIs(Shape._from_sorted((Shape.LEAF, Shape.CHERRY)), t1)
+
+    def test_pickle(self):
+        for t in [Shape.LEAF, Shape.CHERRY, star(300), Shape([star(3), comb(4), Shape.LEAF])]:
+            self.assertIs(pickle.loads(pickle.dumps(t)), t)
+
+        # deep shapes are pickled without recursion
+        t = comb(5000)
+        self.assertIs(pickle.loads(pickle.dumps(t)), t)
+
+    def test_invariants(self):
+        t = Shape([Shape.LEAF, Shape.LEAF, Shape([Shape.LEAF, Shape.CHERRY])])
+
+        self.assertEqual((Shape.LEAF.leaf_count, Shape.LEAF.node_count, Shape.LEAF.height), (1, 1, 0))
+        self.assertEqual((t.leaf_count, t.node_count, t.height), (5, 8, 3))
+        self.assertTrue(t._is_sorted())
+
+        with self.assertRaises(AttributeError):
+            t.children = (Shape.LEAF, Shape.LEAF)
+        with self.assertRaises(AttributeError):
+            t.leaf_count = 2
+
+    def test_sort_key(self):
+        self.assertEqual(Shape.LEAF.sort_key(), b'\x00')
+        self.assertEqual(Shape([Shape.LEAF, Shape.CHERRY]).sort_key(), b'\x02\x00\x02\x00\x00')
+
+        ts = [t for n in range(1, 7) for t in all_trees_with_n_leaves(n)] + \
+             [star(254), star(255), star(300), Shape([Shape.CHERRY] * 300)]
+
+        def nested(t):
+            return (0,) if t.is_leaf() else (len(t.children),) + tuple(nested(ch) for ch in t.children)
+
+        self.assertEqual(sorted(ts, key=sort_key), sorted(ts, key=nested))
+
+        for t1 in ts:
+            for t2 in ts:
+                c = t1.compare(t2)
+                self.assertEqual((nested(t1) > nested(t2)) - (nested(t1) < nested(t2)), (c > 0) - (c < 0))
 
     def test_shape(self):
         self.assertEqual(
@@ -0,0 +1,54 @@
+import unittest
+
+import random
+
+from collections import Counter, defaultdict
+from fractions import Fraction
+from math import factorial
+
+from biotrees.shape import Shape, is_binary
+from biotrees.phylotree import get_leaves_names
+from biotrees.shape.generator import comb, star, all_binary_trees_with_n_leaves
+import biotrees.shape.yule as yule
+import biotrees.phylotree.yule as phylo_yule
+
+
+class TestYule(unittest.TestCase):
+
+    def test_yule_probability(self):
+        self.assertEqual(yule.yule_probability(Shape.LEAF), 1)
+        self.assertEqual(yule.yule_probability(comb(4)), Fraction(2, 3))
+        self.assertEqual(yule.yule_probability(Shape([Shape.CHERRY, Shape.CHERRY])), Fraction(1, 3))
+        self.assertEqual(yule.yule_probability(star(3)), 0)
+
+        for n in range(1, 10):
+            self.assertEqual(sum(yule.yule_probability(t) for t in all_binary_trees_with_n_leaves(n)), 1)
+
+        n = 3000
+        self.assertEqual(yule.yule_probability(comb(n)), Fraction(2**(n-2), factorial(n-1)))
+
+    def test_phylo_yule_probability(self):
+        for n in range(1, 6):
+            by_shape = defaultdict(Fraction)
+
+            for t, p in phylo_yule.yule(n):
+                self.assertEqual(phylo_yule.yule_probability(t), p)
+                by_shape[t.shape()] += p
+
+            self.assertEqual(sum(by_shape.values()), 1)
+            for s, p in yule.yule(n):
+                self.assertEqual(by_shape[s], p)
+
+    def test_sim_yule(self):
+        t = phylo_yule.sim_yule(1000, random.Random(1))
+        self.assertTrue(is_binary(t))
+        self.assertTrue(t._is_sorted())
+        self.assertEqual(sorted(map(int, get_leaves_names(t))), list(range(1, 1001)))
+        self.assertIs(yule.sim_yule(1000, random.Random(1)), t.shape())
+
+        rng = random.Random(2)
+        size = 20000
+        counts = Counter(str(phylo_yule.sim_yule(4, rng)) for _ in range(size))
+
+        for t, p in phylo_yule.pseudo_yule(4):
+            self.assertAlmostEqual(counts[str(t)] / size, float(p), delta=0.01)
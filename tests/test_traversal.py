@@ -0,0 +1,56 @@
+import unittest
+
+from biotrees.shape import Shape, count_leaves, get_depth, get_leaf_depths
+from biotrees.shape.generator import comb
+from biotrees.shape.newick import to_newick
+from biotrees.shape.balance.sackin import sackin_index
+from biotrees.phylotree import shape_to_phylotree
+import biotrees.traversal as traversal
+
+
+class TestTraversal(unittest.TestCase):
+
+    def test_orders(self):
+        t = Shape([Shape.LEAF, Shape([Shape.LEAF, Shape.CHERRY])])
+
+        self.assertEqual(
+            [count_leaves(s) for s in traversal.iter_preorder(t)],
+            [4, 1, 3, 1, 2, 1, 1])
+
+        self.assertEqual(
+            [count_leaves(s) for s in traversal.iter_postorder(t)],
+            [1, 1, 1, 1, 2, 3, 4])
+
+        self.assertEqual(
+            [d for _, d in traversal.iter_preorder_with_depth(t)],
+            [0, 1, 1, 2, 2, 3, 3])
+
+    def test_fold(self):
+        t = Shape([Shape.CHERRY, Shape.CHERRY])
+        visited = []
+
+        def leaf(s):
+            visited.append(s)
+            return 1
+
+        self.assertEqual(traversal.fold(t, leaf, lambda s, vs: sum(vs)), 4)
+        self.assertEqual(len(visited), 4)
+
+        del visited[:]
+        self.assertEqual(traversal.fold(t, leaf, lambda s, vs: sum(vs), shared=True), 4)
+        self.assertEqual(len(visited), 1)
+
+    def test_deep_trees(self):
+        n = 5000
+        t = comb(n)
+
+        self.assertEqual(count_leaves(t), n)
+        self.assertEqual(get_depth(t), n-1)
+        self.assertEqual(get_leaf_depths(t)[-1], n-1)
+        self.assertEqual(sackin_index(t), (n-1)*(n+2)//2)
+        self.assertTrue(t > comb(n-1))
+        self.assertEqual(len(to_newick(t)), 4*n - 3)
+
+        p = shape_to_phylotree(t)
+        self.assertEqual(p.clone(), p)
+        self.assertIs(p.shape(), t)